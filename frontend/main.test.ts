@@ -124,3 +124,80 @@ test('mount uploader with conversions', async () => {
   });
 });
 
+
+test('mount visualizer with signed references', async () => {
+  spy.mockClear();
+  const fetchMock = vi.fn().mockResolvedValue({
+    ok: true,
+    json: () => Promise.resolve({'first-ref': 'first-token', 'second-ref': null}),
+  });
+  vi.stubGlobal('fetch', fetchMock);
+  document.body.innerHTML = `<div class="osis-document-visualizer"
+    data-base-url="/api"
+    data-values="first-ref,second-ref"
+    data-post-process-status=""
+    data-get-progress-url=""
+    data-base-uuid=""
+    data-wanted-post-process=""
+    data-references-url="/references/resolve"
+  ></div>`;
+  document.cookie = 'csrftoken=csrf';
+
+  // Executes main file
+  await import('./main');
+
+  await vi.waitFor(() => expect(spy).toBeCalledTimes(1));
+  expect(fetchMock).toHaveBeenCalledWith('/references/resolve', expect.objectContaining({
+    method: 'POST',
+    headers: {'Content-Type': 'application/json', 'X-CSRFToken': 'csrf'},
+    body: JSON.stringify({references: ['first-ref', 'second-ref']}),
+  }));
+  expect(spy).toHaveBeenCalledWith(visualizer, {
+    baseUrl: '/api',
+    values: ['first-token'],
+    postProcessStatus: '',
+    getProgressUrl: '',
+    baseUuid: '',
+    wantedPostProcess: '',
+  });
+  vi.unstubAllGlobals();
+});
+
+test('mount visualizer with signed references still post-processed', async () => {
+  spy.mockClear();
+  const fetchMock = vi.fn().mockResolvedValue({
+    ok: true,
+    json: () => Promise.resolve({
+      'first-ref': {
+        status: 'PENDING',
+        links: {progress: '/progress/UUID'},
+        uuid: 'UUID',
+        wanted_post_process: 'CONVERT',
+      },
+    }),
+  });
+  vi.stubGlobal('fetch', fetchMock);
+  document.body.innerHTML = `<div class="osis-document-visualizer"
+    data-base-url="/api"
+    data-values="first-ref"
+    data-post-process-status=""
+    data-get-progress-url=""
+    data-base-uuid=""
+    data-wanted-post-process="CONVERT"
+    data-references-url="/references/resolve"
+  ></div>`;
+
+  // Executes main file
+  await import('./main');
+
+  await vi.waitFor(() => expect(spy).toBeCalledTimes(1));
+  expect(spy).toHaveBeenCalledWith(visualizer, {
+    baseUrl: '/api',
+    values: [''],  // As rendered by document_visualizer while post-processing
+    postProcessStatus: 'PENDING',
+    getProgressUrl: '/progress/UUID',
+    baseUuid: 'UUID',
+    wantedPostProcess: 'CONVERT',
+  });
+  vi.unstubAllGlobals();
+});
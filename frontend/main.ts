@@ -88,26 +88,96 @@ function initDocumentComponents() {
     appInstance.mount(elem);
   });
 
-  document.querySelectorAll<HTMLElement>('.osis-document-visualizer:not([data-v-app])').forEach((elem) => {
-    const props: VisualizerProps = {baseUrl: "", values: [],postProcessStatus: "", getProgressUrl: "", baseUuid:"", wantedPostProcess:"",  ...elem.dataset};
-    if (typeof elem.dataset.values !== 'undefined') {
-      props.values = elem.dataset.values.split(',');
-    }
-    if (typeof elem.dataset.postProcessStatus !== 'undefined') {
-      props.postProcessStatus = elem.dataset.postProcessStatus;
-    }
-    if (typeof elem.dataset.getProgressUrl !== 'undefined') {
-      props.getProgressUrl = elem.dataset.getProgressUrl;
-    }
-    if (typeof elem.dataset.baseUuid !== 'undefined') {
-      props.baseUuid = elem.dataset.baseUuid;
+  document.querySelectorAll<HTMLElement>(
+    '.osis-document-visualizer:not([data-v-app]):not([data-references-url])',
+  ).forEach(mountVisualizer);
+
+  // Visualizers rendered with signed references: resolve them to tokens in batch before mounting
+  const elementsByReferencesUrl = new Map<string, HTMLElement[]>();
+  document.querySelectorAll<HTMLElement>(
+    '.osis-document-visualizer[data-references-url]:not([data-resolving-references])',
+  ).forEach((elem) => {
+    elem.dataset.resolvingReferences = 'true';
+    const url = elem.dataset.referencesUrl as string;
+    elementsByReferencesUrl.set(url, [...(elementsByReferencesUrl.get(url) || []), elem]);
+  });
+  elementsByReferencesUrl.forEach((elements, url) => {
+    void resolveReferences(url, elements);
+  });
+}
+
+function mountVisualizer(elem: HTMLElement) {
+  const props: VisualizerProps = {baseUrl: "", values: [],postProcessStatus: "", getProgressUrl: "", baseUuid:"", wantedPostProcess:"",  ...elem.dataset};
+  if (typeof elem.dataset.values !== 'undefined') {
+    props.values = elem.dataset.values.split(',');
+  }
+  if (typeof elem.dataset.postProcessStatus !== 'undefined') {
+    props.postProcessStatus = elem.dataset.postProcessStatus;
+  }
+  if (typeof elem.dataset.getProgressUrl !== 'undefined') {
+    props.getProgressUrl = elem.dataset.getProgressUrl;
+  }
+  if (typeof elem.dataset.baseUuid !== 'undefined') {
+    props.baseUuid = elem.dataset.baseUuid;
+  }
+  if (typeof elem.dataset.wantedPostProcess !== 'undefined') {
+    props.wantedPostProcess = elem.dataset.wantedPostProcess;
+  }
+  const appInstance = createApp(Visualizer, props);
+  appInstance.use(i18n);
+  appInstance.mount(elem);
+}
+
+function getCsrfToken(): string {
+  // Read from the cookie set by Django, so that the rendered visualizers do not depend on the session
+  const cookie = document.cookie.split(';').map((item) => item.trim()).find((item) => item.startsWith('csrftoken='));
+  return cookie ? decodeURIComponent(cookie.substring('csrftoken='.length)) : '';
+}
+
+type ResolvedReference = string | {
+  status?: string,
+  links?: { progress?: string },
+  uuid?: string,
+  wanted_post_process?: string | null,
+} | null;
+
+async function resolveReferences(url: string, elements: HTMLElement[]) {
+  const references = elements.flatMap((elem) => elem.dataset.values ? elem.dataset.values.split(',') : []);
+  let resolved: Record<string, ResolvedReference> = {};
+  try {
+    const response = await fetch(url, {
+      method: 'POST',
+      headers: {'Content-Type': 'application/json', 'X-CSRFToken': getCsrfToken()},
+      credentials: 'same-origin',
+      body: JSON.stringify({references}),
+    });
+    if (response.ok) {
+      resolved = await response.json() as Record<string, ResolvedReference>;
     }
-    if (typeof elem.dataset.wantedPostProcess !== 'undefined') {
-      props.wantedPostProcess = elem.dataset.wantedPostProcess;
+  } catch (e) {
+    // Unresolved references are displayed as missing documents
+  }
+
+  elements.forEach((elem) => {
+    const tokens: string[] = [];
+    for (const reference of elem.dataset.values ? elem.dataset.values.split(',') : []) {
+      const item = resolved[reference];
+      if (typeof item === 'string') {
+        tokens.push(item);
+      } else if (item) {
+        // Post-processing still in progress
+        elem.dataset.postProcessStatus = item.status || '';
+        elem.dataset.getProgressUrl = item.links?.progress || '';
+        elem.dataset.baseUuid = item.uuid || '';
+        elem.dataset.wantedPostProcess = item.wanted_post_process || '';
+        tokens.length = 0;
+        break;
+      }
     }
-    const appInstance = createApp(Visualizer, props);
-    appInstance.use(i18n);
-    appInstance.mount(elem);
+    elem.dataset.values = tokens.join(',');
+    delete elem.dataset.referencesUrl;
+    delete elem.dataset.resolvingReferences;
+    mountVisualizer(elem);
   });
 }
 
@@ -27,17 +27,19 @@ import os
 
 from django.apps import AppConfig
 from django.conf import settings
-from rest_framework.serializers import ModelSerializer
 
 
 class OsisDocumentComponentsConfig(AppConfig):
     name = 'osis_document_components'
 
     def ready(self):
-        # Add FileFieldSerializer the default_serializer_mapping
-        from osis_document_components.fields import FileField
-        from osis_document_components.serializers import FileField as FileFieldSerializer
-        ModelSerializer.serializer_field_mapping[FileField] = FileFieldSerializer
+        # Add FileFieldSerializer the default_serializer_mapping, once DRF serializers are imported (if ever)
+        from osis_document_components.utils import call_on_import
+        call_on_import('rest_framework.serializers', register_serializer_field)
+
+        # Register the models using file fields
+        from osis_document_components import registry
+        registry.autodiscover()
 
         settings.OSIS_DOCUMENT_COMPONENTS_SAVE_RAW_CONTENT_REMOTELY_TIMEOUT = int(
             os.environ.get('OSIS_DOCUMENT_COMPONENTS_SAVE_RAW_CONTENT_REMOTELY_TIMEOUT', 20)
@@ -57,6 +59,16 @@ class OsisDocumentComponentsConfig(AppConfig):
         settings.OSIS_DOCUMENT_COMPONENTS_CONFIRM_REMOTE_UPLOAD_TIMEOUT = int(
             os.environ.get('OSIS_DOCUMENT_COMPONENTS_CONFIRM_REMOTE_UPLOAD_TIMEOUT', 5)
         )
+        # Only to be enabled if the OSIS-Document server honours the Idempotency-Key header of the confirmations
+        settings.OSIS_DOCUMENT_COMPONENTS_CONFIRM_REMOTE_UPLOAD_MAX_RETRIES = int(
+            os.environ.get('OSIS_DOCUMENT_COMPONENTS_CONFIRM_REMOTE_UPLOAD_MAX_RETRIES', 0)
+        )
+        settings.OSIS_DOCUMENT_COMPONENTS_MAX_CONCURRENT_REQUESTS = int(
+            os.environ.get('OSIS_DOCUMENT_COMPONENTS_MAX_CONCURRENT_REQUESTS', 8)
+        )
+        settings.OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE = int(
+            os.environ.get('OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE', 500)
+        )
         settings.OSIS_DOCUMENT_COMPONENTS_LAUNCH_POST_PROCESSING_TIMEOUT = int(
             os.environ.get('OSIS_DOCUMENT_COMPONENTS_LAUNCH_POST_PROCESSING_TIMEOUT', 60)
         )
@@ -69,3 +81,68 @@ class OsisDocumentComponentsConfig(AppConfig):
         settings.OSIS_DOCUMENT_COMPONENTS_CHANGE_REMOTE_METADATA_TIMEOUT = int(
             os.environ.get('OSIS_DOCUMENT_COMPONENTS_CHANGE_REMOTE_METADATA_TIMEOUT', 2)
         )
+        settings.OSIS_DOCUMENT_COMPONENTS_CONTENT_CACHE_DIR = os.environ.get(
+            'OSIS_DOCUMENT_COMPONENTS_CONTENT_CACHE_DIR',
+            getattr(settings, 'OSIS_DOCUMENT_COMPONENTS_CONTENT_CACHE_DIR', None),
+        )
+        settings.OSIS_DOCUMENT_COMPONENTS_CONTENT_CACHE_MAX_SIZE = int(
+            os.environ.get('OSIS_DOCUMENT_COMPONENTS_CONTENT_CACHE_MAX_SIZE', 1024 * 1024 * 1024)
+        )
+        settings.OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION = (
+            os.environ.get('OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION', 'False') == 'True'
+        )
+        settings.OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION_TTL = int(
+            os.environ.get('OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION_TTL', 600)
+        )
+        settings.OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION_CACHE = os.environ.get(
+            'OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION_CACHE',
+            'default',
+        )
+        # Declare the documents of the deleted instances as deleted once the deletion is committed. Disabled by default,
+        # as the documents of instances deleted without being meant to lose them (e.g. when moving them to another
+        # instance before the deletion) would otherwise be deleted as well.
+        settings.OSIS_DOCUMENT_COMPONENTS_DECLARE_FILES_AS_DELETED_ON_DELETE = (
+            os.environ.get('OSIS_DOCUMENT_COMPONENTS_DECLARE_FILES_AS_DELETED_ON_DELETE', 'False') == 'True'
+        )
+        # Make get_file_url and get_metadata return lazy values, resolved in batch within
+        # osis_document_components.lazy.LazyDocumentsMiddleware, and at the end of each rendering for the values output
+        # directly by the tags with the osis_document_components.lazy.LazyDocumentsTemplates templates backend
+        settings.OSIS_DOCUMENT_COMPONENTS_LAZY_TEMPLATE_TAGS = (
+            os.environ.get('OSIS_DOCUMENT_COMPONENTS_LAZY_TEMPLATE_TAGS', 'False') == 'True'
+        )
+        settings.OSIS_DOCUMENT_COMPONENTS_TRANSPORT = os.environ.get(
+            'OSIS_DOCUMENT_COMPONENTS_TRANSPORT',
+            getattr(
+                settings,
+                'OSIS_DOCUMENT_COMPONENTS_TRANSPORT',
+                'osis_document_components.transport.RequestsTransport',
+            ),
+        )
+        settings.OSIS_DOCUMENT_COMPONENTS_IN_PROCESS_APP = os.environ.get(
+            'OSIS_DOCUMENT_COMPONENTS_IN_PROCESS_APP',
+            getattr(settings, 'OSIS_DOCUMENT_COMPONENTS_IN_PROCESS_APP', None),
+        )
+        settings.OSIS_DOCUMENT_COMPONENTS_JSON_CODEC = os.environ.get(
+            'OSIS_DOCUMENT_COMPONENTS_JSON_CODEC',
+            getattr(settings, 'OSIS_DOCUMENT_COMPONENTS_JSON_CODEC', 'auto'),
+        )
+        # Make document_visualizer and get_file_url render signed references bound to the authenticated user of the
+        # request instead of tokens, resolved by the views of osis_document_components.urls (requires the static bundle
+        # to be built from the current frontend sources with npm run build)
+        settings.OSIS_DOCUMENT_COMPONENTS_SIGNED_REFERENCES = (
+            os.environ.get('OSIS_DOCUMENT_COMPONENTS_SIGNED_REFERENCES', 'False') == 'True'
+        )
+        settings.OSIS_DOCUMENT_COMPONENTS_REFERENCE_MAX_AGE = int(
+            os.environ.get('OSIS_DOCUMENT_COMPONENTS_REFERENCE_MAX_AGE', 7 * 24 * 3600)
+        )
+
+        if settings.OSIS_DOCUMENT_COMPONENTS_DECLARE_FILES_AS_DELETED_ON_DELETE:
+            # Declare the documents of the deleted instances as deleted
+            from osis_document_components import deletion
+            deletion.connect_signals()
+
+
+def register_serializer_field(serializers_module):
+    from osis_document_components.fields import FileField
+    from osis_document_components.serializers import FileField as FileFieldSerializer
+    serializers_module.ModelSerializer.serializer_field_mapping[FileField] = FileFieldSerializer
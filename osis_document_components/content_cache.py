@@ -0,0 +1,145 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import contextlib
+import functools
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from typing import Optional, Union
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+class ContentDiskCache:
+    """
+    Size-bounded cache of raw contents on disk, which can be shared between processes.
+    The entries are written atomically (written in a temporary file then renamed), read through a memory map and
+    evicted in least recently used order once the total size exceeds `max_size` (the modification time of an entry
+    being updated when it is read).
+    """
+
+    EVICTION_TARGET_RATIO = 0.9  # Proportion of max_size to reach when evicting entries
+
+    def __init__(self, directory: str, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+        self._written_size_since_eviction = None
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _get_path(self, key: str) -> str:
+        hashed_key = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, hashed_key[:2], hashed_key)
+
+    def get(self, key: str) -> Optional[Union[mmap.mmap, bytes]]:
+        """Return a read-only memory map of the content (bytes if it is empty), or None if it is not cached."""
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as file:
+                size = os.fstat(file.fileno()).st_size
+                content = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return content
+
+    def set(self, key: str, content: bytes):
+        path = self._get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as file:
+                file.write(content)
+            os.replace(temporary_path, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temporary_path)
+            raise
+
+        with self._lock:
+            if self._written_size_since_eviction is not None:
+                self._written_size_since_eviction += len(content)
+            # The whole directory is only scanned when enough content has been written
+            if self._written_size_since_eviction is not None and self._written_size_since_eviction < (
+                self.max_size * (1 - self.EVICTION_TARGET_RATIO)
+            ):
+                return
+            self._written_size_since_eviction = 0
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the total size is below the limit."""
+        with self._exclusive_lock():
+            entries = []
+            for subdirectory in os.scandir(self.directory):
+                if not subdirectory.is_dir():
+                    continue
+                for entry in os.scandir(subdirectory.path):
+                    with contextlib.suppress(FileNotFoundError):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size = sum(size for _, size, _ in entries)
+            if total_size <= self.max_size:
+                return
+            for _, size, path in sorted(entries):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+                total_size -= size
+                if total_size <= self.max_size * self.EVICTION_TARGET_RATIO:
+                    break
+
+    @contextlib.contextmanager
+    def _exclusive_lock(self):
+        """Prevent several processes to evict entries at the same time."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, '.lock'), 'wb') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_content_cache(directory: str, max_size: int) -> ContentDiskCache:
+    return ContentDiskCache(directory, max_size)
+
+
+def get_content_cache() -> Optional[ContentDiskCache]:
+    """Return the cache defined by the OSIS_DOCUMENT_COMPONENTS_CONTENT_CACHE_* settings, if enabled."""
+    directory = getattr(settings, 'OSIS_DOCUMENT_COMPONENTS_CONTENT_CACHE_DIR', None)
+    if not directory:
+        return None
+    return _get_content_cache(directory, settings.OSIS_DOCUMENT_COMPONENTS_CONTENT_CACHE_MAX_SIZE)
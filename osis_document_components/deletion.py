@@ -0,0 +1,104 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete
+
+from osis_document_components import services as osis_document_services
+from osis_document_components.models import get_file_fields
+from osis_document_components.registry import get_registered_file_fields
+from osis_document_components.utils import chunks
+
+
+class PendingDeletion:
+    """Documents of the instances deleted in a transaction, declared as deleted once it is committed."""
+
+    def __init__(self, using):
+        self.using = using
+        self.uuids = set()
+
+    def __call__(self):
+        pending_deletions = _get_pending_deletions(transaction.get_connection(self.using))
+        for key, pending_deletion in list(pending_deletions.items()):
+            if pending_deletion is self:
+                del pending_deletions[key]
+        declare_files_as_deleted_in_batches(self.uuids)
+
+
+def declare_files_as_deleted_in_batches(uuids):
+    """Declare documents as deleted with one request per batch of OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE uuids."""
+    for batch_uuids in chunks(uuids, settings.OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE):
+        osis_document_services.declare_remote_files_as_deleted(batch_uuids)
+
+
+def _get_pending_deletions(connection):
+    return connection.__dict__.setdefault('_osis_document_pending_deletions', {})
+
+
+def _get_pending_deletion(using) -> PendingDeletion:
+    """
+    Return the pending deletion of the current transaction, registering it to be executed on commit if needed. As the
+    callbacks registered in a savepoint are discarded if it is rolled back, there is one pending deletion by savepoint.
+    """
+    connection = transaction.get_connection(using)
+    pending_deletions = _get_pending_deletions(connection)
+    key = tuple(connection.savepoint_ids)
+    pending_deletion = pending_deletions.get(key)
+    if pending_deletion is None or all(callback[1] is not pending_deletion for callback in connection.run_on_commit):
+        # Not registered yet, or already executed or discarded
+        pending_deletion = pending_deletions[key] = PendingDeletion(using)
+        transaction.on_commit(pending_deletion, using=using)
+    return pending_deletion
+
+
+def collect_deleted_documents(sender, instance, using, **kwargs):
+    """Collect the documents of a deleted instance, to declare them as deleted once the deletion is committed."""
+    uuids = {value for field in get_file_fields(sender) for value in getattr(instance, field.attname) or []}
+    if not uuids:
+        return
+    if not transaction.get_connection(using).in_atomic_block:
+        declare_files_as_deleted_in_batches(uuids)
+        return
+    _get_pending_deletion(using).uuids.update(uuids)
+
+
+def connect_signals():
+    """Collect the documents of the deleted instances of all the models using file fields."""
+    for model in {model for model, _ in get_registered_file_fields()}:
+        post_delete.connect(
+            collect_deleted_documents,
+            sender=model,
+            dispatch_uid='osis_document_components_collect_deleted_documents',
+        )
+
+
+def disconnect_signals():
+    """Stop collecting the documents of the deleted instances (see connect_signals)."""
+    for model in {model for model, _ in get_registered_file_fields()}:
+        post_delete.disconnect(
+            sender=model,
+            dispatch_uid='osis_document_components_collect_deleted_documents',
+        )
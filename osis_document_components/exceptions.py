@@ -34,10 +34,27 @@ class SaveRawContentRemotelyException(OSISDocumentAPICallException):
         super().__init__(self.message)
 
 
+class ConfirmRemoteUploadException(OSISDocumentAPICallException):
+    def __init__(self, api_response):
+        self.api_response = api_response
+        self.message = (
+            f"An error occured during confirming upload to OSIS-Document server. "
+            f"Status:{self.api_response.status_code} Error:{self.api_response.text}"
+        )
+        super().__init__(self.message)
+
+
 class OsisDocumentTimeout(OSISDocumentAPICallException):
     pass
 
 
+class PostProcessingFailedException(OSISDocumentAPICallException):
+    def __init__(self, uuids):
+        self.uuids = uuids
+        self.message = f"The post-processing of the following documents failed: {', '.join(self.uuids)}"
+        super().__init__(self.message)
+
+
 class UploadInvalidException(OSISDocumentAPICallException):
     pass
 
@@ -0,0 +1,181 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import collections
+import itertools
+import logging
+import posixpath
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from osis_document_components import services as osis_document_services
+from osis_document_components.exceptions import OSISDocumentAPICallException
+from osis_document_components.utils import chunks, lazy_import
+
+requests = lazy_import('requests')
+
+
+class _StreamBuffer:
+    """Write-only and non-seekable file-like object, allowing to stream the archive while it is written."""
+
+    def __init__(self):
+        self._data = []
+
+    def write(self, data):
+        self._data.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self) -> bytes:
+        data = b''.join(self._data)
+        self._data.clear()
+        return data
+
+
+def _get_entry_name(used_names: set, pk, field_name: str, filename: str) -> str:
+    """Return a unique path in the archive for a document of an instance."""
+    root, extension = posixpath.splitext(posixpath.basename(filename or 'document'))
+    entry_name = posixpath.join(str(pk), field_name, root + extension)
+    index = 1
+    while entry_name in used_names:
+        entry_name = posixpath.join(str(pk), field_name, '{}-{}{}'.format(root, index, extension))
+        index += 1
+    used_names.add(entry_name)
+    return entry_name
+
+
+def _get_downloaded_response(download, document_uuid):
+    """Return the response of a download, or None (logging why) if the document cannot be downloaded."""
+    logger = logging.getLogger(settings.DEFAULT_LOGGER)
+    try:
+        response = download.result()
+    except (OSISDocumentAPICallException, requests.RequestException) as exc:
+        logger.warning("The document {} could not be exported: {}".format(document_uuid, exc))
+        return None
+    if response is None:
+        logger.warning("The document {} could not be exported".format(document_uuid))
+    return response
+
+
+def _write_entry(archive, buffer, entry_name, document_uuid, response) -> Iterator[bytes]:
+    """Stream the content of a downloaded document in a new entry of the archive."""
+    with response, archive.open(entry_name, 'w', force_zip64=True) as entry:
+        try:
+            for data in response.iter_content(osis_document_services.STREAMED_RESPONSE_CHUNK_SIZE):
+                entry.write(data)
+                yield buffer.pop()
+        except (OSISDocumentAPICallException, requests.RequestException) as exc:
+            # The beginning of the entry has already been streamed
+            logger = logging.getLogger(settings.DEFAULT_LOGGER)
+            logger.warning("The document {} was partially exported: {}".format(document_uuid, exc))
+
+
+def iter_documents_zip(
+    queryset,
+    field_names: List[str],
+    wanted_post_process: str = None,
+    chunk_size: int = 50,
+    max_workers: int = None,
+    compression: int = zipfile.ZIP_STORED,
+) -> Iterator[bytes]:
+    """
+    Stream a ZIP archive containing the documents of some file fields of all the instances of a queryset, each document
+    being stored in '<pk>/<field name>/<file name>'. The instances are read by chunks of `chunk_size` and the reading
+    tokens and metadata of the documents of a chunk are fetched in batch. The documents are downloaded concurrently,
+    at most `max_workers` at once (OSIS_DOCUMENT_COMPONENTS_MAX_CONCURRENT_REQUESTS by default), and their contents are
+    streamed in the archive, so that the memory usage does not depend on the size of the documents. The documents that
+    cannot be downloaded are skipped, and the ones whose download fails while being streamed are truncated (both are
+    logged).
+    wanted_post_process: see get_remote_tokens.
+    """
+    attnames = [queryset.model._meta.get_field(field_name).attname for field_name in field_names]
+    max_workers = max_workers or settings.OSIS_DOCUMENT_COMPONENTS_MAX_CONCURRENT_REQUESTS
+    buffer = _StreamBuffer()
+    used_names = set()
+    downloads = collections.deque()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+            zipfile.ZipFile(buffer, mode='w', compression=compression) as archive:
+
+        def start_download(document, token):
+            downloads.append((document, executor.submit(osis_document_services.open_raw_content_remotely, token)))
+
+        try:
+            for instances in chunks(queryset.only('pk', *attnames).iterator(chunk_size=chunk_size), chunk_size):
+                documents = [
+                    (instance.pk, field_name, str(document_uuid))
+                    for instance in instances
+                    for field_name, attname in zip(field_names, attnames)
+                    for document_uuid in getattr(instance, attname) or []
+                ]
+                if not documents:
+                    continue
+
+                tokens = osis_document_services.get_remote_tokens_in_batches(
+                    [document_uuid for _, _, document_uuid in documents],
+                    wanted_post_process=wanted_post_process,
+                )
+                metadata_by_token = osis_document_services.get_several_remote_metadata_in_batches(tokens.values())
+
+                pending_documents = iter([document for document in documents if document[2] in tokens])
+                for document in itertools.islice(pending_documents, max_workers):
+                    start_download(document, tokens[document[2]])
+                while downloads:
+                    (pk, field_name, document_uuid), download = downloads.popleft()
+                    response = _get_downloaded_response(download, document_uuid)
+                    if response is not None:
+                        metadata = metadata_by_token.get(tokens[document_uuid]) or {}
+                        entry_name = _get_entry_name(used_names, pk, field_name, metadata.get('name'))
+                        yield from _write_entry(archive, buffer, entry_name, document_uuid, response)
+                    # The next download is only started once this one is over
+                    for document in itertools.islice(pending_documents, 1):
+                        start_download(document, tokens[document[2]])
+                yield buffer.pop()
+        finally:
+            # e.g. if the streaming is interrupted
+            for _, download in downloads:
+                download.add_done_callback(_close_download)
+
+    yield buffer.pop()
+
+
+def _close_download(download):
+    if not download.cancelled() and download.exception() is None and download.result() is not None:
+        download.result().close()
+
+
+def documents_zip_response(queryset, field_names: List[str], filename: str = 'documents.zip', **kwargs):
+    """Return a response streaming the archive of the documents of the queryset (see iter_documents_zip)."""
+    return StreamingHttpResponse(
+        iter_documents_zip(queryset, field_names, **kwargs),
+        content_type='application/zip',
+        headers={'Content-Disposition': 'attachment; filename="{}"'.format(filename)},
+    )
@@ -110,6 +110,10 @@ class FileField(ArrayField):
         Convert all writing tokens to UUIDs by remotely confirming their upload, leaving existing uuids
         and deleting old documents
         """
+        if getattr(model_instance, '_file_fields_confirmed', False):
+            # The uploads have already been confirmed for all the file fields of the instance
+            return getattr(model_instance, self.attname)
+
         try:
             previous_values = self.model.objects.values_list(self.attname).get(pk=model_instance.pk)[0] or []
         except ObjectDoesNotExist:
@@ -135,20 +139,8 @@ class FileField(ArrayField):
         tokens = [token for token in attvalues if isinstance(token, str)]
         metadata_by_token = osis_document_services.get_several_remote_metadata(tokens) if tokens else {}
         for token in tokens:
-            filename = metadata_by_token[token]['name']
             file_uuid = osis_document_services.confirm_remote_upload(
-                token=token,
-                upload_to=dirname(generate_filename(model_instance, filename, self.upload_to)),
-                metadata={
-                    'client_info': {
-                        **self.build_metadata_fn(model_instance, self.attname),
-                        'model': self.model.__name__,
-                        'pk': str(model_instance.pk),
-                        'attribute': self.attname,
-                        '_confirm_method': 'FileField',
-                    }
-                },
-                document_expiration_policy=self.document_expiration_policy,
+                **self.get_confirm_upload_params(model_instance, token, metadata_by_token[token]['name'])
             )
             files_confirmed.append(UUID(file_uuid))
 
@@ -157,6 +149,27 @@ class FileField(ArrayField):
             osis_document_services.declare_remote_files_as_deleted(files_to_declare_as_deleted)
         return files_confirmed
 
+    def get_confirm_upload_params(self, model_instance, token: str, filename: str):
+        """Return the parameters of the remote confirmation of a token uploaded for this field."""
+        return {
+            'token': token,
+            'upload_to': dirname(generate_filename(model_instance, filename, self.upload_to)),
+            'metadata': {
+                'client_info': {
+                    **self.build_metadata_fn(model_instance, self.attname),
+                    'model': self.model.__name__,
+                    'pk': str(model_instance.pk),
+                    'attribute': self.attname,
+                    '_confirm_method': 'FileField',
+                }
+            },
+            'document_expiration_policy': self.document_expiration_policy,
+            'idempotency_key': osis_document_services.build_confirm_upload_idempotency_key(
+                token,
+                field='{}.{}'.format(self.model._meta.label, self.attname),
+            ),
+        }
+
     def _post_processing(self, uuid_list: list):
         return osis_document_services.launch_post_processing(
             async_post_processing=self.async_post_processing,
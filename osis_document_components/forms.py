@@ -23,6 +23,8 @@
 #  see http://www.gnu.org/licenses/.
 #
 # ##############################################################################
+from typing import Dict, List
+
 from django import forms
 from django.conf import settings
 from django.contrib.postgres.forms import SplitArrayField
@@ -143,22 +145,44 @@ class FileUploadField(SplitArrayField):
 
     def persist(self, values, related_model_instance=None):
         """Call the remote API to persist the uploaded files."""
+        return osis_document_services.confirm_several_remote_uploads(
+            self.get_uploads_to_confirm(values, related_model_instance)
+        )
+
+    def get_uploads_to_confirm(self, values, related_model_instance=None):
+        """Return the parameters of the remote confirmation of each uploaded file."""
+        related_model = (
+            osis_document_services.build_related_model_data(self.related_model, related_model_instance)
+            if self.related_model
+            else None
+        )
+        metadata = {
+            'client_info': {
+                **(self.build_metadata_fn(values) or {}),
+                '_confirm_method': 'FileUploadField',
+            }
+        }
+        field_identifier = self._get_confirm_field_identifier()
         return [
-            osis_document_services.confirm_remote_upload(
-                token=token,
-                upload_to=self.upload_to,
-                metadata={
-                    'client_info': {
-                        **self.build_metadata_fn(values),
-                        '_confirm_method': 'FileUploadField',
-                    }
-                },
-                related_model=self.related_model,
-                related_model_instance=related_model_instance,
-            )
+            {
+                'token': token,
+                'upload_to': self.upload_to,
+                'metadata': metadata,
+                'related_model': related_model,
+                'idempotency_key': osis_document_services.build_confirm_upload_idempotency_key(
+                    token,
+                    field=field_identifier,
+                ),
+            }
             for token in values
         ]
 
+    def _get_confirm_field_identifier(self):
+        """Identify the field the uploads are confirmed for, as the form field does not know its name."""
+        if self.related_model:
+            return '.'.join(str(self.related_model.get(key, '')) for key in ['app', 'model', 'field'])
+        return str(self.upload_to or '')
+
     def prepare_value(self, value):
         """Get a remote token when given an uuid as initial value"""
         if isinstance(value, list):
@@ -173,3 +197,22 @@ class FileUploadField(SplitArrayField):
                 for v in value
             ]
         return value
+
+
+def persist_several_upload_fields(form, related_model_instance=None, field_names=None) -> Dict[str, List[str]]:
+    """
+    Persist the files uploaded in several FileUploadField of a cleaned form at once and return, for each field
+    name, the uuids of the confirmed files.
+    field_names: names of the fields to persist, all the FileUploadField of the form by default.
+    """
+    uploads_by_field = {
+        name: form.fields[name].get_uploads_to_confirm(form.cleaned_data.get(name) or [], related_model_instance)
+        for name in (field_names or form.fields)
+        if isinstance(form.fields[name], FileUploadField)
+    }
+    confirmed_uuids = iter(
+        osis_document_services.confirm_several_remote_uploads(
+            [upload for uploads in uploads_by_field.values() for upload in uploads]
+        )
+    )
+    return {name: [next(confirmed_uuids) for _ in uploads] for name, uploads in uploads_by_field.items()}
@@ -0,0 +1,105 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import functools
+import json
+
+from django.conf import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+
+class JSONCodec:
+    """Encode and decode JSON with the standard library."""
+
+    name = 'json'
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data: bytes):
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """Encode and decode JSON with orjson."""
+
+    name = 'orjson'
+
+    def dumps(self, obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: bytes):
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    """Encode and decode JSON with msgspec."""
+
+    name = 'msgspec'
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes):
+        return self._decoder.decode(data)
+
+
+CODECS = {
+    OrjsonCodec.name: (OrjsonCodec, lambda: orjson is not None),
+    MsgspecCodec.name: (MsgspecCodec, lambda: msgspec is not None),
+    JSONCodec.name: (JSONCodec, lambda: True),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _load_codec(name: str) -> JSONCodec:
+    if name == 'auto':
+        # The fastest available one
+        return next(codec() for codec, is_available in CODECS.values() if is_available())
+    codec, is_available = CODECS[name]
+    if not is_available():
+        raise ImportError("The {} JSON codec is not installed".format(name))
+    return codec()
+
+
+def get_json_codec() -> JSONCodec:
+    """
+    Return the codec used to encode and decode the large JSON payloads of the batch services, according to the
+    OSIS_DOCUMENT_COMPONENTS_JSON_CODEC setting ('orjson', 'msgspec', 'json', or 'auto' for the fastest installed one).
+    """
+    return _load_codec(settings.OSIS_DOCUMENT_COMPONENTS_JSON_CODEC)
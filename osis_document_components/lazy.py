@@ -0,0 +1,288 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import contextlib
+import contextvars
+import re
+from typing import Dict, Optional, Set, Tuple
+
+from django.core import signing
+from django.template.backends.django import DjangoTemplates, Template as DjangoTemplate
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+
+from osis_document_components import services as osis_document_services
+from osis_document_components.utils import get_file_url
+
+_TokenParams = Tuple[Optional[str], Optional[int], bool]  # wanted_post_process, custom_ttl, for_modified_upload
+
+_collector = contextvars.ContextVar('osis_document_components_lazy_collector', default=None)
+
+PLACEHOLDER_SALT = 'osis_document_components.lazy'
+_PLACEHOLDER_PATTERN = re.compile(r'\[osis-document:([^\]\s]+)\]')
+
+
+class DocumentCollector:
+    """
+    Collect the uuids of the lazy documents and resolve all the pending ones in batch the first time one of them is
+    accessed.
+    """
+
+    def __init__(self, with_placeholders: bool = False):
+        """
+        with_placeholders: if enabled, the lazy values rendered directly in a template output (e.g. by
+        {% get_file_url uuid %}) are rendered as placeholders, to be replaced by replace_placeholders once all the
+        documents have been collected.
+        """
+        self.with_placeholders = with_placeholders
+        self._pending_tokens = {}  # type: Dict[_TokenParams, Set[str]]
+        self._pending_metadata = set()  # type: Set[Tuple[_TokenParams, str]]
+        self._tokens = {}  # type: Dict[Tuple[_TokenParams, str], Optional[str]]
+        self._metadata = {}  # type: Dict[str, Optional[dict]]
+
+    def add(self, uuid: str, params: _TokenParams, with_metadata: bool = False):
+        if (params, uuid) not in self._tokens:
+            self._pending_tokens.setdefault(params, set()).add(uuid)
+        if with_metadata:
+            self._pending_metadata.add((params, uuid))
+
+    def resolve(self):
+        for params, uuids in self._pending_tokens.items():
+            wanted_post_process, custom_ttl, for_modified_upload = params
+            tokens = osis_document_services.get_remote_tokens_in_batches(
+                uuids,
+                wanted_post_process=wanted_post_process,
+                custom_ttl=custom_ttl,
+                for_modified_upload=for_modified_upload,
+            )
+            self._tokens.update({(params, uuid): tokens.get(uuid) for uuid in uuids})
+        self._pending_tokens = {}
+
+        tokens = {self._tokens[key] for key in self._pending_metadata} - set(self._metadata) - {None}
+        if tokens:
+            metadata = osis_document_services.get_several_remote_metadata_in_batches(tokens)
+            self._metadata.update({token: metadata.get(token) for token in tokens})
+        self._pending_metadata = set()
+
+    def get_token(self, uuid: str, params: _TokenParams) -> Optional[str]:
+        if (params, uuid) not in self._tokens:
+            self.resolve()
+        return self._tokens.get((params, uuid))
+
+    def get_metadata(self, uuid: str, params: _TokenParams) -> Optional[dict]:
+        token = self.get_token(uuid, params)
+        if token is not None and token not in self._metadata:
+            self.resolve()
+        return self._metadata.get(token)
+
+    def get_placeholder(self, value: '_LazyDocumentValue') -> str:
+        """
+        Return a placeholder describing the lazy value. As it does not depend on the collector, a placeholder stored
+        with the output (e.g. in a {% cache %} fragment) is still replaced later, and as it is signed, it cannot be
+        forged to get access to other documents (e.g. in a user input).
+        """
+        wanted_post_process, custom_ttl, for_modified_upload = value._params
+        data = '|'.join(
+            [
+                value.placeholder_kind,
+                value._uuid,
+                wanted_post_process or '',
+                str(custom_ttl or ''),
+                '1' if for_modified_upload else '',
+            ]
+        )
+        return '[osis-document:{}]'.format(signing.Signer(salt=PLACEHOLDER_SALT).sign(data))
+
+    def replace_placeholders(self, text: str) -> str:
+        """Replace the placeholders of the lazy values in the text, resolving all the pending documents in batch."""
+        if '[osis-document:' not in text:
+            return text
+        signer = signing.Signer(salt=PLACEHOLDER_SALT)
+        values = {}  # type: Dict[str, Optional[_LazyDocumentValue]]
+        for signed_data in set(_PLACEHOLDER_PATTERN.findall(text)):
+            try:
+                kind, uuid, wanted_post_process, custom_ttl, for_modified_upload = signer.unsign(signed_data).split('|')
+                value_class = _LAZY_VALUE_CLASSES[kind]
+            except (signing.BadSignature, ValueError, KeyError):
+                values[signed_data] = None
+                continue
+            values[signed_data] = value_class(
+                uuid,
+                wanted_post_process or None,
+                int(custom_ttl) if custom_ttl else None,
+                bool(for_modified_upload),
+                collector=self,
+            )
+        self.resolve()
+        return _PLACEHOLDER_PATTERN.sub(
+            lambda match: (
+                match.group(0) if values[match.group(1)] is None else conditional_escape(values[match.group(1)].value)
+            ),
+            text,
+        )
+
+
+@contextlib.contextmanager
+def collect_documents(with_placeholders: bool = False):
+    """
+    Resolve in batch the lazy documents created in this context (e.g. while rendering templates).
+    with_placeholders: see DocumentCollector. The collector is returned to replace the placeholders.
+    """
+    collector = DocumentCollector(with_placeholders=with_placeholders)
+    reset_token = _collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _collector.reset(reset_token)
+
+
+def replace_placeholders(text: str) -> str:
+    """
+    Replace the placeholders of the lazy values in a text which has not been rendered by LazyDocumentsTemplates, e.g.
+    a template fragment cached outside of a template.
+    """
+    return (_collector.get() or DocumentCollector()).replace_placeholders(text)
+
+
+class LazyDocumentsMiddleware:
+    """Resolve in batch the lazy documents created while handling a request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect_documents():
+            return self.get_response(request)
+
+
+class _LazyDocumentsTemplate(DjangoTemplate):
+    def render(self, context=None, request=None):
+        with collect_documents(with_placeholders=True) as collector:
+            return mark_safe(collector.replace_placeholders(super().render(context, request)))
+
+
+class LazyDocumentsTemplates(DjangoTemplates):
+    """
+    Django templates backend rendering the lazy documents output directly by the template tags as placeholders,
+    replaced at the end of each rendering (of a response, an email, ...) once all the documents are resolved in one
+    batch.
+    """
+
+    def from_string(self, template_code):
+        return _LazyDocumentsTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return _LazyDocumentsTemplate(super().get_template(template_name).template, self)
+
+
+class _LazyDocumentValue:
+    """Proxy to a document value, resolved on first access."""
+
+    _unresolved = object()
+    placeholder_kind = None  # type: str
+
+    def __init__(self, uuid, wanted_post_process=None, custom_ttl=None, for_modified_upload=False, collector=None):
+        self._uuid = str(uuid)
+        self._params = (wanted_post_process, custom_ttl, for_modified_upload)
+        # Outside a collection context, each document is resolved on its own
+        self._collector = collector or _collector.get() or DocumentCollector()
+        self._value = self._unresolved
+        self._register()
+
+    def _register(self):
+        self._collector.add(self._uuid, self._params)
+
+    def _resolve(self):
+        raise NotImplementedError
+
+    @property
+    def value(self):
+        if self._value is self._unresolved:
+            self._value = self._resolve()
+        return self._value
+
+    def __str__(self):
+        return str(self.value)
+
+    def __html__(self):
+        # Called when a template tag outputs the value directly: as it is not used by the template, it is only
+        # resolved after the rendering, with all the other documents
+        if self._value is self._unresolved and self._collector.with_placeholders:
+            return self._collector.get_placeholder(self)
+        return conditional_escape(self.value)
+
+    def __repr__(self):
+        return '<{} {}: {!r}>'.format(self.__class__.__name__, self._uuid, self.value)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __eq__(self, other):
+        if isinstance(other, _LazyDocumentValue):
+            other = other.value
+        return self.value == other
+
+    __hash__ = None
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.value, name)
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __contains__(self, item):
+        return item in self.value
+
+
+class LazyFileUrl(_LazyDocumentValue):
+    """Lazy url of a document."""
+
+    placeholder_kind = 'url'
+
+    def _resolve(self):
+        return get_file_url(self._collector.get_token(self._uuid, self._params))
+
+
+class LazyMetadata(_LazyDocumentValue):
+    """Lazy metadata of a document."""
+
+    placeholder_kind = 'metadata'
+
+    def _register(self):
+        self._collector.add(self._uuid, self._params, with_metadata=True)
+
+    def _resolve(self):
+        return self._collector.get_metadata(self._uuid, self._params)
+
+
+_LAZY_VALUE_CLASSES = {value_class.placeholder_kind: value_class for value_class in [LazyFileUrl, LazyMetadata]}
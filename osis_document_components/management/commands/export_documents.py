@@ -0,0 +1,67 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import contextlib
+import sys
+
+from django.apps import apps
+from django.core.management import BaseCommand, CommandError
+
+from osis_document_components.export import iter_documents_zip
+
+
+class Command(BaseCommand):
+    help = "Export the documents of some file fields of a model into a ZIP archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help="Label of the model, e.g. 'app_label.ModelName'")
+        parser.add_argument('fields', nargs='+', help="Names of the file fields to export")
+        parser.add_argument('--output', '-o', default='-', help="Path of the archive ('-' for stdout)")
+        parser.add_argument('--pk', action='append', dest='pks', help="Only export the documents of these instances")
+        parser.add_argument('--wanted-post-process', default=None, help="e.g. CONVERT or MERGE")
+        parser.add_argument('--chunk-size', type=int, default=50, help="Number of instances processed at once")
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options['model'])
+        except (LookupError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        queryset = model._base_manager.order_by('pk')
+        if options['pks']:
+            queryset = queryset.filter(pk__in=options['pks'])
+
+        if options['output'] == '-':
+            output = contextlib.nullcontext(sys.stdout.buffer)
+        else:
+            output = open(options['output'], 'wb')
+        with output as output:
+            for data in iter_documents_zip(
+                queryset,
+                options['fields'],
+                wanted_post_process=options['wanted_post_process'],
+                chunk_size=options['chunk_size'],
+            ):
+                output.write(data)
@@ -0,0 +1,115 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import sys
+from typing import Iterable, Iterator, List
+from uuid import UUID
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from osis_document_components import services as osis_document_services
+from osis_document_components.reconciliation import find_orphan_uuids, iter_referenced_uuids
+from osis_document_components.registry import find_owners
+from osis_document_components.utils import chunks
+
+
+class Command(BaseCommand):
+    help = (
+        "Declare as deleted the documents known by the OSIS-Document server that are not referenced anymore by any "
+        "file field of this project. The server view is read from a file containing one document uuid per line, "
+        "e.g. an export of the documents the server attributes to this project. The orphan documents are only "
+        "listed unless --apply is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'server_uuids',
+            help="Path of the file listing the uuids of the documents known by the server ('-' for stdin)",
+        )
+        parser.add_argument('--apply', action='store_true', help="Declare the orphan documents as deleted")
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help="Number of rows fetched at once when reading the file fields",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help="Number of documents declared as deleted per request",
+        )
+
+    def handle(self, *args, **options):
+        server_uuids_file = sys.stdin if options['server_uuids'] == '-' else open(options['server_uuids'])
+        with server_uuids_file:
+            orphan_uuids = find_orphan_uuids(
+                server_uuids=self.iter_server_uuids(server_uuids_file),
+                referenced_uuids=iter_referenced_uuids(chunk_size=options['chunk_size']),
+            )
+            orphans_count = 0
+            for uuids in chunks(orphan_uuids, options['batch_size'] or settings.OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE):
+                # Documents may have been referenced since their table was scanned
+                uuids = self.exclude_referenced_uuids(uuids)
+                orphans_count += len(uuids)
+                if not uuids:
+                    continue
+                if options['apply']:
+                    osis_document_services.declare_remote_files_as_deleted(uuids)
+                else:
+                    self.stdout.write('\n'.join(str(uuid) for uuid in uuids))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "{} orphan document(s) {}".format(
+                    orphans_count,
+                    "declared as deleted" if options['apply'] else "found",
+                )
+            )
+        )
+
+    def iter_server_uuids(self, lines: Iterable[str]) -> Iterator[UUID]:
+        for line_number, line in enumerate(lines, start=1):
+            value = line.strip()
+            if not value:
+                continue
+            try:
+                yield UUID(value)
+            except ValueError:
+                self.stderr.write("Line {}: invalid uuid {!r} skipped".format(line_number, value))
+
+    @staticmethod
+    def exclude_referenced_uuids(uuids: List[UUID]) -> List[UUID]:
+        pks_by_field = {}
+        for owner in find_owners(uuids, indexed_only=False):
+            pks_by_field.setdefault((owner.model, owner.field_name), []).append(owner.pk)
+        referenced_uuids = {
+            value
+            for (model, field_name), pks in pks_by_field.items()
+            for values in model._base_manager.filter(pk__in=pks).values_list(field_name, flat=True)
+            for value in values or []
+        }
+        return [uuid for uuid in uuids if uuid not in referenced_uuids]
@@ -0,0 +1,236 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import logging
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from django.conf import settings
+from django.db import models
+
+from osis_document_components import services as osis_document_services
+from osis_document_components.enums import PostProcessingType
+from osis_document_components.fields import FileField
+from osis_document_components.utils import chunks, map_concurrently
+
+
+def get_file_fields(model) -> List[FileField]:
+    """Return the file fields stored in the table of the model."""
+    return [field for field in model._meta.concrete_fields if isinstance(field, FileField)]
+
+
+def confirm_file_fields(instances: List, fields: List[FileField] = None):
+    """
+    Convert the writing tokens of the file fields of several instances of a same model to UUIDs, as the FileField
+    pre_save would do for each field of each instance, but in one pass: the previous values are loaded in one query,
+    the metadata of all the tokens are fetched in batch, the uploads are confirmed concurrently, the post-processing
+    is launched once per field (or per instance for a merge) and the replaced documents are declared as deleted at
+    once.
+    fields: the file fields to confirm, all the file fields of the model by default.
+    """
+    if not instances:
+        return
+    model = type(instances[0])
+    fields = get_file_fields(model) if fields is None else fields
+    if not fields:
+        return
+
+    attnames = [field.attname for field in fields]
+    saved_pks = [instance.pk for instance in instances if instance.pk is not None]
+    previous_values_by_pk = (
+        {
+            pk: previous_values
+            for pk, *previous_values in model._base_manager.filter(pk__in=saved_pks).values_list('pk', *attnames)
+        }
+        if saved_pks
+        else {}
+    )
+
+    tokens = [
+        token
+        for instance in instances
+        for attname in attnames
+        for token in getattr(instance, attname) or []
+        if isinstance(token, str)
+    ]
+    metadata_by_token = osis_document_services.get_several_remote_metadata_in_batches(tokens) if tokens else {}
+    confirmed_uuids = iter(
+        osis_document_services.confirm_several_remote_uploads(
+            [
+                field.get_confirm_upload_params(instance, token, metadata_by_token[token]['name'])
+                for instance in instances
+                for field in fields
+                for token in getattr(instance, field.attname) or []
+                if isinstance(token, str)
+            ]
+        )
+    )
+
+    files_to_declare_as_deleted = set()
+    uuids_to_post_process = {}  # type: Dict[FileField, List[UUID]]
+    for instance in instances:
+        files_to_keep = getattr(instance, '_files_to_keep', [])
+        previous_values_by_field = previous_values_by_pk.get(instance.pk) or [None] * len(fields)
+        for field, previous_values in zip(fields, previous_values_by_field):
+            attvalues = getattr(instance, field.attname) or []
+            files_confirmed = [value for value in attvalues if not isinstance(value, str)]
+            files_confirmed += [UUID(next(confirmed_uuids)) for value in attvalues if isinstance(value, str)]
+            files_to_declare_as_deleted |= set(previous_values or []) - set(files_to_keep) - set(files_confirmed)
+            setattr(instance, field.attname, files_confirmed)
+            if field.post_processing and PostProcessingType.MERGE.name in field.post_processing:
+                # The documents of each instance are merged together
+                field._post_processing(uuid_list=files_confirmed)
+            elif field.post_processing:
+                uuids_to_post_process.setdefault(field, []).extend(files_confirmed)
+
+    for field, uuids in uuids_to_post_process.items():
+        for batch_uuids in chunks(list(dict.fromkeys(uuids)), settings.OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE):
+            field._post_processing(uuid_list=batch_uuids)
+
+    if files_to_declare_as_deleted:
+        osis_document_services.declare_remote_files_as_deleted(files_to_declare_as_deleted)
+
+
+def duplicate_documents(
+    queryset,
+    field_names: List[str],
+    with_modified_upload: bool = False,
+    upload_path_by_uuid: Optional[Dict[str, str]] = None,
+    chunk_size: int = 2000,
+    batch_size: int = None,
+) -> int:
+    """
+    Duplicate the documents of some file fields of all the instances of a queryset, and replace them in these
+    instances by the duplicated ones. The instances are streamed and updated by chunks of `chunk_size`, the documents
+    of a chunk being duplicated by concurrent batches of `batch_size` uuids (OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE by
+    default).
+    with_modified_upload, upload_path_by_uuid: see documents_remote_duplicate.
+    :return: the number of updated instances. The documents that could not be duplicated are left unchanged.
+    """
+    attnames = [queryset.model._meta.get_field(field_name).attname for field_name in field_names]
+    batch_size = batch_size or settings.OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE
+    updated_instances_count = 0
+
+    for instances in chunks(queryset.only('pk', *attnames).iterator(chunk_size=chunk_size), chunk_size):
+        uuids = list(
+            dict.fromkeys(
+                str(value)
+                for instance in instances
+                for attname in attnames
+                for value in getattr(instance, attname) or []
+            )
+        )
+        duplicated_uuids = {}
+        for batch_duplicated_uuids in map_concurrently(
+            lambda batch_uuids: osis_document_services.documents_remote_duplicate(
+                uuids=batch_uuids,
+                with_modified_upload=with_modified_upload,
+                upload_path_by_uuid=(
+                    {uuid: upload_path_by_uuid[uuid] for uuid in batch_uuids if uuid in upload_path_by_uuid}
+                    if upload_path_by_uuid
+                    else None
+                ),
+            ),
+            chunks(uuids, batch_size),
+        ):
+            duplicated_uuids.update(batch_duplicated_uuids)
+
+        not_duplicated_uuids = set(uuids) - set(duplicated_uuids)
+        if not_duplicated_uuids:
+            logger = logging.getLogger(settings.DEFAULT_LOGGER)
+            logger.error("The following documents could not be duplicated: {}".format(', '.join(not_duplicated_uuids)))
+
+        for instance in instances:
+            for attname in attnames:
+                setattr(
+                    instance,
+                    attname,
+                    [
+                        UUID(duplicated_uuids[str(value)]) if str(value) in duplicated_uuids else value
+                        for value in getattr(instance, attname) or []
+                    ],
+                )
+        queryset.model._base_manager.bulk_update(instances, attnames)
+        updated_instances_count += len(instances)
+
+    return updated_instances_count
+
+
+class FileFieldsModelMixin:
+    """
+    Model mixin confirming the uploads of all the file fields of the instance in one pass when saving it, instead of
+    one pass for each field (see confirm_file_fields).
+    """
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        confirm_file_fields(
+            [self],
+            [
+                field
+                for field in get_file_fields(type(self))
+                if update_fields is None or field.name in update_fields or field.attname in update_fields
+            ],
+        )
+        # The instance may be saved again while being saved (e.g. by a post_save receiver)
+        already_confirmed = self.__dict__.get('_file_fields_confirmed', False)
+        self._file_fields_confirmed = True
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            if not already_confirmed:
+                self.__dict__.pop('_file_fields_confirmed', None)
+
+
+class DocumentQuerySet(models.QuerySet):
+    """QuerySet confirming at once the uploads of the file fields of the objects created or updated in bulk."""
+
+    def bulk_create_with_documents(self, objs, *args, **kwargs):
+        """Confirm the uploads of all the file fields of the objects (see confirm_file_fields) and bulk create them."""
+        objs = list(objs)
+        confirm_file_fields(objs)
+        for obj in objs:
+            obj._file_fields_confirmed = True
+        try:
+            return self.bulk_create(objs, *args, **kwargs)
+        finally:
+            for obj in objs:
+                obj.__dict__.pop('_file_fields_confirmed', None)
+
+    def bulk_update_with_documents(self, objs, fields, *args, **kwargs):
+        """Confirm the uploads of the updated file fields of the objects and bulk update them."""
+        objs = list(objs)
+        confirm_file_fields(
+            objs,
+            [field for field in get_file_fields(self.model) if field.name in fields or field.attname in fields],
+        )
+        return self.bulk_update(objs, fields, *args, **kwargs)
+
+    def duplicate_documents(self, *field_names, **kwargs):
+        """Duplicate the documents of the file fields of the instances (see duplicate_documents)."""
+        return duplicate_documents(self, list(field_names), **kwargs)
+
+
+DocumentManager = models.Manager.from_queryset(DocumentQuerySet)
@@ -0,0 +1,73 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+from debug_toolbar.panels import Panel
+from django.utils.translation import gettext_lazy as _, ngettext
+
+from osis_document_components.profiling import record_calls
+
+
+class OsisDocumentPanel(Panel):
+    """
+    django-debug-toolbar panel listing the calls to the OSIS-Document services made during the request, to be added
+    to DEBUG_TOOLBAR_PANELS as 'osis_document_components.panels.OsisDocumentPanel'.
+    """
+
+    title = _('OSIS-Document')
+    template = 'osis_document_components/debug_panel.html'
+
+    @property
+    def nav_subtitle(self):
+        stats = self.get_stats()
+        count = len([call for call in stats.get('calls', []) if call['depth'] == 0])
+        return ngettext('%(count)d call in %(duration).1f ms', '%(count)d calls in %(duration).1f ms', count) % {
+            'count': count,
+            'duration': stats.get('total_duration', 0),
+        }
+
+    def process_request(self, request):
+        with record_calls() as self.recorder:
+            return super().process_request(request)
+
+    def generate_stats(self, request, response):
+        n_plus_one = self.recorder.get_n_plus_one()
+        self.record_stats(
+            {
+                'calls': [
+                    dict(
+                        call.as_dict(),
+                        duration=call.duration * 1000,
+                        n_plus_one=(call.service, call.call_site) in n_plus_one,
+                    )
+                    for call in self.recorder.calls
+                ],
+                'total_duration': self.recorder.total_duration * 1000,
+                'duplicates': sorted(self.recorder.get_duplicates().items()),
+                'n_plus_one': [
+                    {'service': service, 'call_site': call_site, 'count': count}
+                    for (service, call_site), count in n_plus_one.items()
+                ],
+            }
+        )
@@ -0,0 +1,253 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import contextlib
+import contextvars
+import functools
+import inspect
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+# Number of unbatched calls to the same service from the same call site from which they are reported as N+1
+N_PLUS_ONE_THRESHOLD = 3
+
+# Modules whose frames are not reported as call site
+_INTERNAL_MODULES = {
+    'osis_document_components.services',
+    'osis_document_components.profiling',
+    'osis_document_components.transport',
+    'osis_document_components.utils',
+}
+
+
+class ServiceCall:
+    """A call to a service, recorded while profiling."""
+
+    __slots__ = ('service', 'endpoints', 'batch_size', 'duration', 'cache', 'call_site', 'depth', 'key')
+
+    def __init__(self, service: str, batch_size: Optional[int], call_site: str, depth: int, key: int):
+        self.service = service
+        self.endpoints = []  # type: List[str]
+        self.batch_size = batch_size
+        self.duration = 0.0  # In seconds
+        self.cache = None  # type: Optional[str]  # e.g. 'hit', 'miss' or 'shared' (single-flight)
+        self.call_site = call_site
+        self.depth = depth  # 0 for the calls not made by another service
+        self.key = key  # Identical calls share the same key
+
+    def as_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class CallRecorder:
+    """Calls to the services recorded during a request (or any other block of code)."""
+
+    def __init__(self):
+        self.calls = []  # type: List[ServiceCall]
+
+    @property
+    def top_level_calls(self) -> List[ServiceCall]:
+        return [call for call in self.calls if call.depth == 0]
+
+    @property
+    def total_duration(self) -> float:
+        return sum(call.duration for call in self.top_level_calls)
+
+    def get_duplicates(self) -> Dict[str, int]:
+        """Return the number of identical calls by service, for the services called several times identically."""
+        counter = Counter((call.service, call.key) for call in self.top_level_calls)
+        duplicates = Counter()
+        for (service, _), count in counter.items():
+            if count > 1:
+                duplicates[service] += count - 1
+        return dict(duplicates)
+
+    def get_n_plus_one(self) -> Dict[tuple, int]:
+        """
+        Return the number of calls by (service, call site) for the unbatched services called at least
+        N_PLUS_ONE_THRESHOLD times from the same call site, which should probably be batched.
+        """
+        counter = Counter(
+            (call.service, call.call_site) for call in self.top_level_calls if call.batch_size in [None, 1]
+        )
+        return {key: count for key, count in counter.items() if count >= N_PLUS_ONE_THRESHOLD}
+
+
+_recorder = contextvars.ContextVar('osis_document_components_call_recorder', default=None)
+_current_call = contextvars.ContextVar('osis_document_components_current_call', default=None)
+
+
+@contextlib.contextmanager
+def record_calls() -> Iterator[CallRecorder]:
+    """Record the calls to the services made in this context (including in the threads of map_concurrently)."""
+    recorder = CallRecorder()
+    reset_token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(reset_token)
+
+
+def _get_call_site() -> str:
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module not in _INTERNAL_MODULES and not module.startswith(('concurrent.', 'threading', 'contextlib')):
+            return '{} ({}:{})'.format(frame.f_code.co_name, module, frame.f_lineno)
+        frame = frame.f_back
+    return ''
+
+
+def _get_call_key_part(value):
+    """Return a hashable equivalent of an argument, without copying or formatting its content."""
+    if isinstance(value, bytes):
+        # The content of the files (e.g. the uploaded ones) is only hashed, the hash of bytes being cached
+        return bytes, len(value), hash(value)
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(_get_call_key_part(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset, frozenset(_get_call_key_part(item) for item in value)
+    if isinstance(value, dict):
+        return dict, frozenset((key, _get_call_key_part(item)) for key, item in value.items())
+    try:
+        hash(value)
+    except TypeError:
+        # e.g. bytearray or file objects, only identical if they are the same object
+        return type(value), id(value)
+    return value
+
+
+def _get_call_key(args, kwargs) -> int:
+    return hash((_get_call_key_part(args), _get_call_key_part(kwargs)))
+
+
+def recorded(func=None, *, batch_argument: str = None):
+    """
+    Record the calls to a service while profiling (see record_calls).
+    batch_argument: the name of the argument holding the items of a batch service, to record the batch size.
+    """
+    if func is None:
+        return functools.partial(recorded, batch_argument=batch_argument)
+
+    signature = inspect.signature(func)
+
+    def start(args, kwargs):
+        batch_size = None
+        if batch_argument is not None:
+            items = signature.bind(*args, **kwargs).arguments.get(batch_argument)
+            with contextlib.suppress(TypeError):
+                batch_size = len(items)
+        parent = _current_call.get()
+        call = ServiceCall(
+            service=func.__name__,
+            batch_size=batch_size,
+            call_site=_get_call_site(),
+            depth=0 if parent is None else parent.depth + 1,
+            key=_get_call_key(args, kwargs),
+        )
+        _recorder.get().calls.append(call)
+        return call
+
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            if _recorder.get() is None:
+                return (yield from func(*args, **kwargs))
+            call = start(args, kwargs)
+            generator = func(*args, **kwargs)
+            while True:
+                # Only the time spent in the generator is recorded
+                reset_token = _current_call.set(call)
+                start_time = time.perf_counter()
+                try:
+                    item = next(generator)
+                except StopIteration as stop:
+                    return stop.value
+                finally:
+                    call.duration += time.perf_counter() - start_time
+                    _current_call.reset(reset_token)
+                yield item
+
+        return generator_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _recorder.get() is None:
+            return func(*args, **kwargs)
+        call = start(args, kwargs)
+        reset_token = _current_call.set(call)
+        start_time = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            call.duration = time.perf_counter() - start_time
+            _current_call.reset(reset_token)
+
+    return wrapper
+
+
+def note_cache(status: str):
+    """Note the cache status (e.g. 'hit' or 'miss') of the service being recorded, if any."""
+    call = _current_call.get()
+    if call is not None:
+        call.cache = status
+
+
+def note_request(url: str):
+    """Note the endpoint requested by the service being recorded, if any."""
+    call = _current_call.get()
+    if call is not None:
+        path = url[len(settings.OSIS_DOCUMENT_BASE_URL):] if url.startswith(settings.OSIS_DOCUMENT_BASE_URL) else url
+        # Without the tokens and uuids
+        call.endpoints.append(urlsplit(path).path.split('/')[0])
+
+
+class ServerTimingMiddleware:
+    """
+    Record the calls to the services made while handling a request and sum them up in the Server-Timing header of
+    the response, e.g. `osis-document;dur=123.4;desc="12 calls, 2 duplicates, 1 N+1"`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with record_calls() as recorder:
+            response = self.get_response(request)
+        if recorder.calls:
+            timing = 'osis-document;dur={:.1f};desc="{} calls, {} duplicates, {} N+1"'.format(
+                recorder.total_duration * 1000,
+                len(recorder.top_level_calls),
+                sum(recorder.get_duplicates().values()),
+                len(recorder.get_n_plus_one()),
+            )
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = '{}, {}'.format(existing, timing) if existing else timing
+        return response
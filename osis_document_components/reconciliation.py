@@ -0,0 +1,100 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import os
+import tempfile
+from typing import Iterable, Iterator, Union
+from uuid import UUID
+
+from osis_document_components.registry import get_registered_file_fields
+
+PARTITIONS_COUNT = 128  # Partitioned on the 7 first bits
+PACKED_UUID_SIZE = 16
+
+
+class PartitionedUUIDSet:
+    """
+    Set of uuids stored on disk as 16-byte packed values, partitioned on their first bits, so that it can hold tens of
+    millions of uuids while only loading one partition (about 1/128 of the uuids) in memory at once.
+    Must be used as a context manager to remove the temporary files.
+    """
+
+    def __init__(self):
+        self._directory = tempfile.TemporaryDirectory(prefix='osis-document-uuids-')
+        self._partitions = [
+            open(os.path.join(self._directory.name, '{:02x}'.format(prefix)), 'w+b')
+            for prefix in range(PARTITIONS_COUNT)
+        ]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        for partition in self._partitions:
+            partition.close()
+        self._directory.cleanup()
+
+    def add(self, value: Union[str, UUID]):
+        packed_uuid = (value if isinstance(value, UUID) else UUID(value)).bytes
+        self._partitions[packed_uuid[0] >> 1].write(packed_uuid)
+
+    def update(self, values: Iterable[Union[str, UUID]]):
+        for value in values:
+            self.add(value)
+
+    def iter_partition(self, prefix: int) -> Iterator[bytes]:
+        """Yield the packed uuids of a partition (possibly with duplicates)."""
+        partition = self._partitions[prefix]
+        partition.flush()
+        partition.seek(0)
+        while packed_uuids := partition.read(PACKED_UUID_SIZE * 4096):
+            for offset in range(0, len(packed_uuids), PACKED_UUID_SIZE):
+                yield packed_uuids[offset:offset + PACKED_UUID_SIZE]
+        partition.seek(0, os.SEEK_END)
+
+
+def iter_referenced_uuids(chunk_size: int = 2000) -> Iterator[UUID]:
+    """Stream the uuids stored in the file fields of all the installed models."""
+    for model, field in get_registered_file_fields():
+        values = model._base_manager.exclude(**{field.name: None}).values_list(field.name, flat=True)
+        for uuids in values.iterator(chunk_size=chunk_size):
+            yield from uuids
+
+
+def find_orphan_uuids(
+    server_uuids: Iterable[Union[str, UUID]],
+    referenced_uuids: Iterable[Union[str, UUID]],
+) -> Iterator[UUID]:
+    """Yield (once) each of the server uuids that is not referenced, with a bounded memory usage."""
+    with PartitionedUUIDSet() as server_set, PartitionedUUIDSet() as referenced_set:
+        server_set.update(server_uuids)
+        referenced_set.update(referenced_uuids)
+        for prefix in range(PARTITIONS_COUNT):
+            referenced_partition = set(referenced_set.iter_partition(prefix))
+            for packed_uuid in server_set.iter_partition(prefix):
+                if packed_uuid not in referenced_partition:
+                    # Do not yield duplicates
+                    referenced_partition.add(packed_uuid)
+                    yield UUID(bytes=packed_uuid)
@@ -0,0 +1,133 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import time
+from typing import Dict, Iterable, List, Optional, Union
+from uuid import UUID
+
+from django.conf import settings
+from django.core import signing
+
+from osis_document_components import services as osis_document_services
+from osis_document_components.utils import chunks
+
+REFERENCE_SALT = 'osis_document_components.references'
+
+
+def sign_reference(
+    uuid: Union[str, UUID],
+    wanted_post_process: str = None,
+    custom_ttl: int = None,
+    for_modified_upload: bool = False,
+    user=None,
+    scope: str = None,
+) -> str:
+    """
+    Return a signed reference allowing to get a reading token of a document, e.g. after the page load, so that the
+    rendered HTML does not contain short-lived tokens and can be cached. The reference only gives access to this
+    document, with these post-processing parameters, during OSIS_DOCUMENT_COMPONENTS_REFERENCE_MAX_AGE seconds (or
+    custom_ttl seconds if shorter), and only to the given authenticated user and/or to the callers resolving it with
+    the same scope: as it is a bearer credential, a reference bound to neither of them cannot be signed.
+    """
+    is_authenticated = user is not None and getattr(user, 'is_authenticated', False)
+    if not is_authenticated and not scope:
+        raise ValueError("A signed reference must be bound to an authenticated user or to a scope")
+    data = {'u': str(uuid), 'i': int(time.time())}
+    if wanted_post_process:
+        data['p'] = wanted_post_process
+    if custom_ttl:
+        data['t'] = custom_ttl
+    if for_modified_upload:
+        data['m'] = True
+    if is_authenticated:
+        data['a'] = user.pk
+    if scope:
+        data['s'] = scope
+    return signing.dumps(data, salt=REFERENCE_SALT, compress=True)
+
+
+def load_reference(reference: str, user=None, scope: str = None) -> Optional[dict]:
+    """
+    Return the data of a signed reference, or None if it is invalid, expired or not allowed to the user or to the
+    scope.
+    """
+    try:
+        data = signing.loads(
+            reference,
+            salt=REFERENCE_SALT,
+            max_age=settings.OSIS_DOCUMENT_COMPONENTS_REFERENCE_MAX_AGE,
+        )
+    except signing.BadSignature:
+        return None
+    if 'a' not in data and 's' not in data:
+        return None
+    if 'a' in data and (user is None or not getattr(user, 'is_authenticated', False) or data['a'] != user.pk):
+        return None
+    if 's' in data and data['s'] != scope:
+        return None
+    if 't' in data and time.time() - data['i'] > data['t']:
+        return None
+    return data
+
+
+def resolve_references(
+    references: Iterable[str],
+    user=None,
+    scope: str = None,
+) -> Dict[str, Union[str, dict, None]]:
+    """
+    Resolve signed references to reading tokens, in batch for the references sharing the same post-processing
+    parameters.
+    :return: a dictionary associating each reference to its token, to the post-processing status of the document (as
+    returned by get_remote_token, with its uuid and wanted_post_process) if it is still in progress, or to None if it
+    cannot be resolved.
+    """
+    references_by_params = {}  # type: Dict[tuple, List[tuple]]
+    results = {}
+    for reference in references:
+        data = load_reference(reference, user, scope)
+        results[reference] = None
+        if data is not None:
+            params = (data.get('p'), data.get('t'), data.get('m', False))
+            references_by_params.setdefault(params, []).append((reference, data['u']))
+
+    for (wanted_post_process, custom_ttl, for_modified_upload), items in references_by_params.items():
+        for batch in chunks(items, settings.OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE):
+            tokens = osis_document_services.get_remote_tokens(
+                list(dict.fromkeys(uuid for _, uuid in batch)),
+                wanted_post_process=wanted_post_process,
+                custom_ttl=custom_ttl,
+                for_modified_upload=for_modified_upload,
+            )
+            for reference, uuid in batch:
+                item = tokens.get(uuid)
+                if isinstance(item, dict) and item.get('token'):
+                    item = item['token']
+                if isinstance(item, dict) and 'error' not in item and 'status' in item:
+                    # The front end needs the document and the post-processing to follow its progress
+                    results[reference] = {**item, 'uuid': uuid, 'wanted_post_process': wanted_post_process}
+                elif isinstance(item, str):
+                    results[reference] = item
+    return results
@@ -0,0 +1,109 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import logging
+from typing import Iterable, List, NamedTuple, Tuple, Type, Union
+from uuid import UUID
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.db.models import Model
+
+from osis_document_components.fields import FileField
+from osis_document_components.models import get_file_fields
+
+_registered_file_fields = []  # type: List[Tuple[Type[Model], FileField]]
+
+
+class DocumentOwner(NamedTuple):
+    model: Type[Model]
+    field_name: str
+    pk: object
+
+
+def autodiscover():
+    """Register the file fields of all the installed models (done when the application is ready)."""
+    _registered_file_fields[:] = [
+        (model, field)
+        for model in apps.get_models()
+        if not model._meta.proxy
+        for field in get_file_fields(model)
+        if field.model is model
+    ]
+
+
+def has_gin_index(model: Type[Model], field: FileField) -> bool:
+    """Check if a GIN index, allowing to efficiently look for the uuids contained in the field, exists."""
+    return any(
+        isinstance(index, GinIndex) and index.fields == [field.name] and not index.condition
+        for index in model._meta.indexes
+    )
+
+
+def get_registered_file_fields(indexed_only=False) -> List[Tuple[Type[Model], FileField]]:
+    """
+    Return the registered models and file fields.
+    indexed_only: only return the file fields having a GIN index, e.g. `GinIndex(fields=['documents'])` in the
+    `indexes` of the model Meta.
+    """
+    return [
+        (model, field)
+        for model, field in _registered_file_fields
+        if not indexed_only or has_gin_index(model, field)
+    ]
+
+
+def find_owners(uuid_or_uuids: Union[str, UUID, Iterable[Union[str, UUID]]], indexed_only=True) -> List[DocumentOwner]:
+    """
+    Return the instances (model, field name and primary key) referencing at least one of the documents.
+    indexed_only: only look into the file fields having a GIN index, so that each lookup is an index scan. A warning
+    lists the skipped file fields, as the owners referencing the documents in them are not returned.
+    """
+    if isinstance(uuid_or_uuids, (str, UUID)):
+        uuid_or_uuids = [uuid_or_uuids]
+    uuids = [UUID(str(value)) for value in uuid_or_uuids]
+    if not uuids:
+        return []
+
+    file_fields = get_registered_file_fields(indexed_only=indexed_only)
+    if indexed_only:
+        skipped_fields = [
+            '{}.{}'.format(model._meta.label, field.name)
+            for model, field in get_registered_file_fields()
+            if (model, field) not in file_fields
+        ]
+        if skipped_fields:
+            logger = logging.getLogger(settings.DEFAULT_LOGGER)
+            logger.warning(
+                "The owners of the documents are not looked for in the following file fields, which have no GIN index "
+                "(use indexed_only=False to include them): {}".format(', '.join(skipped_fields))
+            )
+
+    return [
+        DocumentOwner(model=model, field_name=field.name, pk=pk)
+        for model, field in file_fields
+        for pk in model._base_manager.filter(**{'{}__overlap'.format(field.name): uuids}).values_list('pk', flat=True)
+    ]
@@ -0,0 +1,127 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import io
+from collections import OrderedDict
+
+from osis_document_components import services as osis_document_services
+
+
+class RemoteFile(io.RawIOBase):
+    """
+    Read-only and seekable file-like object giving access to the content of a remote file, which is lazily fetched by
+    blocks of `block_size` bytes with HTTP range requests: only the parts actually read are downloaded (e.g. the
+    header or the trailer of a PDF file). The last `max_cached_blocks` fetched blocks are kept in memory. If the server
+    does not support the range requests, the whole file is downloaded once and kept in memory.
+    """
+
+    def __init__(self, token: str, block_size: int = 64 * 1024, max_cached_blocks: int = 16):
+        super().__init__()
+        self.token = token
+        self.block_size = block_size
+        self.max_cached_blocks = max_cached_blocks
+        self._blocks = OrderedDict()
+        self._content = None
+        self._size = None
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            self._get_block(0)
+        if self._size is None:
+            raise OSError("The size of the remote file is unknown")
+        return self._size
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError("Invalid whence ({})".format(whence))
+        if position < 0:
+            raise ValueError("Negative seek position {}".format(position))
+        self._position = position
+        return position
+
+    def _get_block(self, index: int) -> bytes:
+        start = index * self.block_size
+        if self._content is not None:
+            return self._content[start:start + self.block_size]
+        if index in self._blocks:
+            self._blocks.move_to_end(index)
+            return self._blocks[index]
+
+        result = osis_document_services.get_raw_content_range_remotely(
+            self.token,
+            start=start,
+            end=start + self.block_size - 1,
+            slice_whole_file=False,
+        )
+        if result is None:
+            raise OSError("The remote file is not available")
+        block, size = result
+        if size is not None and len(block) == size:
+            # The whole file has been returned (e.g. as the range is not supported by the server)
+            self._content = block
+            self._size = size
+            self._blocks.clear()
+            return block[start:start + self.block_size]
+        if size is not None:
+            self._size = size
+        elif len(block) < self.block_size:
+            self._size = start + len(block)
+
+        self._blocks[index] = block
+        if len(self._blocks) > self.max_cached_blocks:
+            self._blocks.popitem(last=False)
+        return block
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast('B')
+        read_size = 0
+        while read_size < len(view):
+            if self._size is not None and self._position >= self._size:
+                break
+            index, offset = divmod(self._position, self.block_size)
+            data = self._get_block(index)[offset:offset + len(view) - read_size]
+            if not data:
+                break
+            view[read_size:read_size + len(data)] = data
+            read_size += len(data)
+            self._position += len(data)
+        return read_size
@@ -0,0 +1,106 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+from typing import Optional
+
+
+class DocumentMetadata:
+    """Compact metadata of a document, as returned by the opt-in compact batch services."""
+
+    __slots__ = ('name', 'mimetype', 'size', 'url', 'hash', 'uploaded_at', 'upload_uuid', 'extra')
+
+    def __init__(self, name=None, mimetype=None, size=None, url=None, hash=None, uploaded_at=None, upload_uuid=None,
+                 extra=None):
+        self.name = name  # type: Optional[str]
+        self.mimetype = mimetype  # type: Optional[str]
+        self.size = size  # type: Optional[int]
+        self.url = url  # type: Optional[str]
+        self.hash = hash  # type: Optional[str]
+        self.uploaded_at = uploaded_at  # type: Optional[str]
+        self.upload_uuid = upload_uuid  # type: Optional[str]
+        self.extra = extra  # type: Optional[dict]  # The other metadata, if any
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DocumentMetadata':
+        metadata = cls()
+        extra = None
+        for key, value in data.items():
+            if key in cls.__slots__ and key != 'extra':
+                setattr(metadata, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        metadata.extra = extra
+        return metadata
+
+    def get(self, key: str, default=None):
+        """Same as dict.get, to be used where the metadata dict were used."""
+        if key in self.__slots__ and key != 'extra':
+            value = getattr(self, key)
+            return default if value is None else value
+        return (self.extra or {}).get(key, default)
+
+    def __getitem__(self, key: str):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __eq__(self, other):
+        if not isinstance(other, DocumentMetadata):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self):
+        return '<DocumentMetadata {!r} ({}, {} bytes)>'.format(self.name, self.mimetype, self.size)
+
+
+class TokenResult:
+    """Result of the request of a reading token of a document, as returned by the opt-in compact batch services."""
+
+    __slots__ = ('uuid', 'token', 'error')
+
+    def __init__(self, uuid: str, token: str = None, error: str = None):
+        self.uuid = uuid
+        self.token = token
+        self.error = error  # The error code if the token could not be created
+
+    @classmethod
+    def from_item(cls, uuid: str, item) -> 'TokenResult':
+        if isinstance(item, dict):
+            return cls(uuid, token=item.get('token'), error=item.get('error'))
+        return cls(uuid, token=item)
+
+    def __bool__(self):
+        return self.token is not None and self.error is None
+
+    def __eq__(self, other):
+        if not isinstance(other, TokenResult):
+            return NotImplemented
+        return (self.uuid, self.token, self.error) == (other.uuid, other.token, other.error)
+
+    def __repr__(self):
+        return '<TokenResult {}: {}>'.format(self.uuid, self.error or 'ok')
@@ -23,9 +23,12 @@
 #  see http://www.gnu.org/licenses/.
 #
 # ##############################################################################
+from django.db import models
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 
+from osis_document_components import services as osis_document_services
+from osis_document_components.utils import get_file_url
 from osis_document_components.validators import TokenValidator
 
 
@@ -59,3 +62,78 @@ class FileField(serializers.ListField):
         super().__init__(*args, **kwargs)
         if not any(isinstance(validator, TokenValidator) for validator in self.validators):
             self.validators.append(TokenValidator(message=self.error_messages['invalid_token']))
+
+
+class DocumentField(serializers.Field):
+    """
+    Read-only representation of the documents of a model FileField as a list of reading tokens, file urls or
+    metadata (None for the documents that cannot be resolved).
+    To resolve the documents of all the serialized objects in batch instead of one by one, the parent serializer must
+    use DocumentListSerializer as `list_serializer_class`.
+    """
+
+    TOKEN = 'token'
+    URL = 'url'
+    METADATA = 'metadata'
+
+    def __init__(self, representation=TOKEN, wanted_post_process=None, custom_ttl=None, for_modified_upload=False,
+                 **kwargs):
+        assert representation in [self.TOKEN, self.URL, self.METADATA], 'Invalid representation'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.representation = representation
+        self.wanted_post_process = wanted_post_process
+        self.custom_ttl = custom_ttl
+        self.for_modified_upload = for_modified_upload
+        self._resolved = None
+
+    def resolve(self, uuids):
+        """Return a dictionary associating each of the uuids to its representation, resolved in batch."""
+        tokens = osis_document_services.get_remote_tokens_in_batches(
+            uuids,
+            wanted_post_process=self.wanted_post_process,
+            custom_ttl=self.custom_ttl,
+            for_modified_upload=self.for_modified_upload,
+        )
+        if self.representation == self.URL:
+            return {uuid: get_file_url(token) for uuid, token in tokens.items()}
+        if self.representation == self.METADATA:
+            metadata = osis_document_services.get_several_remote_metadata_in_batches(tokens.values())
+            return {uuid: metadata.get(token) for uuid, token in tokens.items()}
+        return tokens
+
+    def to_representation(self, value):
+        uuids = [str(uuid) for uuid in value or []]
+        resolved = self._resolved
+        if resolved is None or any(uuid not in resolved for uuid in uuids):
+            # Not serialized by a DocumentListSerializer
+            resolved = self.resolve(uuids) if uuids else {}
+        return [resolved.get(uuid) for uuid in uuids]
+
+
+class DocumentListSerializer(serializers.ListSerializer):
+    """
+    List serializer resolving the DocumentField fields of all the serialized objects (e.g. a page) in batch, before
+    serializing them.
+    """
+
+    def to_representation(self, data):
+        items = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(items)
+        document_fields = [field for field in self.child._readable_fields if isinstance(field, DocumentField)]
+        for field in document_fields:
+            uuids = set()
+            for item in items:
+                try:
+                    value = field.get_attribute(item)
+                except serializers.SkipField:
+                    continue
+                uuids.update(str(uuid) for uuid in value or [])
+            resolved = field.resolve(uuids) if uuids else {}
+            # The documents that cannot be resolved are not requested again one by one
+            field._resolved = {uuid: resolved.get(uuid) for uuid in uuids}
+        try:
+            return super().to_representation(items)
+        finally:
+            for field in document_fields:
+                field._resolved = None
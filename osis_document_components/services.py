@@ -23,16 +23,35 @@
 #    see http://www.gnu.org/licenses/.
 #
 # ##############################################################################
-from typing import Union, List, Dict, Iterable, Optional
+import asyncio
+import collections
+import contextlib
+import functools
+import hashlib
+import inspect
+import mmap
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Union, List, Dict, Iterable, Iterator, Optional, Tuple, Callable
 from uuid import UUID
 
-import requests
 from django.conf import settings
-from requests import HTTPError, Timeout
+from django.core.cache import caches
 
-from osis_document_components.enums import DocumentExpirationPolicy
+from osis_document_components.content_cache import get_content_cache
+from osis_document_components.enums import DocumentExpirationPolicy, PostProcessingStatus
 from osis_document_components.exceptions import SaveRawContentRemotelyException, FileInfectedException, \
-    UploadInvalidException, OsisDocumentTimeout
+    UploadInvalidException, OsisDocumentTimeout, OSISDocumentAPICallException, ConfirmRemoteUploadException, \
+    PostProcessingFailedException
+from osis_document_components.json_codec import get_json_codec
+from osis_document_components.profiling import note_cache, recorded
+from osis_document_components.results import DocumentMetadata, TokenResult
+from osis_document_components.transport import RequestsTransport, Transport, get_transport
+from osis_document_components.utils import chunks, iter_json_object_items, lazy_import, map_concurrently
+
+requests = lazy_import('requests')
 
 
 HTTP_200_OK = 200
@@ -41,38 +60,241 @@ HTTP_201_CREATED = 201
 HTTP_404_NOT_FOUND = 404
 HTTP_500_INTERNAL_SERVER_ERROR = 500
 HTTP_206_PARTIAL_CONTENT = 206
+HTTP_416_RANGE_NOT_SATISFIABLE = 416
+HTTP_502_BAD_GATEWAY = 502
+HTTP_503_SERVICE_UNAVAILABLE = 503
+HTTP_504_GATEWAY_TIMEOUT = 504
+
+JSON_CONTENT_TYPE = 'application/json'
+STREAMED_RESPONSE_CHUNK_SIZE = 64 * 1024
+_CANONICAL_UUID_PATTERN = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+
+RETRYABLE_STATUS_CODES = {HTTP_502_BAD_GATEWAY, HTTP_503_SERVICE_UNAVAILABLE, HTTP_504_GATEWAY_TIMEOUT}
+CONFIRM_REMOTE_UPLOAD_RETRY_BACKOFF = 0.5  # In seconds, doubled after each attempt
+UPLOAD_DEDUPLICATION_HASH_CHUNK_SIZE = 1024 * 1024
+WAIT_FOR_POST_PROCESSING_INITIAL_DELAY = 0.5  # In seconds, doubled after each poll
+WAIT_FOR_POST_PROCESSING_MAX_DELAY = 10
+WAIT_FOR_POST_PROCESSING_DEFAULT_TIMEOUT = 300  # In seconds
+
+_in_flight_calls = {}  # type: Dict[tuple, Future]
+_in_flight_calls_lock = threading.Lock()
+_deduplicated_upload_tokens = collections.OrderedDict()  # type: Dict[str, float]  # Expiration time by token
+_deduplicated_upload_tokens_lock = threading.Lock()
+
+
+def _single_flight(func=None, *, condition=None):
+    """
+    Make concurrent identical calls to a read-only service share the same in-flight request: the first caller does
+    the request, the other ones wait for it and receive the same result (or exception).
+    The result is shared between the callers and must therefore not be mutated.
+    condition: optional callable receiving the bound arguments of the call and returning whether the call can be
+    shared (e.g. only for reading tokens).
+    """
+    if func is None:
+        return functools.partial(_single_flight, condition=condition)
+
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not getattr(settings, 'OSIS_DOCUMENT_COMPONENTS_SINGLE_FLIGHT', True):
+            return func(*args, **kwargs)
+
+        bound_arguments = signature.bind(*args, **kwargs)
+        bound_arguments.apply_defaults()
+        if condition is not None and not condition(bound_arguments.arguments):
+            return func(*args, **kwargs)
+        key = (func.__qualname__, settings.OSIS_DOCUMENT_BASE_URL) + tuple(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in bound_arguments.arguments.items()
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+
+        with _in_flight_calls_lock:
+            future = _in_flight_calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = _in_flight_calls[key] = Future()
+
+        if not is_leader:
+            note_cache('shared')
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with _in_flight_calls_lock:
+                del _in_flight_calls[key]
+
+    return wrapper
+
+
+def _get_upload_deduplication_cache():
+    return caches[settings.OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION_CACHE]
+
+
+def _get_upload_deduplication_key(content: bytes, name: str, mimetype: str) -> str:
+    content_hash = hashlib.sha256()
+    with memoryview(content) as content_view:
+        for offset in range(0, len(content_view), UPLOAD_DEDUPLICATION_HASH_CHUNK_SIZE):
+            content_hash.update(content_view[offset:offset + UPLOAD_DEDUPLICATION_HASH_CHUNK_SIZE])
+    content_hash.update('\0{}\0{}'.format(name, mimetype).encode())
+    return 'osis_document_components:upload:{}'.format(content_hash.hexdigest())
+
+
+def _get_upload_deduplication_token_key(token: str) -> str:
+    return 'osis_document_components:upload-token:{}'.format(hashlib.sha256(token.encode()).hexdigest())
 
 
-def save_raw_content_remotely(content: bytes, name: str, mimetype: str):
-    """Save a raw file by sending it over the network."""
+@recorded
+def save_raw_content_remotely(
+    content: bytes,
+    name: str,
+    mimetype: str,
+    deduplicate: bool = None,
+    transport: Transport = None,
+):
+    """
+    Save a raw file by sending it over the network.
+    transport: optional transport used to send the request instead of the default one.
+    deduplicate: if enabled (OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION setting by default), the token of an
+    identical upload (same content, name and mimetype) done recently (see the
+    OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION_TTL setting) is returned instead of uploading the file again, as long
+    as this token is still valid and has not been confirmed. A token is reused at most once: it is claimed atomically
+    in the cache, so that among concurrent identical uploads only one gets it and the others upload their file. It is
+    meant for a caller uploading again a file whose upload it did not confirm (e.g. a retried job), as the uploader of
+    the token and the caller reusing it must not both confirm it.
+    """
+    if deduplicate is None:
+        deduplicate = settings.OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION
+
+    if deduplicate:
+        cache = _get_upload_deduplication_cache()
+        deduplication_key = _get_upload_deduplication_key(content, name, mimetype)
+        token = cache.get(deduplication_key)
+        # The deletion of the entry of the token only succeeds for one caller, even if the token has been registered
+        # again in the meantime, since the entry is specific to the token
+        if token and cache.delete(_get_upload_deduplication_token_key(token)):
+            cache.delete(deduplication_key)
+            if get_remote_metadata(token):
+                note_cache('hit')
+                return token
+        note_cache('miss')
+
     url = "{}request-upload".format(settings.OSIS_DOCUMENT_BASE_URL)
     data = {'file': (name, content, mimetype)}
 
     # Create the request
     try:
-        response = requests.post(
+        response = (transport or get_transport()).post(
             url,
             files=data,
             timeout=settings.OSIS_DOCUMENT_COMPONENTS_SAVE_RAW_CONTENT_REMOTELY_TIMEOUT
         )
-    except Timeout as exc:
+    except requests.Timeout as exc:
         raise OsisDocumentTimeout(str(exc)) from exc
 
     if response.status_code != 201:
         raise SaveRawContentRemotelyException(response)
-    return response.json().get('token')
+    token = response.json().get('token')
+
+    if deduplicate and token:
+        if not settings.OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION:
+            _register_deduplicated_upload(token)
+        _get_upload_deduplication_cache().set_many(
+            {
+                deduplication_key: token,
+                _get_upload_deduplication_token_key(token): deduplication_key,
+            },
+            timeout=settings.OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION_TTL,
+        )
+    return token
+
+
+@recorded(batch_argument='items')
+def save_several_raw_contents_remotely(
+    items: Iterable[Tuple[bytes, str, str]],
+    deduplicate: bool = None,
+    max_workers: int = None,
+) -> List[Union[str, Exception]]:
+    """
+    Save several raw files concurrently (OSIS_DOCUMENT_COMPONENTS_MAX_CONCURRENT_REQUESTS at once by default), over
+    pooled connections with the default requests transport.
+    items: the (content, name, mimetype) of each file.
+    :return: for each file, in the same order as the items, either its token or the exception raised when saving it
+    (e.g. SaveRawContentRemotelyException or OsisDocumentTimeout), so that an error does not stop the batch.
+    """
+    items = list(items)
+    max_workers = max_workers or settings.OSIS_DOCUMENT_COMPONENTS_MAX_CONCURRENT_REQUESTS
 
+    with contextlib.ExitStack() as stack:
+        transport = get_transport()
+        if type(transport) is RequestsTransport:
+            session = stack.enter_context(requests.Session())
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            transport = RequestsTransport(session)
 
+        def save(item):
+            content, name, mimetype = item
+            try:
+                return save_raw_content_remotely(content, name, mimetype, deduplicate=deduplicate, transport=transport)
+            except (OSISDocumentAPICallException, requests.RequestException) as exc:
+                return exc
+
+        return map_concurrently(save, items, max_workers=max_workers)
+
+
+def _register_deduplicated_upload(token: str):
+    """Remember the token of an upload deduplicated while the deduplication setting is disabled, until it expires."""
+    now = time.monotonic()
+    with _deduplicated_upload_tokens_lock:
+        # The tokens expire in the order they are registered
+        while _deduplicated_upload_tokens and next(iter(_deduplicated_upload_tokens.values())) <= now:
+            _deduplicated_upload_tokens.popitem(last=False)
+        _deduplicated_upload_tokens[token] = now + settings.OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION_TTL
+
+
+def _forget_deduplicated_upload(token: str):
+    """Prevent a confirmed upload to be reused by the deduplication of the uploads."""
+    with _deduplicated_upload_tokens_lock:
+        registered = _deduplicated_upload_tokens.pop(token, None) is not None
+    if not registered and not settings.OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION:
+        # Not produced by a deduplicated upload: no need to reach the cache
+        return
+    try:
+        cache = _get_upload_deduplication_cache()
+        token_key = _get_upload_deduplication_token_key(token)
+        deduplication_key = cache.get(token_key)
+        if deduplication_key:
+            cache.delete_many([deduplication_key, token_key])
+    except Exception as exc:  # The confirmation must not fail because of the cache
+        import logging
+        logger = logging.getLogger(settings.DEFAULT_LOGGER)
+        logger.warning("The deduplicated upload of a confirmed token could not be forgotten: {}".format(exc))
+
+
+@recorded
 def get_raw_content_remotely(token: str):
     """Given a token, return the file raw."""
     try:
-        response = requests.get(
+        response = get_transport().get(
             f"{settings.OSIS_DOCUMENT_BASE_URL}file/{token}",
             timeout=settings.OSIS_DOCUMENT_COMPONENTS_GET_RAW_CONTENT_REMOTELY_TIMEOUT
         )
-    except Timeout as exc:
+    except requests.Timeout as exc:
         raise OsisDocumentTimeout(str(exc)) from exc
-    except HTTPError:
+    except requests.HTTPError:
         return None
 
     if response.status_code is not HTTP_200_OK:
@@ -80,14 +302,127 @@ def get_raw_content_remotely(token: str):
     return response.content
 
 
+@recorded
+def open_raw_content_remotely(token: str) -> Optional['requests.Response']:
+    """
+    Given a token, return the response streaming the file raw, to be read with iter_content and closed, or None if the
+    file is not available.
+    """
+    try:
+        response = get_transport().get(
+            f"{settings.OSIS_DOCUMENT_BASE_URL}file/{token}",
+            timeout=settings.OSIS_DOCUMENT_COMPONENTS_GET_RAW_CONTENT_REMOTELY_TIMEOUT,
+            stream=True,
+        )
+    except requests.Timeout as exc:
+        raise OsisDocumentTimeout(str(exc)) from exc
+    except requests.HTTPError:
+        return None
+
+    if response.status_code != HTTP_200_OK:
+        response.close()
+        return None
+    return response
+
+
+@recorded
+def get_raw_content_range_remotely(
+    token: str,
+    start: int,
+    end: int = None,
+    slice_whole_file: bool = True,
+) -> Optional[Tuple[bytes, Optional[int]]]:
+    """
+    Given a token, return a byte range of the file raw (from start to end, both included, or to the end of the file if
+    end is not specified) and the total size of the file (None if unknown), or None if the file is not available.
+    slice_whole_file: if disabled, when the server does not support the ranges, the whole file is returned as is
+    instead of the range (its length is then the total size), so that the caller can keep it rather than downloading
+    it again for the next ranges.
+    """
+    try:
+        response = get_transport().get(
+            f"{settings.OSIS_DOCUMENT_BASE_URL}file/{token}",
+            headers={'Range': 'bytes={}-{}'.format(start, '' if end is None else end)},
+            timeout=settings.OSIS_DOCUMENT_COMPONENTS_GET_RAW_CONTENT_REMOTELY_TIMEOUT,
+        )
+    except requests.Timeout as exc:
+        raise OsisDocumentTimeout(str(exc)) from exc
+    except requests.HTTPError:
+        return None
+
+    if response.status_code == HTTP_206_PARTIAL_CONTENT:
+        # Content-Range: bytes <start>-<end>/<total size or *>
+        total_size = response.headers.get('Content-Range', '').rpartition('/')[2]
+        return response.content, int(total_size) if total_size.isdigit() else None
+    if response.status_code == HTTP_416_RANGE_NOT_SATISFIABLE:
+        total_size = response.headers.get('Content-Range', '').rpartition('/')[2]
+        return b'', int(total_size) if total_size.isdigit() else None
+    if response.status_code == HTTP_200_OK:
+        # The range is not supported, the whole file is returned
+        if not slice_whole_file:
+            return response.content, len(response.content)
+        return response.content[start:None if end is None else end + 1], len(response.content)
+    return None
+
+
+@recorded
+def get_raw_content_by_uuid(
+    uuid: Union[str, UUID],
+    wanted_post_process: str = None,
+    for_modified_upload: bool = False,
+    use_cache: bool = True,
+) -> Optional[Union[bytes, mmap.mmap]]:
+    """
+    Given an uuid, return the file raw (or None if it is not available).
+    If the OSIS_DOCUMENT_COMPONENTS_CONTENT_CACHE_DIR setting is defined, the contents are cached on disk by uuid and
+    post-processing (except the modified uploads, which can change).
+    :return: bytes, except for a content found in the cache, returned as a read-only mmap.mmap to avoid copying it. It
+    supports len, slicing, find and the buffer protocol, but is not bytes (e.g. it does not compare equal to bytes: use
+    content[:] to get bytes), and the mapping is released when it is closed or garbage collected.
+    """
+    cache = get_content_cache() if use_cache and not for_modified_upload else None
+    cache_key = _get_content_cache_key(uuid, wanted_post_process) if cache is not None else None
+    if cache_key is None:
+        cache = None
+    if cache is not None:
+        content = cache.get(cache_key)
+        if content is not None:
+            note_cache('hit')
+            return content
+        note_cache('miss')
+
+    token = get_remote_token(uuid, wanted_post_process=wanted_post_process, for_modified_upload=for_modified_upload)
+    if not isinstance(token, str) or token in [
+        UploadInvalidException.__class__.__name__,
+        FileInfectedException.__class__.__name__,
+    ]:
+        return None
+    content = get_raw_content_remotely(token)
+    if content is not None and cache is not None:
+        cache.set(cache_key, content)
+    return content
+
+
+def _get_content_cache_key(uuid: Union[str, UUID], wanted_post_process: Optional[str]) -> Optional[str]:
+    """Return the same key for all the forms of an uuid (e.g. upper case or UUID), or None if it is invalid."""
+    normalized_uuid = _normalize_uuid(uuid)
+    if normalized_uuid is None:
+        return None
+    if not _CANONICAL_UUID_PATTERN.fullmatch(normalized_uuid):
+        normalized_uuid = str(UUID(normalized_uuid))
+    return '{}:{}'.format(normalized_uuid.lower(), wanted_post_process or '')
+
+
+@recorded
+@_single_flight
 def get_remote_metadata(token: str) -> Union[dict, None]:
     """Given a token, return the remote metadata."""
     url = "{}metadata/{}".format(settings.OSIS_DOCUMENT_BASE_URL, token)
     try:
-        response = requests.get(url, timeout=settings.OSIS_DOCUMENT_COMPONENTS_GET_REMOTE_METADATA_TIMEOUT)
-    except Timeout as exc:
+        response = get_transport().get(url, timeout=settings.OSIS_DOCUMENT_COMPONENTS_GET_REMOTE_METADATA_TIMEOUT)
+    except requests.Timeout as exc:
         raise OsisDocumentTimeout(str(exc)) from exc
-    except HTTPError:
+    except requests.HTTPError:
         return None
 
     if response.status_code is not HTTP_200_OK:
@@ -95,25 +430,59 @@ def get_remote_metadata(token: str) -> Union[dict, None]:
     return response.json()
 
 
+@recorded(batch_argument='tokens')
+@_single_flight
 def get_several_remote_metadata(tokens: List[str]) -> Dict[str, dict]:
     """Given a list of tokens, return a dictionary associating each token to upload metadata."""
     url = "{}metadata".format(settings.OSIS_DOCUMENT_BASE_URL)
     try:
-        response = requests.post(
+        codec = get_json_codec()
+        response = get_transport().post(
             url,
-            json=tokens,
-            headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET},
+            data=codec.dumps(tokens),
+            headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET, 'Content-Type': JSON_CONTENT_TYPE},
             timeout=settings.OSIS_DOCUMENT_COMPONENTS_GET_REMOTE_METADATA_TIMEOUT,
         )
         if response.status_code == HTTP_200_OK:
-            return response.json()
-    except Timeout as exc:
+            return codec.loads(response.content)
+    except requests.Timeout as exc:
         raise OsisDocumentTimeout(str(exc)) from exc
-    except HTTPError:
+    except requests.HTTPError:
         pass
     return {}
 
 
+@recorded(batch_argument='tokens')
+def iter_remote_metadata(
+    tokens: List[str],
+    compact: bool = False,
+) -> Iterator[Tuple[str, Union[dict, DocumentMetadata]]]:
+    """
+    Same as get_several_remote_metadata, but yield the (token, metadata) pairs as they are parsed from the streamed
+    response, so that the memory usage does not depend on the number of tokens.
+    compact: if True, yield the metadata as DocumentMetadata instead of dicts.
+    """
+    url = "{}metadata".format(settings.OSIS_DOCUMENT_BASE_URL)
+    try:
+        response = get_transport().post(
+            url,
+            data=get_json_codec().dumps(tokens),
+            headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET, 'Content-Type': JSON_CONTENT_TYPE},
+            timeout=settings.OSIS_DOCUMENT_COMPONENTS_GET_REMOTE_METADATA_TIMEOUT,
+            stream=True,
+        )
+        with contextlib.closing(response):
+            if response.status_code == HTTP_200_OK:
+                for token, metadata in iter_json_object_items(response.iter_content(STREAMED_RESPONSE_CHUNK_SIZE)):
+                    yield token, DocumentMetadata.from_dict(metadata) if compact else metadata
+    except requests.Timeout as exc:
+        raise OsisDocumentTimeout(str(exc)) from exc
+    except requests.HTTPError:
+        pass
+
+
+@recorded
+@_single_flight(condition=lambda arguments: not arguments['write_token'])
 def get_remote_token(
     uuid: Union[str, UUID],
     write_token: bool = False,
@@ -138,7 +507,7 @@ def get_remote_token(
             uuid=validated_uuid,
         )
         try:
-            response = requests.post(
+            response = get_transport().post(
                 url,
                 json={
                     'uuid': validated_uuid,
@@ -158,12 +527,14 @@ def get_remote_token(
             ):
                 return FileInfectedException.__class__.__name__
             return json.get('token') or json
-        except Timeout as exc:
+        except requests.Timeout as exc:
             raise OsisDocumentTimeout(str(exc)) from exc
-        except HTTPError:
+        except requests.HTTPError:
             return None
 
 
+@recorded(batch_argument='uuids')
+@_single_flight
 def get_remote_tokens(
     uuids: List[str],
     wanted_post_process=None,
@@ -176,37 +547,127 @@ def get_remote_tokens(
     The wanted_post_process parameter is used to specify which post-processing action you want the output files for
     (example : PostProcessingWanted.CONVERT.name)
     """
-    validated_uuids = []
-    for uuid in uuids:
-        is_valid_uuid = __stringify_uuid_and_check_uuid_validity(uuid_input=uuid)
-        if is_valid_uuid.get('uuid_valid'):
-            validated_uuids.append(is_valid_uuid.get('uuid_stringify'))
-    if len(uuids) != len(validated_uuids):
-        raise TypeError
+    data = _get_remote_tokens_data(uuids, wanted_post_process, custom_ttl, for_modified_upload)
     url = "{base_url}read-tokens".format(base_url=settings.OSIS_DOCUMENT_BASE_URL)
     try:
-        data = {'uuids': validated_uuids, 'for_modified_upload': for_modified_upload}
-        if wanted_post_process:
-            data.update({'wanted_post_process': wanted_post_process})
-        if custom_ttl:
-            data.update({'custom_ttl': custom_ttl})
-        response = requests.post(
+        codec = get_json_codec()
+        response = get_transport().post(
             url,
-            json=data,
-            headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET},
+            data=codec.dumps(data),
+            headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET, 'Content-Type': JSON_CONTENT_TYPE},
             timeout=settings.OSIS_DOCUMENT_COMPONENTS_GET_REMOTE_TOKEN_TIMEOUT,
         )
         if response.status_code == HTTP_201_CREATED:
-            return {uuid: item.get('token') for uuid, item in response.json().items() if 'error' not in item}
+            return {
+                uuid: item.get('token') for uuid, item in codec.loads(response.content).items() if 'error' not in item
+            }
         if response.status_code in [HTTP_206_PARTIAL_CONTENT, HTTP_500_INTERNAL_SERVER_ERROR]:
-            return response.json()
-    except Timeout as exc:
+            return codec.loads(response.content)
+    except requests.Timeout as exc:
         raise OsisDocumentTimeout(str(exc)) from exc
-    except HTTPError:
+    except requests.HTTPError:
         pass
     return {}
 
 
+@recorded(batch_argument='uuids')
+def iter_remote_tokens(
+    uuids: List[str],
+    wanted_post_process=None,
+    custom_ttl=None,
+    for_modified_upload: bool = False,
+    compact: bool = False,
+) -> Iterator[Tuple[str, Union[str, dict, TokenResult]]]:
+    """
+    Same as get_remote_tokens, but yield the (uuid, token) pairs (or the (uuid, raw result) pairs in case of partial
+    success) as they are parsed from the streamed response, so that the memory usage does not depend on the number
+    of uuids.
+    compact: if True, yield (uuid, TokenResult) pairs instead, including the failed ones.
+    """
+    data = _get_remote_tokens_data(uuids, wanted_post_process, custom_ttl, for_modified_upload)
+    url = "{base_url}read-tokens".format(base_url=settings.OSIS_DOCUMENT_BASE_URL)
+    try:
+        response = get_transport().post(
+            url,
+            data=get_json_codec().dumps(data),
+            headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET, 'Content-Type': JSON_CONTENT_TYPE},
+            timeout=settings.OSIS_DOCUMENT_COMPONENTS_GET_REMOTE_TOKEN_TIMEOUT,
+            stream=True,
+        )
+        with contextlib.closing(response):
+            if response.status_code in [HTTP_201_CREATED, HTTP_206_PARTIAL_CONTENT, HTTP_500_INTERNAL_SERVER_ERROR]:
+                items = iter_json_object_items(response.iter_content(STREAMED_RESPONSE_CHUNK_SIZE))
+                if compact:
+                    for uuid, item in items:
+                        yield uuid, TokenResult.from_item(uuid, item)
+                elif response.status_code == HTTP_201_CREATED:
+                    for uuid, item in items:
+                        if 'error' not in item:
+                            yield uuid, item.get('token')
+                else:
+                    yield from items
+    except requests.Timeout as exc:
+        raise OsisDocumentTimeout(str(exc)) from exc
+    except requests.HTTPError:
+        pass
+
+
+def _get_remote_tokens_data(uuids, wanted_post_process, custom_ttl, for_modified_upload) -> dict:
+    validated_uuids = [_normalize_uuid(uuid) for uuid in uuids]
+    if None in validated_uuids:
+        raise TypeError
+    data = {'uuids': validated_uuids, 'for_modified_upload': for_modified_upload}
+    if wanted_post_process:
+        data.update({'wanted_post_process': wanted_post_process})
+    if custom_ttl:
+        data.update({'custom_ttl': custom_ttl})
+    return data
+
+
+@recorded(batch_argument='uuids')
+def get_remote_tokens_in_batches(
+    uuids: Iterable[Union[str, UUID]],
+    wanted_post_process=None,
+    custom_ttl=None,
+    for_modified_upload: bool = False,
+) -> Dict[str, str]:
+    """
+    Given uuids, return a dictionary associating each uuid to a reading token, requested by batches of
+    OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE uuids. The invalid uuids and the uuids without a valid token are not returned.
+    See get_remote_tokens for the other parameters.
+    """
+    # The invalid uuids are discarded so that they do not make the whole batch fail
+    valid_uuids = [uuid for uuid in dict.fromkeys(str(uuid) for uuid in uuids) if _normalize_uuid(uuid) is not None]
+    tokens = {}
+    for batch_uuids in chunks(valid_uuids, settings.OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE):
+        results = get_remote_tokens(
+            batch_uuids,
+            wanted_post_process=wanted_post_process,
+            custom_ttl=custom_ttl,
+            for_modified_upload=for_modified_upload,
+        )
+        # In case of partial success, the items are the raw results of the server
+        for uuid, item in results.items():
+            if isinstance(item, dict) and 'error' not in item:
+                item = item.get('token')
+            if isinstance(item, str) and item:
+                tokens[uuid] = item
+    return tokens
+
+
+@recorded(batch_argument='tokens')
+def get_several_remote_metadata_in_batches(tokens: Iterable[str]) -> Dict[str, dict]:
+    """
+    Given tokens, return a dictionary associating each token to upload metadata, requested by batches of
+    OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE tokens.
+    """
+    metadata = {}
+    for batch_tokens in chunks(dict.fromkeys(tokens), settings.OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE):
+        metadata.update(get_several_remote_metadata(batch_tokens))
+    return metadata
+
+
+@recorded(batch_argument='uuids')
 def documents_remote_duplicate(
     uuids: List[str],
     with_modified_upload: bool = False,
@@ -223,43 +684,61 @@ def documents_remote_duplicate(
     :return: dict {uuid: uuid} A dictionary associating each document uuid with the uuid of the duplicated document. If
     an error occurs for one specific document, the uuid of this document is not returned.
     """
-    validated_uuids = []
-
     # Check the validity of the uuids
-    for document_uuid in uuids:
-        is_valid_uuid = __stringify_uuid_and_check_uuid_validity(uuid_input=document_uuid)
-        if is_valid_uuid.get('uuid_valid'):
-            validated_uuids.append(is_valid_uuid.get('uuid_stringify'))
-
-    if len(uuids) != len(validated_uuids):
+    validated_uuids = [_normalize_uuid(document_uuid) for document_uuid in uuids]
+    if None in validated_uuids:
         raise TypeError
 
     url = "{base_url}duplicate".format(base_url=settings.OSIS_DOCUMENT_BASE_URL)
     try:
-        response = requests.post(
+        codec = get_json_codec()
+        response = get_transport().post(
             url,
-            json={
+            data=codec.dumps({
                 'uuids': validated_uuids,
                 'with_modified_upload': with_modified_upload,
                 'upload_path_by_uuid': upload_path_by_uuid,
-            },
-            headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET},
+            }),
+            headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET, 'Content-Type': JSON_CONTENT_TYPE},
             timeout=settings.OSIS_DOCUMENT_COMPONENTS_DOCUMENTS_REMOTE_DUPLICATE_TIMEOUT
         )
 
         if response.status_code == HTTP_201_CREATED:
             return {
                 original_uuid: item['upload_id']
-                for original_uuid, item in response.json().items()
+                for original_uuid, item in codec.loads(response.content).items()
                 if 'upload_id' in item
             }
-    except Timeout as exc:
+    except requests.Timeout as exc:
         raise OsisDocumentTimeout(str(exc)) from exc
-    except HTTPError:
+    except requests.HTTPError:
         pass
     return {}
 
 
+def build_confirm_upload_idempotency_key(token: str, field: str = '') -> str:
+    """
+    Derive the idempotency key of the confirmation of a token for a specific field, so that retrying the
+    confirmation of the same upload is recognized as such by the server.
+    """
+    return hashlib.sha256('{}:{}'.format(field, token).encode()).hexdigest()
+
+
+def build_related_model_data(related_model: Dict, related_model_instance=None) -> Dict:
+    """
+    Build the 'related_model' parameter of an upload confirmation, without altering the given one. If
+    'instance_filter_fields' are specified, the upload path is based on the values of these fields for the instance.
+    """
+    related_model_data = {key: value for key, value in related_model.items() if key != 'instance_filter_fields'}
+    instance_filter_fields = related_model.get('instance_filter_fields')
+    if instance_filter_fields and related_model_instance:
+        related_model_data['instance_filters'] = {
+            key: getattr(related_model_instance, key, None) for key in instance_filter_fields
+        }
+    return related_model_data
+
+
+@recorded
 def confirm_remote_upload(
     token,
     upload_to=None,
@@ -267,7 +746,17 @@ def confirm_remote_upload(
     document_expiration_policy=DocumentExpirationPolicy.NO_EXPIRATION.value,
     related_model=None,
     related_model_instance=None,
+    idempotency_key=None,
 ):
+    """
+    Confirm an upload and return the uuid of the created document, or raise ConfirmRemoteUploadException if the server
+    does not confirm it.
+    idempotency_key: if specified (see build_confirm_upload_idempotency_key), it is sent as Idempotency-Key header and
+    the confirmation is retried on transient failures (timeouts, connection errors and unavailability of the server)
+    up to OSIS_DOCUMENT_COMPONENTS_CONFIRM_REMOTE_UPLOAD_MAX_RETRIES times. The retries must only be enabled with a
+    server honouring this header, i.e. answering to a repeated confirmation with the uuid of the document created by
+    the first one.
+    """
     url = "{}confirm-upload/{}".format(settings.OSIS_DOCUMENT_BASE_URL, token)
     data = {}
     # Add facultative params
@@ -276,32 +765,64 @@ def confirm_remote_upload(
         data['upload_to'] = upload_to
     elif related_model:
         # The 'upload_to' property will be automatically computed in api side
-        instance_filter_fields = related_model.pop('instance_filter_fields', None)
-        if instance_filter_fields and related_model_instance:
-            # And will be based on a specific instance
-            related_model['instance_filters'] = {
-                key: getattr(related_model_instance, key, None) for key in instance_filter_fields
-            }
-        data['related_model'] = related_model
+        data['related_model'] = build_related_model_data(related_model, related_model_instance)
 
     if document_expiration_policy:
         data['document_expiration_policy'] = document_expiration_policy
     if metadata:
         data['metadata'] = metadata
 
+    _forget_deduplicated_upload(token)
+
+    headers = {'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET}
+    max_retries = 0
+    if idempotency_key:
+        headers['Idempotency-Key'] = idempotency_key
+        max_retries = getattr(settings, 'OSIS_DOCUMENT_COMPONENTS_CONFIRM_REMOTE_UPLOAD_MAX_RETRIES', 0)
+
+    for attempt in range(max_retries + 1):
+        is_last_attempt = attempt == max_retries
+        try:
+            # Do the request
+            response = get_transport().post(
+                url,
+                json=data,
+                headers=headers,
+                timeout=settings.OSIS_DOCUMENT_COMPONENTS_CONFIRM_REMOTE_UPLOAD_TIMEOUT,
+            )
+        except requests.Timeout as exc:
+            if is_last_attempt:
+                raise OsisDocumentTimeout(str(exc)) from exc
+        except requests.ConnectionError:
+            if is_last_attempt:
+                raise
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES or is_last_attempt:
+                return _get_confirmed_upload_uuid(response)
+        time.sleep(CONFIRM_REMOTE_UPLOAD_RETRY_BACKOFF * 2 ** attempt)
+
+
+def _get_confirmed_upload_uuid(response: 'requests.Response') -> str:
     try:
-        # Do the request
-        response = requests.post(
-            url,
-            json=data,
-            headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET},
-            timeout=settings.OSIS_DOCUMENT_COMPONENTS_CONFIRM_REMOTE_UPLOAD_TIMEOUT,
-        )
-    except Timeout as exc:
-        raise OsisDocumentTimeout(str(exc)) from exc
-    return response.json().get('uuid')
+        uuid = response.json().get('uuid') if response.status_code in (HTTP_200_OK, HTTP_201_CREATED) else None
+    except ValueError:
+        uuid = None
+    if not uuid:
+        raise ConfirmRemoteUploadException(response)
+    return uuid
+
+
+@recorded(batch_argument='uploads')
+def confirm_several_remote_uploads(uploads: List[Dict]) -> List[str]:
+    """
+    Confirm several uploads concurrently and return the uuids of the created documents, in the same order as the
+    uploads.
+    uploads: list of the parameters of confirm_remote_upload, one dict per upload.
+    """
+    return map_concurrently(lambda upload: confirm_remote_upload(**upload), uploads)
 
 
+@recorded(batch_argument='uuid_list')
 def launch_post_processing(
     uuid_list: List,
     async_post_processing: bool,
@@ -316,22 +837,23 @@ def launch_post_processing(
         'post_process_params': post_process_params,
     }
     try:
-        response = requests.post(
+        response = get_transport().post(
             url,
             json=data,
             headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET},
             timeout=settings.OSIS_DOCUMENT_COMPONENTS_LAUNCH_POST_PROCESSING_TIMEOUT,
         )
-    except Timeout as exc:
+    except requests.Timeout as exc:
         raise OsisDocumentTimeout(str(exc)) from exc
     return response.json() if not async_post_processing else response
 
 
+@recorded(batch_argument='uuid_list')
 def declare_remote_files_as_deleted(uuid_list: Iterable[UUID]):
     url = "{}declare-files-as-deleted".format(settings.OSIS_DOCUMENT_BASE_URL)
     data = {'files': [str(uuid) for uuid in uuid_list]}
     try:
-        response = requests.post(
+        response = get_transport().post(
             url,
             json=data,
             headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET},
@@ -342,12 +864,14 @@ def declare_remote_files_as_deleted(uuid_list: Iterable[UUID]):
             import logging
             logger = logging.getLogger(settings.DEFAULT_LOGGER)
             logger.error("An error occured when calling declare-files-as-deleted: {}".format(response.text))
-    except Timeout as exc:
+    except requests.Timeout as exc:
         import logging
         logger = logging.getLogger(settings.DEFAULT_LOGGER)
         logger.error("Timeout occurred when calling declare-files-as-deleted: {}".format(str(exc)))
 
 
+@recorded
+@_single_flight
 def get_progress_async_post_processing(uuid: str, wanted_post_process: str = None):
     """Given an uuid and a type of post-processing,
     returns an int corresponding to the post-processing progress percentage
@@ -359,33 +883,214 @@ def get_progress_async_post_processing(uuid: str, wanted_post_process: str = Non
         uuid=uuid,
     )
     try:
-        response = requests.post(
+        response = get_transport().post(
             url,
             json={'pk': uuid, 'wanted_post_process': wanted_post_process},
             headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET},
             timeout=settings.OSIS_DOCUMENT_COMPONENTS_GET_PROGRESS_ASYNC_POST_PROCESSING_TIMEOUT,
         )
-    except Timeout as exc:
+    except requests.Timeout as exc:
         raise OsisDocumentTimeout(str(exc)) from exc
     return response.json()
 
 
+def _get_progress_percentage(progress) -> float:
+    if isinstance(progress, dict):
+        progress = progress.get('progress')
+    return float(progress or 0)
+
+
+def _is_post_processing_failed(progress) -> bool:
+    if not isinstance(progress, dict):
+        return False
+    status = progress.get('status') or progress.get('post_process_status')
+    return bool(progress.get('error')) or status == PostProcessingStatus.FAILED.name
+
+
+class _PostProcessingPoller:
+    """
+    Process-wide poller of the async post-processing progress of the documents awaited by all the waiters: the pending
+    (uuid, wanted_post_process) entries are polled together, concurrently, in a single thread, so that the load on
+    the server does not depend on the number of waiters. The delay between two polls is doubled each time (from
+    WAIT_FOR_POST_PROCESSING_INITIAL_DELAY up to WAIT_FOR_POST_PROCESSING_MAX_DELAY) and reset when new documents are
+    awaited.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._subscribers = {}  # type: Dict[Tuple[str, Optional[str]], int]
+        self._progress = {}  # type: Dict[Tuple[str, Optional[str]], float]
+        self._failed = set()
+        self._errors = {}  # type: Dict[Tuple[str, Optional[str]], Exception]
+        self._round = 0
+        self._delay = WAIT_FOR_POST_PROCESSING_INITIAL_DELAY
+        self._thread = None  # type: Optional[threading.Thread]
+
+    def _get_pending_keys(self) -> List[Tuple[str, Optional[str]]]:
+        return [
+            key
+            for key in self._subscribers
+            if key not in self._failed and key not in self._errors and self._progress[key] < 100
+        ]
+
+    def subscribe(self, keys: List[Tuple[str, Optional[str]]]):
+        with self._condition:
+            new_keys = [key for key in keys if key not in self._subscribers]
+            for key in keys:
+                self._subscribers[key] = self._subscribers.get(key, 0) + 1
+                self._progress.setdefault(key, 0.0)
+            if new_keys:
+                # Poll the new documents without waiting for the delay of the others
+                self._delay = WAIT_FOR_POST_PROCESSING_INITIAL_DELAY
+                self._condition.notify_all()
+            if self._thread is None and self._get_pending_keys():
+                self._thread = threading.Thread(target=self._run, name='osis-document-post-processing', daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self, keys: List[Tuple[str, Optional[str]]]):
+        with self._condition:
+            for key in keys:
+                self._subscribers[key] -= 1
+                if not self._subscribers[key]:
+                    del self._subscribers[key], self._progress[key]
+                    self._failed.discard(key)
+                    self._errors.pop(key, None)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                keys = self._get_pending_keys()
+                if not keys:
+                    self._thread = None
+                    return
+            progresses = map_concurrently(self._poll, keys)
+            with self._condition:
+                for key, progress in zip(keys, progresses):
+                    if key not in self._subscribers:
+                        continue
+                    if isinstance(progress, Exception):
+                        self._errors[key] = progress
+                    elif _is_post_processing_failed(progress):
+                        self._failed.add(key)
+                    else:
+                        self._progress[key] = _get_progress_percentage(progress)
+                self._round += 1
+                self._condition.notify_all()
+                if self._get_pending_keys():
+                    delay = self._delay
+                    self._delay = min(self._delay * 2, WAIT_FOR_POST_PROCESSING_MAX_DELAY)
+                    self._condition.wait(delay)
+
+    @staticmethod
+    def _poll(key):
+        try:
+            return get_progress_async_post_processing(*key)
+        except Exception as exc:  # Raised to the waiters of this document
+            return exc
+
+    def wait(
+        self,
+        keys: List[Tuple[str, Optional[str]]],
+        timeout: Optional[float],
+        on_progress: Optional[Callable[[Dict[str, float]], None]],
+    ) -> Dict[str, float]:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            last_round = self._round
+        while True:
+            with self._condition:
+                errors = [self._errors[key] for key in keys if key in self._errors]
+                failed_uuids = [key[0] for key in keys if key in self._failed]
+                progress_by_uuid = {key[0]: self._progress[key] for key in keys}
+                polled = self._round != last_round
+                last_round = self._round
+            if errors:
+                raise errors[0]
+            if failed_uuids:
+                raise PostProcessingFailedException(failed_uuids)
+            if polled and on_progress is not None:
+                on_progress(dict(progress_by_uuid))
+            pending_uuids = [uuid for uuid, progress in progress_by_uuid.items() if progress < 100]
+            if not pending_uuids:
+                return progress_by_uuid
+
+            with self._condition:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise OsisDocumentTimeout(
+                        'Post-processing of {} document(s) still pending after {}s'.format(len(pending_uuids), timeout)
+                    )
+                self._condition.wait_for(lambda: self._round != last_round, remaining)
+
+
+_post_processing_poller = _PostProcessingPoller()
+
+
+@recorded(batch_argument='uuids')
+def wait_for_post_processing(
+    uuids: Iterable[Union[str, UUID]],
+    wanted_post_process: str = None,
+    timeout: Optional[float] = WAIT_FOR_POST_PROCESSING_DEFAULT_TIMEOUT,
+    on_progress: Callable[[Dict[str, float]], None] = None,
+) -> Dict[str, float]:
+    """
+    Wait until the async post-processing of several documents is done (i.e. their progress reaches 100%).
+    The documents are polled by a process-wide poller (see _PostProcessingPoller), shared by all the waiters, whatever
+    the moment they started to wait.
+    on_progress: optional callable receiving the progress percentage by uuid after each poll.
+    timeout: in seconds, None to wait without limit.
+    :return: the progress percentage by uuid
+    :raise OsisDocumentTimeout: if the post-processing is not done after timeout seconds
+    :raise PostProcessingFailedException: if the post-processing of some documents failed
+    """
+    keys = list(dict.fromkeys((str(uuid), wanted_post_process) for uuid in uuids))
+    _post_processing_poller.subscribe(keys)
+    try:
+        return _post_processing_poller.wait(keys, timeout, on_progress)
+    finally:
+        _post_processing_poller.unsubscribe(keys)
+
+
+async def async_wait_for_post_processing(*args, **kwargs) -> Dict[str, float]:
+    """Asynchronous version of wait_for_post_processing, which runs in a separate thread."""
+    return await asyncio.to_thread(wait_for_post_processing, *args, **kwargs)
+
+
+@recorded
 def change_remote_metadata(token, metadata):
     """Update metadata of a remote document and return the updated metadata if successful."""
     url = "{}change-metadata/{}".format(settings.OSIS_DOCUMENT_BASE_URL, token)
 
     try:
-        response = requests.post(
+        response = get_transport().post(
             url=url,
             json=metadata,
             headers={'X-Api-Key': settings.OSIS_DOCUMENT_API_SHARED_SECRET},
             timeout=settings.OSIS_DOCUMENT_COMPONENTS_CHANGE_REMOTE_METADATA_TIMEOUT,
         )
-    except Timeout as exc:
+    except requests.Timeout as exc:
         raise OsisDocumentTimeout(str(exc)) from exc
     return response.json()
 
 
+def _normalize_uuid(uuid_input: Union[str, UUID]) -> Optional[str]:
+    """
+    Same as __stringify_uuid_and_check_uuid_validity, but return the stringified uuid (or None if it is invalid)
+    without building intermediate objects for the canonical string uuids, for the batches.
+    """
+    if type(uuid_input) is str and _CANONICAL_UUID_PATTERN.fullmatch(uuid_input):
+        return uuid_input
+    if isinstance(uuid_input, UUID):
+        return str(uuid_input)
+    if not isinstance(uuid_input, str):
+        raise TypeError
+    try:
+        UUID(uuid_input)
+    except ValueError:
+        return None
+    return uuid_input
+
+
 def __stringify_uuid_and_check_uuid_validity(uuid_input: Union[str, UUID]) -> Dict[str, Union[str, bool]]:
     """
     Checks the validity of an uuid and converts it to a string if necessary
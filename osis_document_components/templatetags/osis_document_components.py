@@ -25,8 +25,12 @@
 # ##############################################################################
 from django import template
 from django.conf import settings
+from django.middleware.csrf import get_token
+from django.urls import reverse
 
 from osis_document_components.enums import PostProcessingWanted, PostProcessingStatus
+from osis_document_components.lazy import LazyFileUrl, LazyMetadata
+from osis_document_components.references import sign_reference
 from osis_document_components.utils import get_file_url as utils_get_file_url
 from osis_document_components import services as osis_document_services
 
@@ -34,8 +38,38 @@ from osis_document_components import services as osis_document_services
 register = template.Library()
 
 
-@register.inclusion_tag('osis_document_components/visualizer.html')
-def document_visualizer(values, wanted_post_process=None, for_modified_upload=False):
+def _get_reference_user(context):
+    """Return the authenticated user the signed references of the rendered page are bound to, if any."""
+    if not settings.OSIS_DOCUMENT_COMPONENTS_SIGNED_REFERENCES:
+        return None
+    user = getattr(context.get('request'), 'user', None)
+    return user if user is not None and user.is_authenticated else None
+
+
+@register.inclusion_tag('osis_document_components/visualizer.html', takes_context=True)
+def document_visualizer(context, values, wanted_post_process=None, for_modified_upload=False):
+    user = _get_reference_user(context)
+    if user is not None:
+        # The references are resolved to tokens by the front end, after the page load, with the CSRF token of the
+        # cookie rather than of the rendered HTML (which can then be cached): make sure the cookie is set
+        get_token(context['request'])
+        is_merge = wanted_post_process == PostProcessingWanted.MERGE.name
+        return {
+            'values': [
+                sign_reference(
+                    value,
+                    wanted_post_process=wanted_post_process,
+                    for_modified_upload=for_modified_upload,
+                    user=user,
+                )
+                # As with tokens, the merge result is the one of the first document
+                for value in (list(values)[:1] if is_merge else values)
+            ],
+            'wanted_post_process': wanted_post_process or '',
+            'post_process_status': PostProcessingStatus.DONE.name if is_merge else '',
+            'base_url': settings.OSIS_DOCUMENT_BASE_URL,
+            'references_url': reverse('osis_document_components:resolve-references'),
+        }
     tokens = []
     for value in values:
         token = osis_document_services.get_remote_token(
@@ -82,6 +116,8 @@ def document_editor(value, for_modified_upload=False, **attrs):
 
 @register.simple_tag
 def get_metadata(uuid, wanted_post_process=None, custom_ttl=None, for_modified_upload=False):
+    if settings.OSIS_DOCUMENT_COMPONENTS_LAZY_TEMPLATE_TAGS:
+        return LazyMetadata(uuid, wanted_post_process, custom_ttl, for_modified_upload)
     return osis_document_services.get_remote_metadata(
         osis_document_services.get_remote_token(
             uuid=uuid,
@@ -92,8 +128,20 @@ def get_metadata(uuid, wanted_post_process=None, custom_ttl=None, for_modified_u
     )
 
 
-@register.simple_tag
-def get_file_url(uuid, wanted_post_process=None, custom_ttl=None, for_modified_upload=False):
+@register.simple_tag(takes_context=True)
+def get_file_url(context, uuid, wanted_post_process=None, custom_ttl=None, for_modified_upload=False):
+    user = _get_reference_user(context)
+    if user is not None:
+        reference = sign_reference(
+            uuid,
+            wanted_post_process=wanted_post_process,
+            custom_ttl=custom_ttl,
+            for_modified_upload=for_modified_upload,
+            user=user,
+        )
+        return reverse('osis_document_components:reference-file', kwargs={'reference': reference})
+    if settings.OSIS_DOCUMENT_COMPONENTS_LAZY_TEMPLATE_TAGS:
+        return LazyFileUrl(uuid, wanted_post_process, custom_ttl, for_modified_upload)
     return utils_get_file_url(
         osis_document_services.get_remote_token(
             uuid=uuid,
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+import osis_document_components.fields
+import osis_document_components.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('document_test', '0004_testdocument_documents_expirables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestDocumentWithFileFieldsMixin',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('documents', osis_document_components.fields.FileField(base_field=models.UUIDField(), blank=True, default=list, size=None)),
+                ('other_documents', osis_document_components.fields.FileField(base_field=models.UUIDField(), blank=True, default=list, size=None)),
+            ],
+            bases=(osis_document_components.models.FileFieldsModelMixin, models.Model),
+        ),
+    ]
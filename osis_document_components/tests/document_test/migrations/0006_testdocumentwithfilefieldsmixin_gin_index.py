@@ -0,0 +1,16 @@
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('document_test', '0005_testdocumentwithfilefieldsmixin'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testdocumentwithfilefieldsmixin',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['documents'], name='test_documents_gin_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
 from osis_document_components.fields import FileField
+from osis_document_components.models import DocumentManager, FileFieldsModelMixin
 from osis_document_components.enums import DocumentExpirationPolicy
 
 
@@ -16,3 +18,13 @@ class TestDocument(models.Model):
         upload_to="path/",
         document_expiration_policy=DocumentExpirationPolicy.EXPORT_EXPIRATION_POLICY.value,
     )
+
+
+class TestDocumentWithFileFieldsMixin(FileFieldsModelMixin, models.Model):
+    documents = FileField(blank=True, upload_to="path/")
+    other_documents = FileField(blank=True, upload_to=compute_upload_to)
+
+    objects = DocumentManager()
+
+    class Meta:
+        indexes = [GinIndex(fields=['documents'], name='test_documents_gin_idx')]
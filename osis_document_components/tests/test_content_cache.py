@@ -0,0 +1,107 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import os
+import tempfile
+import time
+import uuid
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from osis_document_components import services
+from osis_document_components.content_cache import ContentDiskCache
+
+
+class ContentDiskCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_get_and_set(self):
+        cache = ContentDiskCache(self.directory, max_size=1024)
+        self.assertIsNone(cache.get('key'))
+
+        cache.set('key', b'content')
+        content = cache.get('key')
+        self.assertEqual(content[:], b'content')
+        self.assertEqual(len(content), 7)
+        cache.set('empty', b'')
+        self.assertEqual(cache.get('empty'), b'')
+
+        # The cache is shared between instances
+        self.assertEqual(ContentDiskCache(self.directory, max_size=1024).get('key')[:], b'content')
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ContentDiskCache(self.directory, max_size=30)
+        for index, key in enumerate(['first', 'second', 'third']):
+            cache.set(key, b'0123456789')
+            path = cache._get_path(key)
+            os.utime(path, (time.time() - 100 + index, time.time() - 100 + index))
+        cache.get('first')
+
+        cache.set('fourth', b'0123456789')
+
+        self.assertIsNotNone(cache.get('first'))
+        self.assertIsNone(cache.get('second'))
+        self.assertIsNotNone(cache.get('fourth'))
+
+
+class GetRawContentByUuidTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(OSIS_DOCUMENT_COMPONENTS_CONTENT_CACHE_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    @patch('osis_document_components.services.get_raw_content_remotely', return_value=b'content')
+    @patch('osis_document_components.services.get_remote_token', return_value='a:token')
+    def test_content_is_cached_by_uuid_and_post_processing(self, get_remote_token, get_raw_content_remotely):
+        document_uuid = '8620708e-13fe-437d-9193-edb37e46055d'
+        self.assertEqual(services.get_raw_content_by_uuid(document_uuid), b'content')
+        self.assertEqual(services.get_raw_content_by_uuid(document_uuid)[:], b'content')
+        self.assertEqual(get_raw_content_remotely.call_count, 1)
+
+        services.get_raw_content_by_uuid(document_uuid, wanted_post_process='CONVERT')
+        services.get_raw_content_by_uuid(document_uuid, use_cache=False)
+        services.get_raw_content_by_uuid(document_uuid, for_modified_upload=True)
+        self.assertEqual(get_raw_content_remotely.call_count, 4)
+
+    @patch('osis_document_components.services.get_raw_content_remotely', return_value=b'content')
+    @patch('osis_document_components.services.get_remote_token', return_value='a:token')
+    def test_all_forms_of_an_uuid_share_the_cache(self, get_remote_token, get_raw_content_remotely):
+        document_uuid = uuid.UUID('8620708e-13fe-437d-9193-edb37e46055d')
+        for value in [document_uuid, str(document_uuid).upper(), document_uuid.hex]:
+            with self.subTest(value=value):
+                self.assertEqual(services.get_raw_content_by_uuid(value)[:], b'content')
+        self.assertEqual(get_raw_content_remotely.call_count, 1)
+
+    @patch('osis_document_components.services.get_raw_content_remotely')
+    @patch('osis_document_components.services.get_remote_token', return_value={'status': 'PENDING'})
+    def test_unavailable_content(self, get_remote_token, get_raw_content_remotely):
+        self.assertIsNone(services.get_raw_content_by_uuid('8620708e-13fe-437d-9193-edb37e46055d'))
+        get_raw_content_remotely.assert_not_called()
@@ -0,0 +1,95 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import uuid
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.deletion import Collector
+from django.test import TestCase, override_settings
+
+from osis_document_components import deletion
+from osis_document_components.tests.document_test.models import TestDocument, TestDocumentWithFileFieldsMixin
+
+
+@patch('osis_document_components.services.declare_remote_files_as_deleted')
+class DeletionTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        deletion.connect_signals()
+        cls.addClassCleanup(deletion.disconnect_signals)
+
+    def test_documents_of_deleted_instance_are_declared_as_deleted_on_commit(self, declare_remote_files_as_deleted):
+        documents = [uuid.uuid4(), uuid.uuid4()]
+        instance = TestDocument.objects.create(documents=documents[:1], other_documents=documents[1:])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            instance.delete()
+            declare_remote_files_as_deleted.assert_not_called()
+
+        declare_remote_files_as_deleted.assert_called_once()
+        self.assertCountEqual(declare_remote_files_as_deleted.call_args.args[0], documents)
+
+    @override_settings(OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE=5)
+    def test_queryset_deletion_is_declared_in_batches(self, declare_remote_files_as_deleted):
+        documents = [uuid.uuid4() for _ in range(12)]
+        TestDocument.objects.bulk_create(TestDocument(documents=[document]) for document in documents[:6])
+        TestDocumentWithFileFieldsMixin.objects.bulk_create(
+            TestDocumentWithFileFieldsMixin(documents=[document]) for document in documents[6:]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TestDocument.objects.all().delete()
+            TestDocumentWithFileFieldsMixin.objects.all().delete()
+
+        self.assertEqual(declare_remote_files_as_deleted.call_count, 3)
+        declared_uuids = [value for call in declare_remote_files_as_deleted.call_args_list for value in call.args[0]]
+        self.assertCountEqual(declared_uuids, documents)
+
+    def test_rolled_back_deletion_is_not_declared(self, declare_remote_files_as_deleted):
+        deleted_document, kept_document = uuid.uuid4(), uuid.uuid4()
+        deleted_instance = TestDocument.objects.create(documents=[deleted_document])
+        kept_instance = TestDocument.objects.create(documents=[kept_document])
+        kept_instance_pk = kept_instance.pk
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted_instance.delete()
+            try:
+                with transaction.atomic():
+                    kept_instance.delete()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        declare_remote_files_as_deleted.assert_called_once_with([deleted_document])
+        self.assertTrue(TestDocument.objects.filter(pk=kept_instance_pk).exists())
+
+
+class DisabledDeletionTestCase(TestCase):
+    def test_fast_deletes_are_kept_when_disabled(self):
+        self.assertFalse(settings.OSIS_DOCUMENT_COMPONENTS_DECLARE_FILES_AS_DELETED_ON_DELETE)
+        self.assertTrue(Collector(using='default', origin=None).can_fast_delete(TestDocument.objects.all()))
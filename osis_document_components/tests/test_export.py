@@ -0,0 +1,173 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import io
+import tempfile
+import threading
+import uuid
+import zipfile
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from osis_document_components.exceptions import OsisDocumentTimeout
+from osis_document_components.export import documents_zip_response, iter_documents_zip
+from osis_document_components.tests.document_test.models import TestDocument
+
+
+@override_settings(OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/', OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE=2)
+class ExportTestCase(TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.documents = [uuid.uuid4() for _ in range(3)]
+        self.instances = [
+            TestDocument.objects.create(documents=self.documents[:2]),
+            TestDocument.objects.create(documents=self.documents[2:], other_documents=self.documents[:1]),
+        ]
+        patcher = patch(
+            'osis_document_components.services.get_remote_tokens',
+            side_effect=lambda uuids, **_: {document_uuid: 'token-' + document_uuid for document_uuid in uuids},
+        )
+        self.get_remote_tokens = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch(
+            'osis_document_components.services.get_several_remote_metadata',
+            side_effect=lambda tokens: {token: {'name': 'file.pdf'} for token in tokens},
+        )
+        self.get_several_remote_metadata = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.open_responses = set()
+        self.max_open_responses = 0
+        patcher = patch(
+            'osis_document_components.services.open_raw_content_remotely',
+            side_effect=self.open_raw_content_remotely,
+        )
+        self.open_raw_content_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def open_raw_content_remotely(self, token):
+        response = MagicMock()
+        response.iter_content.return_value = [token[:6].encode(), token[6:].encode()]
+        response.__exit__.side_effect = lambda *args: self.open_responses.discard(token)
+        with self.lock:
+            self.open_responses.add(token)
+            self.max_open_responses = max(self.max_open_responses, len(self.open_responses))
+        return response
+
+    def test_iter_documents_zip(self):
+        data = b''.join(
+            iter_documents_zip(TestDocument.objects.order_by('pk'), ['documents', 'other_documents'], chunk_size=1)
+        )
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            pk_1, pk_2 = self.instances[0].pk, self.instances[1].pk
+            self.assertEqual(
+                archive.namelist(),
+                [
+                    '{}/documents/file.pdf'.format(pk_1),
+                    '{}/documents/file-1.pdf'.format(pk_1),
+                    '{}/documents/file.pdf'.format(pk_2),
+                    '{}/other_documents/file.pdf'.format(pk_2),
+                ],
+            )
+            self.assertEqual(
+                archive.read('{}/documents/file-1.pdf'.format(pk_1)),
+                'token-{}'.format(self.documents[1]).encode(),
+            )
+        self.assertEqual(self.get_remote_tokens.call_count, 2)
+        self.assertEqual(self.get_several_remote_metadata.call_count, 2)
+
+    def test_documents_which_cannot_be_downloaded_are_skipped(self):
+        self.open_raw_content_mock.side_effect = None
+        self.open_raw_content_mock.return_value = None
+        data = b''.join(iter_documents_zip(TestDocument.objects.all(), ['documents']))
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertEqual(archive.namelist(), [])
+
+    def test_download_errors_do_not_abort_the_archive(self):
+        failing_token, interrupted_token = ('token-{}'.format(document) for document in self.documents[:2])
+
+        def open_raw_content_remotely(token):
+            if token == failing_token:
+                raise OsisDocumentTimeout('timeout')
+            response = self.open_raw_content_remotely(token)
+            if token == interrupted_token:
+                response.iter_content.return_value = self.iter_interrupted_content(token)
+            return response
+
+        self.open_raw_content_mock.side_effect = open_raw_content_remotely
+        with self.assertLogs(level='WARNING') as logs:
+            data = b''.join(iter_documents_zip(TestDocument.objects.order_by('pk'), ['documents']))
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            pk_1, pk_2 = self.instances[0].pk, self.instances[1].pk
+            self.assertEqual(
+                archive.namelist(),
+                ['{}/documents/file.pdf'.format(pk_1), '{}/documents/file.pdf'.format(pk_2)],
+            )
+            self.assertEqual(archive.read('{}/documents/file.pdf'.format(pk_1)), interrupted_token[:6].encode())
+        self.assertEqual(len(logs.records), 2)
+
+    @staticmethod
+    def iter_interrupted_content(token):
+        yield token[:6].encode()
+        raise requests.ConnectionError('connection lost')
+
+    def test_downloads_in_progress_are_bounded(self):
+        documents = [uuid.uuid4() for _ in range(6)]
+        TestDocument.objects.create(documents=documents)
+        data = b''.join(iter_documents_zip(TestDocument.objects.all(), ['documents'], max_workers=2))
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertEqual(len(archive.namelist()), 9)
+            self.assertEqual(archive.read(archive.namelist()[-1]), 'token-{}'.format(documents[-1]).encode())
+        self.assertLessEqual(self.max_open_responses, 2)
+        self.assertEqual(self.open_responses, set())
+
+    def test_documents_zip_response(self):
+        response = documents_zip_response(TestDocument.objects.all(), ['documents'], filename='export.zip')
+
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="export.zip"')
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(len(archive.namelist()), 3)
+
+    def test_export_command(self):
+        with tempfile.NamedTemporaryFile(suffix='.zip') as output:
+            call_command(
+                'export_documents',
+                'document_test.TestDocument',
+                'documents',
+                '--pk',
+                self.instances[1].pk,
+                '--output',
+                output.name,
+            )
+            archive = zipfile.ZipFile(output.name)
+
+        with archive:
+            self.assertEqual(archive.namelist(), ['{}/documents/file.pdf'.format(self.instances[1].pk)])
@@ -27,13 +27,14 @@ import uuid
 from unittest.mock import patch
 
 from django.core.exceptions import ValidationError
+from django.db.models.signals import post_save
 from django.forms import modelform_factory
 from django.test import TestCase, override_settings
 from django.utils.translation import gettext as _
 
 from osis_document_components.fields import FileField
 from osis_document_components.enums import DocumentExpirationPolicy
-from osis_document_components.tests.document_test.models import TestDocument
+from osis_document_components.tests.document_test.models import TestDocument, TestDocumentWithFileFieldsMixin
 from osis_document_components.tests.factories import TokenFactory
 
 
@@ -249,3 +250,181 @@ class FieldTestCase(TestCase):
         field = FileField(min_files=1, null=True, blank=True)
         self.assertEqual(field.clean([], None), [])
         self.assertEqual(field.clean([upload_id], None), [upload_id])
+
+
+@override_settings(
+    OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/',
+    OSIS_DOCUMENT_API_SHARED_SECRET='very-secret',
+)
+class FileFieldsModelMixinTestCase(TestCase):
+    def setUp(self):
+        self.tokens = [TokenFactory.token() for _ in range(3)]
+        patcher = patch(
+            'osis_document_components.services.get_several_remote_metadata',
+            return_value={token: {"name": "test.jpg", "size": 1} for token in self.tokens},
+        )
+        self.get_several_remote_metadata = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch(
+            'osis_document_components.services.confirm_remote_upload',
+            side_effect=lambda token, upload_to, **_: str(uuid.uuid4()),
+        )
+        self.confirm_remote_upload = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('osis_document_components.services.declare_remote_files_as_deleted')
+        self.declare_remote_files_as_deleted = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_all_file_fields_are_confirmed_in_one_pass(self):
+        instance = TestDocumentWithFileFieldsMixin(documents=self.tokens[:2], other_documents=self.tokens[2:])
+        instance.save()
+
+        self.get_several_remote_metadata.assert_called_once_with(self.tokens)
+        self.assertEqual(self.confirm_remote_upload.call_count, 3)
+        self.assertEqual(self.confirm_remote_upload.call_args_list[2].kwargs['upload_to'], 'default_path/None')
+        self.assertEqual(len(instance.documents), 2)
+        self.assertEqual(len(instance.other_documents), 1)
+        self.assertIsInstance(instance.other_documents[0], uuid.UUID)
+        self.declare_remote_files_as_deleted.assert_not_called()
+
+        instance.refresh_from_db()
+        self.assertEqual(len(instance.documents), 2)
+
+    def test_replaced_documents_are_declared_as_deleted_at_once(self):
+        old_documents = [uuid.uuid4(), uuid.uuid4()]
+        instance = TestDocumentWithFileFieldsMixin.objects.create(
+            documents=old_documents[:1],
+            other_documents=old_documents[1:],
+        )
+
+        instance.documents = [self.tokens[0]]
+        instance.other_documents = []
+        instance.save()
+
+        self.declare_remote_files_as_deleted.assert_called_once_with(set(old_documents))
+        self.assertEqual(self.confirm_remote_upload.call_count, 1)
+
+    def test_nested_save(self):
+        def save_again(sender, instance, created, **kwargs):
+            if created:
+                instance.save(update_fields=['other_documents'])
+
+        post_save.connect(save_again, sender=TestDocumentWithFileFieldsMixin)
+        self.addCleanup(post_save.disconnect, save_again, sender=TestDocumentWithFileFieldsMixin)
+        instance = TestDocumentWithFileFieldsMixin(documents=self.tokens[:1], other_documents=self.tokens[1:2])
+        instance.save()
+
+        self.assertEqual(self.confirm_remote_upload.call_count, 2)
+        self.assertNotIn('_file_fields_confirmed', instance.__dict__)
+
+    def test_only_updated_file_fields_are_confirmed(self):
+        instance = TestDocumentWithFileFieldsMixin.objects.create()
+        instance.documents = [self.tokens[0]]
+        instance.other_documents = [self.tokens[1]]
+        instance.save(update_fields=['documents'])
+
+        self.assertEqual(self.confirm_remote_upload.call_count, 1)
+        self.assertIsInstance(instance.documents[0], uuid.UUID)
+        instance.refresh_from_db()
+        self.assertEqual(instance.other_documents, [])
+
+    def test_bulk_create_with_documents(self):
+        instances = TestDocumentWithFileFieldsMixin.objects.bulk_create_with_documents(
+            [
+                TestDocumentWithFileFieldsMixin(documents=self.tokens[:1], other_documents=self.tokens[1:2]),
+                TestDocumentWithFileFieldsMixin(documents=self.tokens[2:]),
+            ]
+        )
+
+        self.get_several_remote_metadata.assert_called_once_with(self.tokens)
+        self.assertEqual(self.confirm_remote_upload.call_count, 3)
+        self.assertEqual(TestDocumentWithFileFieldsMixin.objects.count(), 2)
+        for instance in instances:
+            instance.refresh_from_db()
+            self.assertEqual(len(instance.documents), 1)
+            self.assertIsInstance(instance.documents[0], uuid.UUID)
+
+    @override_settings(OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE=2)
+    def test_metadata_are_fetched_in_batches(self):
+        TestDocumentWithFileFieldsMixin.objects.bulk_create_with_documents(
+            [TestDocumentWithFileFieldsMixin(documents=[token]) for token in self.tokens]
+        )
+
+        self.assertEqual(self.get_several_remote_metadata.call_count, 2)
+        self.assertEqual(self.confirm_remote_upload.call_count, 3)
+
+    @patch('osis_document_components.services.launch_post_processing')
+    def test_post_processing_is_launched_once_per_field(self, launch_post_processing):
+        field = TestDocumentWithFileFieldsMixin._meta.get_field('documents')
+        with patch.object(field, 'post_processing', ['CONVERT']):
+            instances = TestDocumentWithFileFieldsMixin.objects.bulk_create_with_documents(
+                [TestDocumentWithFileFieldsMixin(documents=[token]) for token in self.tokens]
+            )
+
+        launch_post_processing.assert_called_once()
+        self.assertEqual(
+            launch_post_processing.call_args.kwargs['uuid_list'],
+            [instance.documents[0] for instance in instances],
+        )
+
+    @patch('osis_document_components.services.launch_post_processing')
+    def test_merge_is_launched_once_per_instance(self, launch_post_processing):
+        field = TestDocumentWithFileFieldsMixin._meta.get_field('documents')
+        with patch.object(field, 'post_processing', ['MERGE']):
+            TestDocumentWithFileFieldsMixin.objects.bulk_create_with_documents(
+                [TestDocumentWithFileFieldsMixin(documents=self.tokens[:2]), TestDocumentWithFileFieldsMixin()]
+            )
+
+        self.assertEqual(launch_post_processing.call_count, 2)
+        self.assertEqual(len(launch_post_processing.call_args_list[0].kwargs['uuid_list']), 2)
+
+    def test_bulk_update_with_documents(self):
+        old_document = uuid.uuid4()
+        instances = [
+            TestDocumentWithFileFieldsMixin.objects.create(documents=[old_document]),
+            TestDocumentWithFileFieldsMixin.objects.create(),
+        ]
+        instances[0].documents = self.tokens[:1]
+        instances[1].documents = self.tokens[1:]
+
+        TestDocumentWithFileFieldsMixin.objects.bulk_update_with_documents(instances, ['documents'])
+
+        self.get_several_remote_metadata.assert_called_once_with(self.tokens)
+        self.declare_remote_files_as_deleted.assert_called_once_with({old_document})
+        instances[1].refresh_from_db()
+        self.assertEqual(len(instances[1].documents), 2)
+        self.assertIsInstance(instances[1].documents[0], uuid.UUID)
+
+    @patch('osis_document_components.services.documents_remote_duplicate')
+    def test_duplicate_documents(self, documents_remote_duplicate):
+        documents_remote_duplicate.side_effect = lambda uuids, **_: {
+            uuid_to_duplicate: str(uuid.uuid4()) for uuid_to_duplicate in uuids
+        }
+        original_documents = [uuid.uuid4() for _ in range(3)]
+        instances = [
+            TestDocumentWithFileFieldsMixin.objects.create(documents=original_documents[:2]),
+            TestDocumentWithFileFieldsMixin.objects.create(
+                documents=original_documents[2:],
+                other_documents=original_documents[:1],
+            ),
+        ]
+
+        updated_count = TestDocumentWithFileFieldsMixin.objects.all().duplicate_documents(
+            'documents',
+            with_modified_upload=True,
+            upload_path_by_uuid={str(original_documents[0]): 'new/path'},
+            batch_size=2,
+        )
+
+        self.assertEqual(updated_count, 2)
+        self.assertEqual(documents_remote_duplicate.call_count, 2)
+        self.assertEqual(
+            documents_remote_duplicate.call_args_list[0].kwargs['upload_path_by_uuid'],
+            {str(original_documents[0]): 'new/path'},
+        )
+        self.assertTrue(documents_remote_duplicate.call_args_list[0].kwargs['with_modified_upload'])
+        for instance in instances:
+            instance.refresh_from_db()
+        self.assertEqual(len(instances[0].documents), 2)
+        self.assertFalse(set(instances[0].documents + instances[1].documents) & set(original_documents))
+        self.assertEqual(instances[1].other_documents, original_documents[:1])
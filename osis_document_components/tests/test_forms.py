@@ -28,7 +28,7 @@ from unittest.mock import Mock, patch
 
 from django import forms
 from django.test import TestCase, override_settings
-from osis_document_components.forms import FileUploadField, TokenField
+from osis_document_components.forms import FileUploadField, TokenField, persist_several_upload_fields
 from osis_document_components.tests.factories import TokenFactory
 
 
@@ -270,6 +270,50 @@ class FormTestCase(TestCase):
             confirmed_ids = form.fields['media'].persist(form.cleaned_data['media'], mock_instance)
             self.assertListEqual(confirmed_ids, [{"uuid": upload_uuid}])
 
+    def test_persist_confirms_several_tokens_with_instance_filters(self):
+        related_model = {
+            'app': 'app_name',
+            'model': 'model_name',
+            'field': 'field_name',
+            'instance_filter_fields': ['id'],
+        }
+
+        class TestForm(forms.Form):
+            media = FileUploadField(related_model=related_model)
+
+        tokens = [TokenFactory.token() for _ in range(3)]
+        form = TestForm({'media_{}'.format(index): token for index, token in enumerate(tokens)})
+        self.assertTrue(form.is_valid(), msg=form.errors)
+        with patch('osis_document_components.services.confirm_remote_upload') as confirm_remote_upload:
+            confirm_remote_upload.side_effect = lambda token, **_: 'uuid-{}'.format(token)
+            confirmed_ids = form.fields['media'].persist(form.cleaned_data['media'], Mock(id=10))
+
+        self.assertListEqual(confirmed_ids, ['uuid-{}'.format(token) for token in tokens])
+        self.assertIn('instance_filter_fields', related_model, msg="The field settings should not be altered")
+        for call in confirm_remote_upload.call_args_list:
+            self.assertEqual(call.kwargs['related_model']['instance_filters'], {'id': 10})
+
+    def test_persist_several_upload_fields(self):
+        class TestForm(forms.Form):
+            media = FileUploadField()
+            other_media = FileUploadField(required=False)
+            text = forms.CharField(required=False)
+
+        tokens = [TokenFactory.token() for _ in range(3)]
+        form = TestForm({'media_0': tokens[0], 'media_1': tokens[1], 'other_media_0': tokens[2]})
+        self.assertTrue(form.is_valid(), msg=form.errors)
+        with patch('osis_document_components.services.confirm_remote_upload') as confirm_remote_upload:
+            confirm_remote_upload.side_effect = lambda token, **_: 'uuid-{}'.format(token)
+            confirmed_ids = persist_several_upload_fields(form)
+
+        self.assertDictEqual(
+            confirmed_ids,
+            {
+                'media': ['uuid-{}'.format(tokens[0]), 'uuid-{}'.format(tokens[1])],
+                'other_media': ['uuid-{}'.format(tokens[2])],
+            },
+        )
+
     def test_check_disabled_field(self):
         class TestForm(forms.Form):
             media = FileUploadField(disabled=True, required=False)
@@ -0,0 +1,102 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import json
+import os
+import subprocess
+import sys
+
+from django.test import SimpleTestCase
+
+# Importing the app and its models in a new process must not import these modules
+HEAVY_MODULES = ['requests', 'urllib3', 'rest_framework.serializers']
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import django
+from django.conf import settings
+settings.configure(
+    INSTALLED_APPS=['django.contrib.contenttypes', 'django.contrib.auth', 'osis_document_components'],
+    OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/',
+)
+django.setup()
+import osis_document_components.fields, osis_document_components.forms, osis_document_components.services
+print(json.dumps({
+    'duration': time.perf_counter() - start,
+    'imported': [module for module in %r if module in sys.modules],
+}))
+""" % HEAVY_MODULES
+
+CONCURRENT_FIRST_USE_SCRIPT = """
+import json, sys, threading
+from osis_document_components.utils import lazy_import
+requests = lazy_import('requests')
+barrier = threading.Barrier(8)
+errors = []
+
+def use():
+    barrier.wait()
+    try:
+        requests.Session, requests.Timeout, requests.HTTPError
+    except Exception as e:
+        errors.append(repr(e))
+
+threads = [threading.Thread(target=use) for _ in range(8)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(json.dumps(errors))
+"""
+
+
+class ImportTimeTestCase(SimpleTestCase):
+    def test_heavy_dependencies_are_loaded_lazily(self):
+        result = subprocess.run(
+            [sys.executable, '-c', IMPORT_SCRIPT],
+            env={**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)},
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        output = json.loads(result.stdout)
+
+        self.assertEqual(
+            output['imported'],
+            [],
+            'Imported at startup in {:.3f}s'.format(output['duration']),
+        )
+
+    def test_concurrent_first_use_of_lazy_module(self):
+        result = subprocess.run(
+            [sys.executable, '-c', CONCURRENT_FIRST_USE_SCRIPT],
+            env={**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)},
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+
+        self.assertEqual(json.loads(result.stdout), [])
@@ -0,0 +1,61 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import json
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from osis_document_components import services
+from osis_document_components.json_codec import JSONCodec, OrjsonCodec, _load_codec, get_json_codec, orjson
+
+
+class JSONCodecTestCase(SimpleTestCase):
+    def setUp(self):
+        _load_codec.cache_clear()
+        self.addCleanup(_load_codec.cache_clear)
+
+    @override_settings(OSIS_DOCUMENT_COMPONENTS_JSON_CODEC='json')
+    def test_stdlib_codec(self):
+        codec = get_json_codec()
+        self.assertIsInstance(codec, JSONCodec)
+        self.assertEqual(codec.loads(codec.dumps({'a': ['b', 1]})), {'a': ['b', 1]})
+
+    @override_settings(OSIS_DOCUMENT_COMPONENTS_JSON_CODEC='auto')
+    def test_auto_codec(self):
+        codec = get_json_codec()
+        if orjson is not None:
+            self.assertIsInstance(codec, OrjsonCodec)
+        self.assertEqual(codec.loads(codec.dumps({'a': ['b', 1]})), {'a': ['b', 1]})
+
+    @override_settings(OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/')
+    def test_batch_services_use_the_codec(self):
+        with patch('requests.post') as request_mock:
+            request_mock.return_value.status_code = services.HTTP_200_OK
+            request_mock.return_value.content = b'{"token":{"name":"test.pdf"}}'
+            self.assertEqual(services.get_several_remote_metadata(['token']), {'token': {'name': 'test.pdf'}})
+
+        self.assertEqual(json.loads(request_mock.call_args[1]['data']), ['token'])
+        self.assertEqual(request_mock.call_args[1]['headers']['Content-Type'], 'application/json')
@@ -0,0 +1,102 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import uuid
+from unittest.mock import patch
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from osis_document_components import services
+from osis_document_components.profiling import ServerTimingMiddleware, record_calls
+
+
+@override_settings(
+    OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/',
+    OSIS_DOCUMENT_COMPONENTS_SINGLE_FLIGHT=False,
+    OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE=500,
+)
+class RecordCallsTestCase(SimpleTestCase):
+    def setUp(self):
+        patcher = patch('requests.post')
+        self.request_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.request_mock.return_value.status_code = services.HTTP_201_CREATED
+        self.request_mock.return_value.json.return_value = {'token': 'a:token', 'uuid': str(uuid.uuid4())}
+        self.request_mock.return_value.content = b'{}'
+
+    def test_calls_are_recorded(self):
+        uuids = [str(uuid.uuid4()) for _ in range(3)]
+        with record_calls() as recorder:
+            for document_uuid in uuids:
+                services.get_remote_token(document_uuid)
+            services.get_remote_token(uuids[0])
+            services.get_remote_tokens_in_batches(uuids)
+
+        self.assertEqual(len(recorder.top_level_calls), 5)
+        self.assertEqual(len(recorder.calls), 6)
+        token_call = recorder.calls[0]
+        self.assertEqual(token_call.service, 'get_remote_token')
+        self.assertEqual(token_call.endpoints, ['read-token'])
+        self.assertIsNone(token_call.batch_size)
+        self.assertIn('test_calls_are_recorded', token_call.call_site)
+        batch_call, inner_call = recorder.calls[4:]
+        self.assertEqual(
+            (batch_call.service, batch_call.batch_size, batch_call.depth),
+            ('get_remote_tokens_in_batches', 3, 0),
+        )
+        self.assertEqual(
+            (inner_call.service, inner_call.endpoints, inner_call.depth),
+            ('get_remote_tokens', ['read-tokens'], 1),
+        )
+        self.assertEqual(recorder.get_duplicates(), {'get_remote_token': 1})
+        # The calls of the loop
+        self.assertEqual(list(recorder.get_n_plus_one().values()), [3])
+
+    @override_settings(OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION=False)
+    def test_duplicate_uploads_are_detected_from_a_hash_of_the_content(self):
+        content = b'%PDF' * 1024 * 1024
+        with record_calls() as recorder:
+            services.save_raw_content_remotely(content, 'test.pdf', 'application/pdf')
+            services.save_raw_content_remotely(bytes(content), 'test.pdf', 'application/pdf')
+            services.save_raw_content_remotely(content + b'%', 'test.pdf', 'application/pdf')
+            services.confirm_several_remote_uploads([{'token': 'a:token', 'metadata': {'tags': ['a']}}])
+
+        self.assertEqual(recorder.get_duplicates(), {'save_raw_content_remotely': 1})
+
+    def test_calls_are_not_recorded_by_default(self):
+        with record_calls() as recorder:
+            pass
+        services.get_remote_token(str(uuid.uuid4()))
+        self.assertEqual(recorder.calls, [])
+
+    def test_server_timing_header(self):
+        def view(request):
+            services.get_remote_token(str(uuid.uuid4()))
+            return HttpResponse()
+
+        response = ServerTimingMiddleware(view)(RequestFactory().get('/'))
+
+        self.assertRegex(response['Server-Timing'], r'^osis-document;dur=[\d.]+;desc="1 calls, 0 duplicates, 0 N\+1"$')
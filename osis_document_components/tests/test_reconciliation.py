@@ -0,0 +1,98 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import uuid
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from osis_document_components.reconciliation import find_orphan_uuids
+from osis_document_components.tests.document_test.models import TestDocument, TestDocumentWithFileFieldsMixin
+
+
+class ReconciliationTestCase(TestCase):
+    def test_find_orphan_uuids(self):
+        referenced_uuids = [uuid.uuid4() for _ in range(500)]
+        orphan_uuids = [uuid.uuid4() for _ in range(500)]
+        server_uuids = [str(value) for value in referenced_uuids + orphan_uuids + orphan_uuids[:10]]
+
+        found_uuids = list(find_orphan_uuids(server_uuids=server_uuids, referenced_uuids=referenced_uuids))
+
+        self.assertEqual(len(found_uuids), len(orphan_uuids))
+        self.assertEqual(set(found_uuids), set(orphan_uuids))
+
+    @override_settings(OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE=2)
+    @patch('osis_document_components.services.declare_remote_files_as_deleted')
+    def test_command_declares_orphans_as_deleted(self, declare_remote_files_as_deleted):
+        referenced_uuids = [uuid.uuid4() for _ in range(2)]
+        orphan_uuids = [uuid.uuid4() for _ in range(3)]
+        TestDocument.objects.create(documents=referenced_uuids[:1])
+        TestDocumentWithFileFieldsMixin.objects.create(other_documents=referenced_uuids[1:])
+
+        with patch('sys.stdin', StringIO('\n'.join(str(value) for value in referenced_uuids + orphan_uuids))):
+            call_command('reconcile_orphan_documents', '-', '--apply', stdout=StringIO())
+
+        self.assertEqual(declare_remote_files_as_deleted.call_count, 2)
+        declared_uuids = [value for call in declare_remote_files_as_deleted.call_args_list for value in call.args[0]]
+        self.assertEqual(set(declared_uuids), set(orphan_uuids))
+
+    @patch('osis_document_components.services.declare_remote_files_as_deleted')
+    def test_command_lists_orphans_by_default(self, declare_remote_files_as_deleted):
+        orphan_uuid = uuid.uuid4()
+        stdout = StringIO()
+        with patch('sys.stdin', StringIO(str(orphan_uuid))):
+            call_command('reconcile_orphan_documents', '-', stdout=stdout)
+
+        declare_remote_files_as_deleted.assert_not_called()
+        self.assertIn(str(orphan_uuid), stdout.getvalue())
+
+    @patch('osis_document_components.services.declare_remote_files_as_deleted')
+    def test_command_skips_invalid_lines(self, declare_remote_files_as_deleted):
+        orphan_uuid = uuid.uuid4()
+        stderr = StringIO()
+        with patch('sys.stdin', StringIO('invalid\n{}\n'.format(orphan_uuid))):
+            call_command('reconcile_orphan_documents', '-', '--apply', stdout=StringIO(), stderr=stderr)
+
+        declare_remote_files_as_deleted.assert_called_once_with([orphan_uuid])
+        self.assertIn('Line 1', stderr.getvalue())
+
+    @patch('osis_document_components.services.declare_remote_files_as_deleted')
+    def test_command_rechecks_orphans_before_deleting(self, declare_remote_files_as_deleted):
+        orphan_uuid, referenced_uuid = uuid.uuid4(), uuid.uuid4()
+
+        def iter_referenced_uuids(**kwargs):
+            yield from []
+            # Referenced after its table was scanned
+            TestDocument.objects.create(documents=[referenced_uuid])
+
+        with patch(
+            'osis_document_components.management.commands.reconcile_orphan_documents.iter_referenced_uuids',
+            side_effect=iter_referenced_uuids,
+        ), patch('sys.stdin', StringIO('{}\n{}'.format(orphan_uuid, referenced_uuid))):
+            call_command('reconcile_orphan_documents', '-', '--apply', stdout=StringIO())
+
+        declare_remote_files_as_deleted.assert_called_once_with([orphan_uuid])
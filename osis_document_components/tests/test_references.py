@@ -0,0 +1,210 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import json
+import re
+import time
+import uuid
+from unittest.mock import patch
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.template import Context, Template
+from django.http import Http404
+from django.middleware.csrf import CsrfViewMiddleware
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import include, path, reverse
+
+from osis_document_components.references import resolve_references, sign_reference
+from osis_document_components.views import reference_file_view, resolve_references_view
+
+urlpatterns = [
+    path('documents/', include('osis_document_components.urls')),
+]
+
+
+@override_settings(
+    ROOT_URLCONF=__name__,
+    OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/',
+    OSIS_DOCUMENT_COMPONENTS_SIGNED_REFERENCES=True,
+    OSIS_DOCUMENT_COMPONENTS_REFERENCE_MAX_AGE=3600,
+    OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE=500,
+)
+class ReferencesTestCase(TestCase):
+    def setUp(self):
+        self.uuids = [str(uuid.uuid4()) for _ in range(3)]
+        patcher = patch(
+            'osis_document_components.services.get_remote_tokens',
+            side_effect=lambda uuids, **kwargs: {
+                self.uuids[0]: 'first-token',
+                self.uuids[1]: {'status': 'PENDING', 'links': {}},
+                self.uuids[2]: {'error': 'NOT_FOUND'},
+            },
+        )
+        self.get_remote_tokens = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user('user')
+
+    def test_resolve_references_in_batch(self):
+        references = [sign_reference(document_uuid, scope='page') for document_uuid in self.uuids] + ['invalid']
+
+        self.assertEqual(
+            resolve_references(references, scope='page'),
+            {
+                references[0]: 'first-token',
+                references[1]: {
+                    'status': 'PENDING',
+                    'links': {},
+                    'uuid': self.uuids[1],
+                    'wanted_post_process': None,
+                },
+                references[2]: None,
+                'invalid': None,
+            },
+        )
+        self.get_remote_tokens.assert_called_once()
+
+    def test_reference_must_be_bound(self):
+        with self.assertRaises(ValueError):
+            sign_reference(self.uuids[0])
+        with self.assertRaises(ValueError):
+            sign_reference(self.uuids[0], user=AnonymousUser())
+
+    def test_reference_scoped_to_user(self):
+        reference = sign_reference(self.uuids[0], user=self.user)
+
+        self.assertEqual(resolve_references([reference], user=self.user), {reference: 'first-token'})
+        self.assertEqual(resolve_references([reference]), {reference: None})
+        self.assertEqual(resolve_references([reference], user=AnonymousUser()), {reference: None})
+        self.assertEqual(resolve_references([reference], user=User.objects.create_user('other')), {reference: None})
+        self.get_remote_tokens.assert_called_once()
+
+    def test_reference_scoped_to_scope(self):
+        reference = sign_reference(self.uuids[0], scope='page')
+
+        self.assertEqual(resolve_references([reference], scope='other'), {reference: None})
+        self.assertEqual(resolve_references([reference], user=self.user), {reference: None})
+        self.get_remote_tokens.assert_not_called()
+
+    def test_reference_lifetime_capped_by_custom_ttl(self):
+        reference = sign_reference(self.uuids[0], custom_ttl=60, user=self.user)
+        self.assertEqual(resolve_references([reference], user=self.user), {reference: 'first-token'})
+
+        with patch('osis_document_components.references.time.time', return_value=time.time() + 61):
+            self.assertEqual(resolve_references([reference], user=self.user), {reference: None})
+
+    def post_references(self, references, user=None):
+        request = RequestFactory().post(
+            reverse('osis_document_components:resolve-references'),
+            data={'references': references},
+            content_type='application/json',
+        )
+        request.user = user or AnonymousUser()
+        return resolve_references_view(request)
+
+    def get_reference_file(self, reference, user=None):
+        request = RequestFactory().get(reverse('osis_document_components:reference-file', args=[reference]))
+        request.user = user or AnonymousUser()
+        return reference_file_view(request, reference)
+
+    def test_resolve_view(self):
+        reference = sign_reference(self.uuids[0], wanted_post_process='CONVERT', user=self.user)
+        response = self.post_references([reference], self.user)
+        self.assertEqual(json.loads(response.content), {reference: 'first-token'})
+        self.assertEqual(self.get_remote_tokens.call_args[1]['wanted_post_process'], 'CONVERT')
+
+        response = self.post_references('invalid', self.user)
+        self.assertEqual(response.status_code, 400)
+
+    def test_resolve_view_unauthenticated(self):
+        reference = sign_reference(self.uuids[0], user=self.user)
+        response = self.post_references([reference])
+        self.assertEqual(json.loads(response.content), {reference: None})
+        self.get_remote_tokens.assert_not_called()
+
+    def test_resolve_view_requires_csrf_token(self):
+        request = RequestFactory().post(
+            reverse('osis_document_components:resolve-references'),
+            data={'references': []},
+            content_type='application/json',
+        )
+        response = CsrfViewMiddleware(resolve_references_view).process_view(
+            request, resolve_references_view, (), {}
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_file_view(self):
+        response = self.get_reference_file(sign_reference(self.uuids[0], user=self.user), self.user)
+        self.assertRedirects(response, 'http://dummyurl.com/document/file/first-token', fetch_redirect_response=False)
+
+        with self.assertRaises(Http404):
+            self.get_reference_file(sign_reference(self.uuids[2], user=self.user), self.user)
+        with self.assertRaises(Http404):
+            self.get_reference_file(sign_reference(self.uuids[0], user=self.user))
+
+    def test_tags_render_references(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        rendered = Template(
+            '{% load osis_document_components %}'
+            '{% document_visualizer values %}'
+            '{% get_file_url values.0 %}'
+        ).render(Context({'values': self.uuids[:1], 'request': request}))
+
+        self.get_remote_tokens.assert_not_called()
+        self.assertNotIn('first-token', rendered)
+        self.assertIn('data-references-url="/documents/references/resolve"', rendered)
+        self.assertNotIn('csrf', rendered)
+        self.assertTrue(request.META['CSRF_COOKIE_NEEDS_UPDATE'])
+        self.assertRegex(rendered, r'/documents/references/[^/]+/file$')
+
+    def test_visualizer_keeps_post_processing_parameters(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        rendered = Template(
+            '{% load osis_document_components %}'
+            '{% document_visualizer values wanted_post_process="MERGE" %}'
+        ).render(Context({'values': self.uuids[:2], 'request': request}))
+
+        self.assertIn('data-wanted-post-process="MERGE"', rendered)
+        self.assertIn('data-post-process-status="DONE"', rendered)
+        [values] = re.findall(r'data-values="([^"]*)"', rendered)
+        self.assertEqual(len(values.split(',')), 1)
+
+        reference = sign_reference(self.uuids[1], wanted_post_process='CONVERT', user=self.user)
+        self.assertEqual(
+            resolve_references([reference], user=self.user)[reference],
+            {'status': 'PENDING', 'links': {}, 'uuid': self.uuids[1], 'wanted_post_process': 'CONVERT'},
+        )
+
+    @patch('osis_document_components.services.get_remote_token', return_value='first-token')
+    def test_tags_render_tokens_without_authenticated_user(self, get_remote_token):
+        rendered = Template(
+            '{% load osis_document_components %}'
+            '{% document_visualizer values %}'
+            '{% get_file_url values.0 %}'
+        ).render(Context({'values': self.uuids[:1]}))
+
+        self.assertNotIn('data-references-url', rendered)
+        self.assertIn('first-token', rendered)
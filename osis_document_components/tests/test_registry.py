@@ -0,0 +1,59 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import uuid
+
+from django.test import TestCase
+
+from osis_document_components.registry import DocumentOwner, find_owners, get_registered_file_fields
+from osis_document_components.tests.document_test.models import TestDocument, TestDocumentWithFileFieldsMixin
+
+
+class RegistryTestCase(TestCase):
+    def test_file_fields_are_registered(self):
+        registered_fields = [(model, field.name) for model, field in get_registered_file_fields()]
+        self.assertIn((TestDocument, 'documents'), registered_fields)
+        self.assertIn((TestDocumentWithFileFieldsMixin, 'other_documents'), registered_fields)
+
+        indexed_fields = [(model, field.name) for model, field in get_registered_file_fields(indexed_only=True)]
+        self.assertEqual(indexed_fields, [(TestDocumentWithFileFieldsMixin, 'documents')])
+
+    def test_find_owners(self):
+        searched_uuid = uuid.uuid4()
+        owner = TestDocumentWithFileFieldsMixin.objects.create(documents=[uuid.uuid4(), searched_uuid])
+        TestDocumentWithFileFieldsMixin.objects.create(documents=[uuid.uuid4()])
+        not_indexed_owner = TestDocument.objects.create(documents=[searched_uuid])
+
+        with self.assertLogs(level='WARNING') as logs:
+            self.assertEqual(
+                find_owners(searched_uuid),
+                [DocumentOwner(model=TestDocumentWithFileFieldsMixin, field_name='documents', pk=owner.pk)],
+            )
+        self.assertIn('document_test.TestDocument.documents', logs.output[0])
+        self.assertIn(
+            DocumentOwner(model=TestDocument, field_name='documents', pk=not_indexed_owner.pk),
+            find_owners([str(searched_uuid)], indexed_only=False),
+        )
+        self.assertEqual(find_owners([]), [])
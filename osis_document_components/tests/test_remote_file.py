@@ -0,0 +1,111 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import io
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from osis_document_components import services
+from osis_document_components.remote_file import RemoteFile
+
+CONTENT = bytes(range(256)) * 4
+
+
+def get_range(token, start, end=None, slice_whole_file=True):
+    return CONTENT[start:None if end is None else end + 1], len(CONTENT)
+
+
+def get_whole_file(token, start, end=None, slice_whole_file=True):
+    # Server not supporting the ranges
+    return (CONTENT[start:None if end is None else end + 1] if slice_whole_file else CONTENT), len(CONTENT)
+
+
+@override_settings(OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/')
+class GetRawContentRangeRemotelyTestCase(SimpleTestCase):
+    @patch('requests.get')
+    def test_partial_content(self, request_mock):
+        request_mock.return_value.status_code = services.HTTP_206_PARTIAL_CONTENT
+        request_mock.return_value.content = b'%PDF'
+        request_mock.return_value.headers = {'Content-Range': 'bytes 0-3/1024'}
+
+        self.assertEqual(services.get_raw_content_range_remotely('a:token', 0, 3), (b'%PDF', 1024))
+        self.assertEqual(request_mock.call_args.kwargs['headers'], {'Range': 'bytes=0-3'})
+
+    @patch('requests.get')
+    def test_range_not_supported(self, request_mock):
+        request_mock.return_value.status_code = services.HTTP_200_OK
+        request_mock.return_value.content = b'%PDF-1.7'
+
+        self.assertEqual(services.get_raw_content_range_remotely('a:token', 1, 3), (b'PDF', 8))
+        self.assertEqual(services.get_raw_content_range_remotely('a:token', 5), (b'1.7', 8))
+        self.assertEqual(
+            services.get_raw_content_range_remotely('a:token', 1, 3, slice_whole_file=False),
+            (b'%PDF-1.7', 8),
+        )
+
+    @patch('requests.get')
+    def test_file_not_available(self, request_mock):
+        request_mock.return_value.status_code = services.HTTP_404_NOT_FOUND
+        self.assertIsNone(services.get_raw_content_range_remotely('a:token', 0, 3))
+
+
+@patch('osis_document_components.services.get_raw_content_range_remotely', side_effect=get_range)
+class RemoteFileTestCase(SimpleTestCase):
+    def test_read_and_seek(self, get_raw_content_range_remotely):
+        remote_file = RemoteFile('a:token', block_size=100)
+
+        self.assertEqual(remote_file.read(4), CONTENT[:4])
+        remote_file.seek(-10, io.SEEK_END)
+        self.assertEqual(remote_file.tell(), len(CONTENT) - 10)
+        self.assertEqual(remote_file.read(), CONTENT[-10:])
+        self.assertEqual(remote_file.read(), b'')
+        self.assertEqual(get_raw_content_range_remotely.call_count, 2, msg="Only the read blocks are fetched")
+
+        remote_file.seek(95)
+        self.assertEqual(remote_file.read(10), CONTENT[95:105])
+        self.assertEqual(remote_file.size, len(CONTENT))
+
+    def test_read_whole_file(self, get_raw_content_range_remotely):
+        with io.BufferedReader(RemoteFile('a:token', block_size=300)) as remote_file:
+            self.assertEqual(remote_file.read(), CONTENT)
+
+    def test_unavailable_file(self, get_raw_content_range_remotely):
+        get_raw_content_range_remotely.side_effect = None
+        get_raw_content_range_remotely.return_value = None
+        with self.assertRaises(OSError):
+            RemoteFile('a:token').read(4)
+
+    def test_whole_file_is_kept_when_ranges_are_not_supported(self, get_raw_content_range_remotely):
+        get_raw_content_range_remotely.side_effect = get_whole_file
+        remote_file = RemoteFile('a:token', block_size=100)
+
+        remote_file.seek(150)
+        self.assertEqual(remote_file.read(100), CONTENT[150:250])
+        remote_file.seek(-10, io.SEEK_END)
+        self.assertEqual(remote_file.read(), CONTENT[-10:])
+        remote_file.seek(0)
+        self.assertEqual(remote_file.read(), CONTENT)
+        get_raw_content_range_remotely.assert_called_once()
@@ -23,11 +23,13 @@
 #  see http://www.gnu.org/licenses/.
 #
 # ##############################################################################
+import uuid
 from unittest.mock import patch
 
 from django.test import TestCase, override_settings
 from rest_framework import serializers
 
+from osis_document_components.serializers import DocumentField, DocumentListSerializer
 from osis_document_components.tests.document_test.models import TestDocument
 
 
@@ -65,3 +67,57 @@ class SerializerTestCase(TestCase):
         self.mock_remote_metadata.return_value = None
         self.assertTrue(_TestSerializer(data={'documents': []}).is_valid())
         self.mock_remote_metadata.assert_not_called()
+
+
+class _TestDocumentSerializer(serializers.ModelSerializer):
+    documents = DocumentField()
+    urls = DocumentField(source='documents', representation=DocumentField.URL)
+    metadata = DocumentField(source='documents', representation=DocumentField.METADATA)
+
+    class Meta:
+        model = TestDocument
+        fields = ['documents', 'urls', 'metadata']
+        list_serializer_class = DocumentListSerializer
+
+
+@override_settings(OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/', OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE=500)
+class DocumentFieldTestCase(TestCase):
+    def setUp(self):
+        self.uuids = [uuid.uuid4() for _ in range(3)]
+        self.instances = [
+            TestDocument(documents=[self.uuids[0], self.uuids[1]]),
+            TestDocument(documents=[self.uuids[2]]),
+            TestDocument(documents=[]),
+        ]
+        patcher = patch(
+            'osis_document_components.services.get_remote_tokens',
+            side_effect=lambda uuids, **kwargs: {
+                uuid: 'token-' + uuid for uuid in uuids if uuid != str(self.uuids[2])
+            },
+        )
+        self.get_remote_tokens = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch(
+            'osis_document_components.services.get_several_remote_metadata',
+            side_effect=lambda tokens: {token: {'name': token} for token in tokens},
+        )
+        self.get_several_remote_metadata = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_list_is_resolved_in_batch(self):
+        data = _TestDocumentSerializer(self.instances, many=True).data
+
+        self.assertEqual(self.get_remote_tokens.call_count, 3)  # One per DocumentField
+        self.assertEqual(self.get_several_remote_metadata.call_count, 1)
+        token = 'token-{}'.format(self.uuids[0])
+        self.assertEqual(data[0]['documents'], [token, 'token-{}'.format(self.uuids[1])])
+        self.assertEqual(data[0]['urls'][0], 'http://dummyurl.com/document/file/' + token)
+        self.assertEqual(data[0]['metadata'][0], {'name': token})
+        self.assertEqual(data[1]['documents'], [None])
+        self.assertEqual(data[2], {'documents': [], 'urls': [], 'metadata': []})
+
+    def test_single_object_is_resolved(self):
+        data = _TestDocumentSerializer(self.instances[0]).data
+
+        self.assertEqual(self.get_remote_tokens.call_count, 3)
+        self.assertEqual(data['documents'], ['token-{}'.format(uuid) for uuid in self.uuids[:2]])
@@ -0,0 +1,422 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import asyncio
+import inspect
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from requests import Timeout
+
+from osis_document_components import services
+from osis_document_components.exceptions import (
+    ConfirmRemoteUploadException,
+    OsisDocumentTimeout,
+    PostProcessingFailedException,
+    SaveRawContentRemotelyException,
+)
+from osis_document_components.results import DocumentMetadata, TokenResult
+from osis_document_components.tests.factories import TokenFactory
+
+
+@override_settings(
+    OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/',
+    OSIS_DOCUMENT_API_SHARED_SECRET='very-secret',
+    OSIS_DOCUMENT_COMPONENTS_GET_REMOTE_METADATA_TIMEOUT=5,
+    OSIS_DOCUMENT_COMPONENTS_GET_REMOTE_TOKEN_TIMEOUT=5,
+)
+class SingleFlightTestCase(SimpleTestCase):
+    def test_concurrent_identical_calls_share_the_same_request(self):
+        request_started = threading.Event()
+        release_response = threading.Event()
+        token = TokenFactory.token()
+        results = []
+
+        def get(*args, **kwargs):
+            request_started.set()
+            release_response.wait(timeout=5)
+            return request_mock.return_value
+
+        def call():
+            results.append(services.get_remote_metadata(token))
+
+        with patch('requests.get') as request_mock:
+            request_mock.return_value.status_code = services.HTTP_200_OK
+            request_mock.return_value.json.return_value = {'name': 'test.pdf'}
+            request_mock.side_effect = get
+            threads = [threading.Thread(target=call) for _ in range(5)]
+            threads[0].start()
+            request_started.wait(timeout=5)
+            for thread in threads[1:]:
+                thread.start()
+            # Let the other callers reach the in-flight request before answering it
+            time.sleep(0.1)
+            release_response.set()
+            for thread in threads:
+                thread.join()
+
+        request_mock.assert_called_once()
+        self.assertEqual(results, [{'name': 'test.pdf'}] * 5)
+
+    def test_writing_tokens_are_not_shared(self):
+        with patch('requests.post') as request_mock:
+            request_mock.return_value.status_code = services.HTTP_201_CREATED
+            request_mock.return_value.json.return_value = {'token': 'a:token'}
+            upload_uuid = '8620708e-13fe-437d-9193-edb37e46055d'
+            services.get_remote_token(upload_uuid, write_token=True)
+            services.get_remote_token(upload_uuid, write_token=True)
+        self.assertEqual(request_mock.call_count, 2)
+
+    def test_single_flight_can_be_disabled(self):
+        token = TokenFactory.token()
+        with override_settings(OSIS_DOCUMENT_COMPONENTS_SINGLE_FLIGHT=False), patch('requests.get') as request_mock:
+            request_mock.return_value.status_code = services.HTTP_200_OK
+            services.get_remote_metadata(token)
+            services.get_remote_metadata(token)
+        self.assertEqual(request_mock.call_count, 2)
+
+
+@override_settings(
+    OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/',
+    OSIS_DOCUMENT_API_SHARED_SECRET='very-secret',
+    OSIS_DOCUMENT_COMPONENTS_CONFIRM_REMOTE_UPLOAD_TIMEOUT=5,
+    OSIS_DOCUMENT_COMPONENTS_CONFIRM_REMOTE_UPLOAD_MAX_RETRIES=2,
+)
+@patch('osis_document_components.services.CONFIRM_REMOTE_UPLOAD_RETRY_BACKOFF', 0)
+class ConfirmRemoteUploadTestCase(SimpleTestCase):
+    def test_idempotency_key_depends_on_token_and_field(self):
+        token = TokenFactory.token()
+        key = services.build_confirm_upload_idempotency_key(token, field='app.Model.documents')
+        self.assertEqual(key, services.build_confirm_upload_idempotency_key(token, field='app.Model.documents'))
+        self.assertNotEqual(key, services.build_confirm_upload_idempotency_key(token, field='app.Model.others'))
+
+    def test_confirmation_is_retried_with_the_same_idempotency_key(self):
+        token = TokenFactory.token()
+        with patch('requests.post') as request_mock:
+            request_mock.return_value.status_code = services.HTTP_201_CREATED
+            request_mock.return_value.json.return_value = {'uuid': 'bbc1ba15-42d2-48e9-9884-7631417bb1e1'}
+            request_mock.side_effect = [Timeout(), request_mock.return_value]
+            file_uuid = services.confirm_remote_upload(token, upload_to='path', idempotency_key='key')
+
+        self.assertEqual(file_uuid, 'bbc1ba15-42d2-48e9-9884-7631417bb1e1')
+        self.assertEqual(request_mock.call_count, 2)
+        for call in request_mock.call_args_list:
+            self.assertEqual(call.kwargs['headers']['Idempotency-Key'], 'key')
+
+    def test_confirmation_is_not_retried_without_idempotency_key(self):
+        with patch('requests.post', side_effect=Timeout()) as request_mock:
+            with self.assertRaises(OsisDocumentTimeout):
+                services.confirm_remote_upload(TokenFactory.token(), upload_to='path')
+        request_mock.assert_called_once()
+
+    def test_confirmation_error_is_raised(self):
+        with patch('requests.post') as request_mock:
+            request_mock.return_value.status_code = services.HTTP_503_SERVICE_UNAVAILABLE
+            request_mock.side_effect = [Timeout(), request_mock.return_value, Mock(status_code=404, text='')]
+            with self.assertRaises(ConfirmRemoteUploadException):
+                services.confirm_remote_upload(TokenFactory.token(), upload_to='path', idempotency_key='key')
+        self.assertEqual(request_mock.call_count, 3)
+
+    def test_confirmation_without_uuid_is_an_error(self):
+        with patch('requests.post') as request_mock:
+            request_mock.return_value.status_code = services.HTTP_201_CREATED
+            request_mock.return_value.json.return_value = {}
+            with self.assertRaises(ConfirmRemoteUploadException):
+                services.confirm_remote_upload(TokenFactory.token(), upload_to='path')
+
+    @override_settings(OSIS_DOCUMENT_COMPONENTS_CONFIRM_REMOTE_UPLOAD_MAX_RETRIES=0)
+    def test_confirmation_is_not_retried_if_retries_are_disabled(self):
+        with patch('requests.post', side_effect=Timeout()) as request_mock:
+            with self.assertRaises(OsisDocumentTimeout):
+                services.confirm_remote_upload(TokenFactory.token(), upload_to='path', idempotency_key='key')
+        request_mock.assert_called_once()
+
+    def test_confirmation_fails_after_max_retries(self):
+        with patch('requests.post', side_effect=Timeout()) as request_mock:
+            with self.assertRaises(OsisDocumentTimeout):
+                services.confirm_remote_upload(TokenFactory.token(), upload_to='path', idempotency_key='key')
+        self.assertEqual(request_mock.call_count, 3)
+
+
+@override_settings(
+    OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/',
+    OSIS_DOCUMENT_API_SHARED_SECRET='very-secret',
+    OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION=True,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+@patch('osis_document_components.services.get_remote_metadata', return_value={'name': 'test.pdf'})
+class SaveRawContentRemotelyDeduplicationTestCase(SimpleTestCase):
+    def setUp(self):
+        patcher = patch('requests.post')
+        self.request_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.request_mock.return_value.status_code = services.HTTP_201_CREATED
+        self.request_mock.return_value.json.side_effect = lambda: {
+            'token': TokenFactory.token(),
+            'uuid': str(uuid.uuid4()),
+        }
+        self.addCleanup(caches['default'].clear)
+
+    def test_identical_content_is_uploaded_once(self, get_remote_metadata):
+        token = services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf')
+        self.assertEqual(services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf'), token)
+        self.assertEqual(self.request_mock.call_count, 1)
+        get_remote_metadata.assert_called_once_with(token)
+
+        services.save_raw_content_remotely(b'other content', 'test.pdf', 'application/pdf')
+        services.save_raw_content_remotely(b'content', 'other.pdf', 'application/pdf')
+        services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf', deduplicate=False)
+        self.assertEqual(self.request_mock.call_count, 4)
+
+    def test_expired_token_is_not_reused(self, get_remote_metadata):
+        token = services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf')
+        get_remote_metadata.return_value = None
+        self.assertNotEqual(services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf'), token)
+        self.assertEqual(self.request_mock.call_count, 2)
+
+    def test_confirmed_token_is_not_reused(self, get_remote_metadata):
+        token = services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf')
+        services.confirm_remote_upload(token, upload_to='path')
+        self.assertNotEqual(services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf'), token)
+
+    @override_settings(OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION=False)
+    def test_confirmation_does_not_use_the_cache_without_deduplication(self, get_remote_metadata):
+        token = services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf')
+        with patch('osis_document_components.services._get_upload_deduplication_cache') as cache_mock:
+            services.confirm_remote_upload(token, upload_to='path')
+        cache_mock.assert_not_called()
+
+    @override_settings(OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION=False)
+    def test_confirmed_token_deduplicated_on_demand_is_not_reused(self, get_remote_metadata):
+        token = services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf', deduplicate=True)
+        services.confirm_remote_upload(token, upload_to='path')
+        self.assertNotEqual(
+            services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf', deduplicate=True),
+            token,
+        )
+
+    def test_confirmation_does_not_fail_when_the_cache_is_unavailable(self, get_remote_metadata):
+        token = services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf')
+        with patch(
+            'osis_document_components.services._get_upload_deduplication_cache',
+            side_effect=ConnectionError,
+        ), self.assertLogs(level='WARNING'):
+            self.assertTrue(services.confirm_remote_upload(token, upload_to='path'))
+
+    def test_token_is_reused_once(self, get_remote_metadata):
+        token = services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf')
+        self.assertEqual(services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf'), token)
+        self.assertNotEqual(services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf'), token)
+        self.assertEqual(self.request_mock.call_count, 2)
+
+    def test_token_is_handed_to_one_of_concurrent_uploads(self, get_remote_metadata):
+        token = services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf')
+        barrier = threading.Barrier(8)
+
+        def upload(_):
+            barrier.wait()
+            return services.save_raw_content_remotely(b'content', 'test.pdf', 'application/pdf')
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tokens = list(executor.map(upload, range(8)))
+
+        # The other uploads may reuse the tokens of each other, but the cached token is handed to one of them only
+        self.assertEqual(tokens.count(token), 1)
+
+
+@override_settings(
+    OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/',
+    OSIS_DOCUMENT_COMPONENTS_SAVE_RAW_CONTENT_REMOTELY_TIMEOUT=20,
+    OSIS_DOCUMENT_COMPONENTS_UPLOAD_DEDUPLICATION=False,
+)
+class SaveSeveralRawContentsRemotelyTestCase(SimpleTestCase):
+    def test_tokens_and_errors_are_returned_in_order(self):
+        def post(url, files, **kwargs):
+            name = files['file'][0]
+            if name == 'timeout.pdf':
+                raise Timeout()
+            response = Mock(status_code=services.HTTP_201_CREATED, text='')
+            if name == 'invalid.pdf':
+                response.status_code = 400
+            response.json.return_value = {'token': 'token-' + name}
+            return response
+
+        with patch('requests.Session.post', side_effect=post) as request_mock:
+            results = services.save_several_raw_contents_remotely(
+                [
+                    (b'content', name, 'application/pdf')
+                    for name in ['first.pdf', 'timeout.pdf', 'invalid.pdf', 'last.pdf']
+                ]
+            )
+
+        self.assertEqual(request_mock.call_count, 4)
+        self.assertEqual(results[0], 'token-first.pdf')
+        self.assertIsInstance(results[1], OsisDocumentTimeout)
+        self.assertIsInstance(results[2], SaveRawContentRemotelyException)
+        self.assertEqual(results[3], 'token-last.pdf')
+
+
+@override_settings(OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/')
+class WaitForPostProcessingTestCase(SimpleTestCase):
+    def setUp(self):
+        self.progresses = {
+            'first': iter([{'progress': 50}, {'progress': 100}]),
+            'second': iter([{'progress': 100}]),
+        }
+        patcher = patch(
+            'osis_document_components.services.get_progress_async_post_processing',
+            side_effect=lambda uuid, wanted_post_process: next(self.progresses[uuid]),
+        )
+        self.progress_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+        for name, delay in [('INITIAL_DELAY', 0.01), ('MAX_DELAY', 0.02)]:
+            patcher = patch('osis_document_components.services.WAIT_FOR_POST_PROCESSING_' + name, delay)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_only_pending_documents_are_polled(self):
+        on_progress = Mock()
+        result = services.wait_for_post_processing(['first', 'second'], 'CONVERT', on_progress=on_progress)
+
+        self.assertEqual(result, {'first': 100, 'second': 100})
+        self.assertEqual(self.progress_mock.call_count, 3)
+        self.assertEqual(on_progress.call_args_list[0][0][0], {'first': 50, 'second': 100})
+
+    def test_waiters_share_the_polls(self):
+        progresses = iter([{'progress': 25 * index} for index in range(1, 5)])
+        first_polled = threading.Event()
+
+        def get_progress(uuid, wanted_post_process):
+            first_polled.set()
+            return next(progresses)
+
+        self.progress_mock.side_effect = get_progress
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first_waiter = executor.submit(services.wait_for_post_processing, ['shared'])
+            first_polled.wait()
+            second_waiter = executor.submit(services.wait_for_post_processing, ['shared'])
+
+            self.assertEqual(first_waiter.result(), {'shared': 100})
+            self.assertEqual(second_waiter.result(), {'shared': 100})
+        self.assertEqual(self.progress_mock.call_count, 4)
+
+    def test_timeout(self):
+        self.progresses['first'] = iter(lambda: {'progress': 10}, None)
+        with self.assertRaises(OsisDocumentTimeout):
+            services.wait_for_post_processing(['first'], timeout=0.05)
+
+    def test_default_timeout_is_finite(self):
+        timeout = inspect.signature(services.wait_for_post_processing).parameters['timeout'].default
+        self.assertEqual(timeout, services.WAIT_FOR_POST_PROCESSING_DEFAULT_TIMEOUT)
+
+    def test_failed_post_processing_stops_polling(self):
+        self.progresses['first'] = iter([{'progress': 50}, {'status': 'FAILED'}])
+        self.progresses['second'] = iter([{'progress': 10}, {'error': 'Conversion failed'}])
+        with self.assertRaises(PostProcessingFailedException) as cm:
+            services.wait_for_post_processing(['first', 'second'])
+        self.assertCountEqual(cm.exception.uuids, ['first', 'second'])
+        self.assertEqual(self.progress_mock.call_count, 4)
+
+    def test_poll_errors_are_raised_to_the_waiters(self):
+        self.progress_mock.side_effect = OsisDocumentTimeout('timeout')
+        with self.assertRaises(OsisDocumentTimeout):
+            services.wait_for_post_processing(['first'])
+
+    def test_async(self):
+        result = asyncio.run(services.async_wait_for_post_processing(['second']))
+        self.assertEqual(result, {'second': 100})
+
+
+@override_settings(OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/')
+class IterRemoteTokensTestCase(SimpleTestCase):
+    def test_tokens_are_streamed(self):
+        uuids = [str(uuid.uuid4()) for _ in range(2)]
+        content = '{{"{}": {{"token": "first"}}, "{}": {{"error": "NOT_FOUND"}}}}'.format(*uuids).encode()
+        with patch('requests.post') as request_mock:
+            request_mock.return_value.status_code = services.HTTP_201_CREATED
+            request_mock.return_value.iter_content.return_value = [content[:10], content[10:]]
+            self.assertEqual(list(services.iter_remote_tokens(uuids)), [(uuids[0], 'first')])
+
+        self.assertTrue(request_mock.call_args[1]['stream'])
+        request_mock.return_value.close.assert_called_once()
+
+    def test_metadata_are_streamed(self):
+        with patch('requests.post') as request_mock:
+            request_mock.return_value.status_code = services.HTTP_200_OK
+            request_mock.return_value.iter_content.return_value = [b'{"token": {"name"', b': "test.pdf"}}']
+            self.assertEqual(list(services.iter_remote_metadata(['token'])), [('token', {'name': 'test.pdf'})])
+
+
+@override_settings(OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/')
+class CompactResultsTestCase(SimpleTestCase):
+    def test_compact_tokens(self):
+        uuids = [str(uuid.uuid4()), uuid.uuid4()]
+        content = '{{"{}": {{"token": "first"}}, "{}": {{"error": "NOT_FOUND"}}}}'.format(*uuids).encode()
+        with patch('requests.post') as request_mock:
+            request_mock.return_value.status_code = services.HTTP_206_PARTIAL_CONTENT
+            request_mock.return_value.iter_content.return_value = [content]
+            results = dict(services.iter_remote_tokens(uuids, compact=True))
+
+        self.assertEqual(json.loads(request_mock.call_args[1]['data'])['uuids'], [str(uuid) for uuid in uuids])
+        self.assertEqual(results[uuids[0]], TokenResult(uuids[0], token='first'))
+        self.assertFalse(results[str(uuids[1])])
+        self.assertEqual(results[str(uuids[1])].error, 'NOT_FOUND')
+
+    def test_compact_metadata(self):
+        with patch('requests.post') as request_mock:
+            request_mock.return_value.status_code = services.HTTP_200_OK
+            request_mock.return_value.iter_content.return_value = [
+                b'{"token": {"name": "test.pdf", "size": 10, "mimetype": "application/pdf", "author": "me"}}',
+            ]
+            [(token, metadata)] = services.iter_remote_metadata(['token'], compact=True)
+
+        self.assertIsInstance(metadata, DocumentMetadata)
+        self.assertEqual((metadata.name, metadata.size, metadata['mimetype']), ('test.pdf', 10, 'application/pdf'))
+        self.assertEqual(metadata.get('author'), 'me')
+        with self.assertRaises(AttributeError):
+            metadata.other = 'value'
+
+    def test_invalid_uuids_are_rejected(self):
+        with self.assertRaises(TypeError):
+            services.get_remote_tokens(['invalid'])
+        with self.assertRaises(TypeError):
+            services.get_remote_tokens([1])
+
+    @override_settings(OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE=500)
+    def test_invalid_uuids_are_discarded_from_batches(self):
+        valid_uuid = str(uuid.uuid4())
+        with patch('requests.post') as request_mock:
+            request_mock.return_value.status_code = services.HTTP_201_CREATED
+            request_mock.return_value.content = json.dumps({valid_uuid: {'token': 'first'}}).encode()
+            tokens = services.get_remote_tokens_in_batches(['invalid', valid_uuid, None, ''])
+
+        self.assertEqual(tokens, {valid_uuid: 'first'})
+        self.assertEqual(json.loads(request_mock.call_args[1]['data'])['uuids'], [valid_uuid])
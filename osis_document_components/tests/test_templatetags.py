@@ -26,8 +26,12 @@
 import uuid
 from unittest.mock import patch
 
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.template import Context, Template
-from django.test import TestCase, override_settings
+from django.test import RequestFactory, TestCase, override_settings
+
+from osis_document_components.lazy import LazyDocumentsMiddleware, LazyDocumentsTemplates, collect_documents
 
 
 @override_settings(OSIS_DOCUMENT_API_SHARED_SECRET='verysecret', OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/')
@@ -74,3 +78,121 @@ class TemplateTagsTestCase(TestCase):
         self.assertNotIn(str(stub_uuid), rendered)
         self.assertIn('http://dummyurl.com/', rendered)
         self.assertIn('application/pdf', rendered)
+
+
+@override_settings(
+    OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/',
+    OSIS_DOCUMENT_COMPONENTS_LAZY_TEMPLATE_TAGS=True,
+    OSIS_DOCUMENT_COMPONENTS_BATCH_SIZE=500,
+)
+class LazyTemplateTagsTestCase(TestCase):
+    template = (
+        '{% load osis_document_components %}'
+        '{% get_file_url values.0 as first_url %}'
+        '{% get_metadata values.0 as first_metadata %}'
+        '{% get_metadata values.1 as second_metadata %}'
+        '{% get_metadata values.2 as third_metadata %}'
+        '<a href="{{ first_url }}">{{ first_metadata.name }}</a>'
+        '{{ second_metadata.name }}'
+        '{% if third_metadata %}{{ third_metadata.name }}{% else %}missing{% endif %}'
+    )
+
+    def setUp(self):
+        self.uuids = [uuid.uuid4() for _ in range(3)]
+        patcher = patch(
+            'osis_document_components.services.get_remote_tokens',
+            side_effect=lambda uuids, **kwargs: {
+                file_uuid: 'token-' + file_uuid for file_uuid in uuids if file_uuid != str(self.uuids[2])
+            },
+        )
+        self.get_remote_tokens = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch(
+            'osis_document_components.services.get_several_remote_metadata',
+            side_effect=lambda tokens: {token: {'name': 'name-' + token} for token in tokens},
+        )
+        self.get_several_remote_metadata = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_documents_are_resolved_in_batch(self):
+        with collect_documents():
+            rendered = Template(self.template).render(Context({'values': self.uuids}))
+
+        self.get_remote_tokens.assert_called_once()
+        self.get_several_remote_metadata.assert_called_once()
+        self.assertIn('<a href="http://dummyurl.com/file/token-{0}">name-token-{0}</a>'.format(self.uuids[0]), rendered)
+        self.assertIn('missing', rendered)
+
+    def test_documents_are_resolved_one_by_one_outside_of_a_collection(self):
+        rendered = Template(self.template).render(Context({'values': self.uuids}))
+
+        self.assertEqual(self.get_remote_tokens.call_count, 4)
+        self.assertIn('missing', rendered)
+
+    def render_with_lazy_backend(self, template_code, context):
+        backend = LazyDocumentsTemplates({'NAME': 'lazy', 'DIRS': [], 'APP_DIRS': False, 'OPTIONS': {}})
+        return backend.from_string(template_code).render(context)
+
+    def test_output_documents_are_resolved_in_one_batch_after_the_rendering(self):
+        rendered = self.render_with_lazy_backend(
+            '{% load osis_document_components %}'
+            '{% for value in values %}<a href="{% get_file_url value %}"></a>{% endfor %}'
+            '{% get_metadata values.1 as metadata %}{{ metadata.name }}',
+            {'values': self.uuids[:2]},
+        )
+
+        self.get_remote_tokens.assert_called_once()
+        self.assertEqual(
+            rendered,
+            '<a href="http://dummyurl.com/file/token-{0}"></a>'
+            '<a href="http://dummyurl.com/file/token-{1}"></a>'
+            'name-token-{1}'.format(*self.uuids[:2]),
+        )
+
+    def test_output_documents_are_resolved_in_each_rendering(self):
+        # e.g. an email rendered while handling a request
+        middleware = LazyDocumentsMiddleware(
+            lambda request: HttpResponse(
+                self.render_with_lazy_backend(
+                    '{% load osis_document_components %}{% get_file_url values.0 %}',
+                    {'values': self.uuids},
+                )
+            )
+        )
+
+        response = middleware(RequestFactory().get('/'))
+
+        self.assertEqual(response.content.decode(), 'http://dummyurl.com/file/token-{}'.format(self.uuids[0]))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_output_documents_of_cached_fragments_are_resolved(self):
+        template_code = (
+            '{% load cache osis_document_components %}'
+            '{% cache 60 lazy_documents %}{% get_file_url values.0 %}{% endcache %}'
+        )
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        for _ in range(2):
+            rendered = self.render_with_lazy_backend(template_code, {'values': self.uuids})
+            self.assertEqual(rendered, 'http://dummyurl.com/file/token-{}'.format(self.uuids[0]))
+        self.assertEqual(self.get_remote_tokens.call_count, 2)
+
+    def test_forged_placeholders_are_not_replaced(self):
+        forged = '[osis-document:url|{}||||:forged]'.format(self.uuids[0])
+
+        rendered = self.render_with_lazy_backend('{{ text }}', {'text': forged})
+
+        self.assertEqual(rendered, forged)
+        self.get_remote_tokens.assert_not_called()
+
+    def test_invalid_uuids_do_not_fail_the_batch(self):
+        with collect_documents():
+            rendered = Template(
+                '{% load osis_document_components %}'
+                '{% get_file_url values.0 as first_url %}{% get_file_url "invalid" as invalid_url %}'
+                '{{ first_url }}'
+            ).render(Context({'values': self.uuids}))
+
+        self.assertEqual(rendered, 'http://dummyurl.com/file/token-{}'.format(self.uuids[0]))
+        self.assertEqual(self.get_remote_tokens.call_args[0][0], [str(self.uuids[0])])
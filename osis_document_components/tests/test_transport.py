@@ -0,0 +1,134 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import json
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.http import JsonResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import get_script_prefix, get_urlconf, path, set_script_prefix, set_urlconf
+
+from osis_document_components import services
+from osis_document_components.transport import InProcessTransport, RequestsTransport, _load_transport, get_transport
+
+
+def echo_app(environ, start_response):
+    """WSGI application returning the received request."""
+    body = environ['wsgi.input'].read(int(environ['CONTENT_LENGTH'] or 0))
+    start_response('200 OK', [('Content-Type', 'application/json')])
+    return [
+        json.dumps(
+            {
+                'method': environ['REQUEST_METHOD'],
+                'path': environ['PATH_INFO'],
+                'query': environ['QUERY_STRING'],
+                'host': environ['HTTP_HOST'],
+                'api_key': environ.get('HTTP_X_API_KEY'),
+                'content_type': environ.get('CONTENT_TYPE'),
+                'body': body.decode(),
+            }
+        ).encode()
+    ]
+
+
+urlpatterns = [
+    path('document/metadata/<str:token>', lambda request, token: JsonResponse({'users': User.objects.count()})),
+]
+
+
+class InProcessTransportTestCase(SimpleTestCase):
+    def test_request_is_dispatched_to_the_application(self):
+        response = InProcessTransport(echo_app).post(
+            'http://dummyurl.com/document/metadata?a=b',
+            json=['token'],
+            headers={'X-Api-Key': 'secret'},
+            timeout=5,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                'method': 'POST',
+                'path': '/document/metadata',
+                'query': 'a=b',
+                'host': 'dummyurl.com',
+                'api_key': 'secret',
+                'content_type': 'application/json',
+                'body': '["token"]',
+            },
+        )
+
+
+@override_settings(ROOT_URLCONF=__name__, OSIS_DOCUMENT_COMPONENTS_IN_PROCESS_APP=None)
+class InProcessHandlerTestCase(TestCase):
+    def test_request_in_atomic_block_keeps_the_transaction(self):
+        callbacks = []
+        with transaction.atomic():
+            User.objects.create_user('user')
+            transaction.on_commit(lambda: callbacks.append(True))
+
+            response = InProcessTransport().get('http://dummyurl.com/document/metadata/token')
+
+            self.assertEqual(response.json(), {'users': 1})
+            self.assertFalse(connection.needs_rollback)
+            self.assertFalse(connection.closed_in_transaction)
+            self.assertEqual(len(connection.run_on_commit), 1)
+            self.assertTrue(User.objects.filter(username='user').exists())
+
+    def test_script_prefix_and_urlconf_are_restored(self):
+        set_script_prefix('/prefix/')
+        set_urlconf(__name__)
+        self.addCleanup(set_script_prefix, '/')
+        self.addCleanup(set_urlconf, None)
+
+        InProcessTransport().get('http://dummyurl.com/document/metadata/token')
+
+        self.assertEqual(get_script_prefix(), '/prefix/')
+        self.assertEqual(get_urlconf(), __name__)
+
+
+@override_settings(OSIS_DOCUMENT_BASE_URL='http://dummyurl.com/document/')
+class GetTransportTestCase(SimpleTestCase):
+    def setUp(self):
+        _load_transport.cache_clear()
+        self.addCleanup(_load_transport.cache_clear)
+
+    def test_default_transport_uses_requests(self):
+        self.assertIsInstance(get_transport(), RequestsTransport)
+        with patch('requests.get') as request_mock:
+            request_mock.return_value.status_code = 200
+            request_mock.return_value.json.return_value = {'name': 'test.pdf'}
+            self.assertEqual(services.get_remote_metadata('token'), {'name': 'test.pdf'})
+        self.assertEqual(request_mock.call_args[0][0], 'http://dummyurl.com/document/metadata/token')
+
+    @override_settings(
+        OSIS_DOCUMENT_COMPONENTS_TRANSPORT='osis_document_components.transport.InProcessTransport',
+        OSIS_DOCUMENT_COMPONENTS_IN_PROCESS_APP='osis_document_components.tests.test_transport.echo_app',
+    )
+    def test_in_process_transport(self):
+        self.assertEqual(services.get_remote_metadata('token')['path'], '/document/metadata/token')
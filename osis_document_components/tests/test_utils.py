@@ -23,6 +23,7 @@
 #    see http://www.gnu.org/licenses/.
 #
 # ##############################################################################
+import json
 import uuid
 from datetime import date
 from unittest.mock import patch
@@ -30,7 +31,7 @@ from unittest.mock import patch
 from django.test import TestCase
 
 from osis_document_components.tests.factories import TokenFactory
-from osis_document_components.utils import is_uuid, generate_filename
+from osis_document_components.utils import is_uuid, generate_filename, chunks, iter_json_object_items
 
 
 class IsUuidTestCase(TestCase):
@@ -91,3 +92,35 @@ class GenerateFilenameTestCase(TestCase):
             upload_to=None,
         )
         self.assertEqual(generated_filename, 'my_file.txt')
+
+
+class ChunksTestCase(TestCase):
+    def test_chunks(self):
+        self.assertEqual(list(chunks(iter(range(5)), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunks([], 2)), [])
+
+
+class IterJsonObjectItemsTestCase(TestCase):
+    def test_items_are_parsed_incrementally(self):
+        data = {'first': {'name': 'é' * 10, 'size': 1.5, 'list': [1, None, True]}, 'second': 12345, 'third': 'a'}
+        content = json.dumps(data).encode()
+        for chunk_size in [1, 3, 16, len(content)]:
+            with self.subTest(chunk_size=chunk_size):
+                chunks_of_content = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+                self.assertEqual(list(iter_json_object_items(chunks_of_content)), list(data.items()))
+
+    def test_numbers_split_across_chunks(self):
+        for content in [b'{"a": 1.5}', b'{"a": 1e5, "b": -2}', b'{"a": 1.5E-3}', b'{"a": -12.25e+2}']:
+            expected_items = list(json.loads(content).items())
+            for split_position in range(1, len(content)):
+                with self.subTest(content=content, split_position=split_position):
+                    chunks_of_content = [content[:split_position], content[split_position:]]
+                    self.assertEqual(list(iter_json_object_items(chunks_of_content)), expected_items)
+
+    def test_empty_object(self):
+        self.assertEqual(list(iter_json_object_items([b' {', b' } '])), [])
+
+    def test_invalid_data(self):
+        for content in [b'[1, 2]', b'{"a": 1', b'{"a" 1}']:
+            with self.subTest(content=content), self.assertRaises(ValueError):
+                list(iter_json_object_items([content]))
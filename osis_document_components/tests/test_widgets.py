@@ -27,8 +27,10 @@ import uuid
 from unittest.mock import patch
 
 from django.core.exceptions import ImproperlyConfigured
+from django.http import QueryDict
 from django.test import TestCase, override_settings
 
+from osis_document_components import widgets
 from osis_document_components.widgets import FileUploadWidget
 
 
@@ -99,3 +101,21 @@ class WidgetTestCase(TestCase):
         render = widget.render('foo', [])
         self.assertIn('data-min-files="2"', render)
         self.assertIn('data-max-files="4"', render)
+
+
+class GetSizeTestCase(TestCase):
+    def test_size_with_more_than_ten_values(self):
+        data = QueryDict('&'.join('foo_{}=token'.format(index) for index in range(11)) + '&foo_bar_0=token&bar=1')
+        self.assertEqual(FileUploadWidget.get_size(data, 'foo'), 11)
+        self.assertEqual(FileUploadWidget.get_size(data, 'foo_bar'), 1)
+        self.assertEqual(FileUploadWidget.get_size(data, 'bar'), 0)
+        self.assertEqual(len(FileUploadWidget(size=0).value_from_datadict(data, {}, 'foo')), 11)
+
+    def test_index_is_shared_for_the_same_data(self):
+        data = QueryDict('foo_0=token&bar_1=token', mutable=True)
+        self.assertEqual(FileUploadWidget.get_size(data, 'foo'), 1)
+        self.assertIs(widgets._get_prefixed_keys_index(data), widgets._get_prefixed_keys_index(data))
+
+        data['foo_1'] = 'token'
+        self.assertEqual(FileUploadWidget.get_size(data, 'foo'), 2)
+        self.assertEqual(FileUploadWidget.get_size({'foo_0': 'token'}, 'foo'), 1)
@@ -0,0 +1,199 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import functools
+import sys
+from io import BytesIO
+from urllib.parse import unquote_to_bytes, urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.urls import get_script_prefix, get_urlconf, set_script_prefix, set_urlconf
+from django.utils.module_loading import import_string
+
+from osis_document_components.profiling import note_request
+from osis_document_components.utils import lazy_import
+
+requests = lazy_import('requests')
+
+
+class Transport:
+    """Send the requests of the services to the OSIS-Document server."""
+
+    def request(self, method: str, url: str, **kwargs) -> 'requests.Response':
+        """Send a request, with the same parameters as requests.request, and return the response."""
+        raise NotImplementedError
+
+    def get(self, url: str, **kwargs) -> 'requests.Response':
+        note_request(url)
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> 'requests.Response':
+        note_request(url)
+        return self.request('POST', url, **kwargs)
+
+
+class RequestsTransport(Transport):
+    """Send the requests over HTTP with requests, optionally through a session (e.g. to reuse pooled connections)."""
+
+    def __init__(self, session: 'requests.Session' = None):
+        self.session = session
+
+    def request(self, method, url, **kwargs):
+        # Looked up at call time, so that requests.get and requests.post can be patched
+        return getattr(self.session or requests, method.lower())(url, **kwargs)
+
+
+class InProcessHandler(WSGIHandler):
+    """
+    WSGI handler of the current Django project for the requests dispatched by the services of this project. Unlike the
+    one of get_wsgi_application, it does not send the request_started and request_finished signals, whose receivers
+    (close_old_connections) would close the database connection of the caller, e.g. in the middle of an atomic block,
+    and it restores the script prefix and the urlconf of the caller.
+    """
+
+    def __call__(self, environ, start_response):
+        script_prefix, urlconf = get_script_prefix(), get_urlconf()
+        try:
+            response = self.get_response(self.request_class(environ))
+        finally:
+            set_script_prefix(script_prefix)
+            set_urlconf(urlconf)
+        try:
+            content = b''.join(response) if response.streaming else response.content
+        finally:
+            # Same as response.close(), without the request_finished signal
+            for closer in response._resource_closers:
+                try:
+                    closer()
+                except Exception:
+                    pass
+            response._resource_closers.clear()
+            response.closed = True
+        start_response(
+            '%d %s' % (response.status_code, response.reason_phrase),
+            [
+                *response.items(),
+                *(('Set-Cookie', cookie.output(header='')) for cookie in response.cookies.values()),
+            ],
+        )
+        return [content]
+
+
+class InProcessTransport(Transport):
+    """
+    Dispatch the requests directly to a WSGI application running in the same process (e.g. when OSIS-Document is
+    installed in the same Django project), without any socket. The path of the request url is used as PATH_INFO.
+    app: the WSGI application, by default the one of OSIS_DOCUMENT_COMPONENTS_IN_PROCESS_APP (a dotted path) or an
+    InProcessHandler of the current Django project.
+    """
+
+    def __init__(self, app=None):
+        self._app = app
+
+    @property
+    def app(self):
+        if self._app is None:
+            if settings.OSIS_DOCUMENT_COMPONENTS_IN_PROCESS_APP:
+                self._app = import_string(settings.OSIS_DOCUMENT_COMPONENTS_IN_PROCESS_APP)
+            else:
+                self._app = InProcessHandler()
+        return self._app
+
+    def request(self, method, url, params=None, data=None, json=None, files=None, headers=None, **kwargs):
+        # The other parameters (e.g. timeout) only make sense over the network
+        prepared = requests.Request(
+            method,
+            url,
+            params=params,
+            data=data,
+            json=json,
+            files=files,
+            headers=headers,
+        ).prepare()
+        body = prepared.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        parsed_url = urlsplit(prepared.url)
+        environ = {
+            'REQUEST_METHOD': prepared.method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': unquote_to_bytes(parsed_url.path).decode('iso-8859-1'),
+            'QUERY_STRING': parsed_url.query,
+            'SERVER_NAME': parsed_url.hostname or 'localhost',
+            'SERVER_PORT': str(parsed_url.port or (443 if parsed_url.scheme == 'https' else 80)),
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': parsed_url.netloc,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': parsed_url.scheme or 'http',
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in prepared.headers.items():
+            key = name.upper().replace('-', '_')
+            if key == 'CONTENT_TYPE':
+                environ[key] = value
+            elif key != 'CONTENT_LENGTH':
+                environ['HTTP_' + key] = value
+
+        response_start = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            response_start['status'] = status
+            response_start['headers'] = response_headers
+
+        result = self.app(environ, start_response)
+        try:
+            content = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+        response = requests.Response()
+        status_code, _, reason = response_start['status'].partition(' ')
+        response.status_code = int(status_code)
+        response.reason = reason
+        response.headers = requests.structures.CaseInsensitiveDict(response_start['headers'])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = prepared.url
+        response.request = prepared
+        response._content = content
+        response._content_consumed = True
+        response.raw = BytesIO(content)
+        return response
+
+
+@functools.lru_cache(maxsize=None)
+def _load_transport(path: str) -> Transport:
+    return import_string(path)()
+
+
+def get_transport() -> Transport:
+    """Return the transport of the services (an instance of the OSIS_DOCUMENT_COMPONENTS_TRANSPORT class)."""
+    return _load_transport(settings.OSIS_DOCUMENT_COMPONENTS_TRANSPORT)
@@ -23,15 +23,92 @@
 #    see http://www.gnu.org/licenses/.
 #
 # ##############################################################################
+import codecs
 import contextlib
+import contextvars
 import datetime
+import importlib
+import importlib.abc
+import importlib.util
+import itertools
+import json
+import sys
 import posixpath
 import uuid
-from typing import Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Union, Iterable, Iterator, List, Callable, Tuple
 
 from django.conf import settings
 
 
+class _LazyModule:
+    """Proxy of a module, which is imported on the first access to one of its attributes."""
+
+    def __init__(self, name: str):
+        self.__name = name
+        self.__module = None
+
+    def __getattr__(self, attribute):
+        module = self.__module
+        if module is None:
+            # import_module holds the import lock of the module, so concurrent first accesses wait for it to be
+            # fully executed instead of seeing a partially initialized module
+            module = self.__module = importlib.import_module(self.__name)
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        return '<lazy module {!r}>'.format(self.__name)
+
+
+def lazy_import(name: str):
+    """
+    Return a module which is only really imported on the first access to one of its attributes, to avoid paying for
+    the import of heavy dependencies when they are not used (e.g. in management commands).
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return _LazyModule(name)
+
+
+class _OnImportLoader(importlib.abc.Loader):
+    def __init__(self, loader, callback):
+        self._loader = loader
+        self._callback = callback
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._loader.exec_module(module)
+        self._callback(module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _OnImportFinder(importlib.abc.MetaPathFinder):
+    def __init__(self, name, callback):
+        self._name = name
+        self._callback = callback
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != self._name:
+            return None
+        sys.meta_path.remove(self)
+        spec = importlib.util.find_spec(fullname)
+        if spec is not None and spec.loader is not None:
+            spec.loader = _OnImportLoader(spec.loader, self._callback)
+        return spec
+
+
+def call_on_import(name: str, callback: Callable):
+    """Call callback with the module as soon as it is imported (immediately if it is already imported)."""
+    if name in sys.modules:
+        callback(sys.modules[name])
+    else:
+        sys.meta_path.insert(0, _OnImportFinder(name, callback))
+
+
 def is_uuid(value: Union[str, uuid.UUID]) -> bool:
     if isinstance(value, uuid.UUID):
         return True
@@ -60,3 +137,110 @@ def generate_filename(instance, filename, upload_to):
         dirname = datetime.datetime.now().strftime(upload_to)
         filename = posixpath.join(dirname, filename)
     return filename
+
+
+def chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    """Split an iterable into lists of at most `size` items, without loading it entirely."""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def map_concurrently(func: Callable, items: Iterable, max_workers: int = None) -> List:
+    """
+    Call func on each item over a bounded pool of threads (OSIS_DOCUMENT_COMPONENTS_MAX_CONCURRENT_REQUESTS by
+    default) and return the results in the same order as the items.
+    """
+    items = list(items)
+    max_workers = min(max_workers or settings.OSIS_DOCUMENT_COMPONENTS_MAX_CONCURRENT_REQUESTS, len(items))
+    if max_workers <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Each call runs in a copy of the current context, so that the context variables (e.g. the calls recorder of
+        # the profiling) are available in the threads
+        futures = [executor.submit(contextvars.copy_context().run, func, item) for item in items]
+        return [future.result() for future in futures]
+
+
+_JSON_WHITESPACE = ' \t\n\r'
+_JSON_NUMBER_CONTINUATION = '.eE+-'
+
+
+def _may_continue(value, rest: str) -> bool:
+    """
+    Check if a decoded value may continue in the next chunk: it ends the buffer, or it is a number followed only by
+    characters of an incomplete fraction or exponent (e.g. '1.' or '1e-'), of which raw_decode only reads the prefix.
+    """
+    if not rest:
+        return True
+    is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+    return is_number and not rest.strip(_JSON_NUMBER_CONTINUATION)
+
+
+def iter_json_object_items(data: Iterable[bytes]) -> Iterator[Tuple[str, Any]]:
+    """
+    Parse incrementally a JSON object received by chunks of bytes (e.g. a streamed response) and yield its
+    (key, value) items as soon as they are complete, without loading the whole object.
+    :raise ValueError: if the data is not a valid JSON object
+    """
+    decoder = json.JSONDecoder()
+    utf8_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks_iterator = iter(data)
+    buffer = ''
+    position = 0
+    exhausted = False
+
+    def read_more():
+        nonlocal buffer, position, exhausted
+        chunk = next(chunks_iterator, None)
+        exhausted = chunk is None
+        buffer = buffer[position:] + utf8_decoder.decode(chunk or b'', final=exhausted)
+        position = 0
+        return not exhausted
+
+    def next_character():
+        """Skip the whitespaces and return the next character (reading more data if needed), or '' at the end."""
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in _JSON_WHITESPACE:
+                position += 1
+            if position < len(buffer) or not read_more():
+                return buffer[position:position + 1]
+
+    def decode_value(needs_following_character):
+        """Decode the next value, which may be truncated (e.g. a number) if it ends the buffer."""
+        nonlocal position
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if exhausted or not read_more():
+                    raise
+                continue
+            if needs_following_character and not exhausted and _may_continue(value, buffer[end:]):
+                read_more()
+                continue
+            position = end
+            return value
+
+    if next_character() != '{':
+        raise ValueError('A JSON object is expected')
+    position += 1
+    if next_character() == '}':
+        return
+    while True:
+        if next_character() != '"':
+            raise ValueError('A JSON object key is expected')
+        key = decode_value(needs_following_character=False)
+        if next_character() != ':':
+            raise ValueError("':' is expected after a JSON object key")
+        position += 1
+        next_character()
+        value = decode_value(needs_following_character=True)
+        yield key, value
+        separator = next_character()
+        position += 1
+        if separator == '}':
+            return
+        if separator != ',':
+            raise ValueError("',' or '}' is expected after a JSON object item")
@@ -0,0 +1,56 @@
+# ##############################################################################
+#
+#    OSIS stands for Open Student Information System. It's an application
+#    designed to manage the core business of higher education institutions,
+#    such as universities, faculties, institutes and professional schools.
+#    The core business involves the administration of students, teachers,
+#    courses, programs and so on.
+#
+#    Copyright (C) 2015-2026 Université catholique de Louvain (http://www.uclouvain.be)
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    A copy of this license - GNU General Public License - is available
+#    at the root of the source code of this program.  If not,
+#    see http://www.gnu.org/licenses/.
+#
+# ##############################################################################
+import json
+
+from django.http import Http404, HttpResponseBadRequest, HttpResponseRedirect, JsonResponse
+from django.views.decorators.http import require_GET, require_POST
+
+from osis_document_components.references import resolve_references
+from osis_document_components.utils import get_file_url
+
+
+@require_POST
+def resolve_references_view(request):
+    """
+    Resolve the signed references of the JSON list {"references": [...]} to reading tokens, in batch. Only the
+    references bound to the current user are resolved.
+    """
+    try:
+        references = json.loads(request.body)['references']
+    except (ValueError, KeyError, TypeError):
+        return HttpResponseBadRequest()
+    if not isinstance(references, list) or not all(isinstance(reference, str) for reference in references):
+        return HttpResponseBadRequest()
+    return JsonResponse(resolve_references(references, user=getattr(request, 'user', None)))
+
+
+@require_GET
+def reference_file_view(request, reference):
+    """Redirect to the file of a signed reference."""
+    token = resolve_references([reference], user=getattr(request, 'user', None))[reference]
+    if not isinstance(token, str):
+        raise Http404
+    return HttpResponseRedirect(get_file_url(token))
@@ -24,8 +24,10 @@
 #
 # ##############################################################################
 import json
-import re
+import threading
 import uuid
+import weakref
+from typing import Dict
 
 from django import forms
 from django.conf import settings
@@ -37,6 +39,35 @@ from django.utils.translation import gettext_lazy as _
 from osis_document_components import services as osis_document_services
 
 
+_prefixed_keys_indexes = threading.local()
+
+
+def _get_prefixed_keys_index(data) -> Dict[str, int]:
+    """
+    Return a dictionary associating each prefix of the keys of the data (e.g. 'name' for 'name_0' and 'name_1') to
+    its greatest index. The index is built once for a submitted data (e.g. request.POST) and shared by all the
+    widgets reading it.
+    """
+    cache = getattr(_prefixed_keys_indexes, 'last', None)
+    if cache is not None and cache[0]() is data and cache[1] == len(data):
+        return cache[2]
+
+    index = {}
+    for key in data:
+        if isinstance(key, str):
+            prefix, separator, number = key.rpartition('_')
+            if separator and number.isdecimal():
+                number = int(number)
+                if number > index.get(prefix, -1):
+                    index[prefix] = number
+    try:
+        _prefixed_keys_indexes.last = (weakref.ref(data), len(data), index)
+    except TypeError:
+        # Not cached if the data cannot be weakly referenced (e.g. a dict passed programmatically)
+        pass
+    return index
+
+
 class HiddenFileWidget(MultipleHiddenInput):
     template_name = 'osis_document_components/hidden_widget.html'
 
@@ -99,13 +130,8 @@ class FileUploadWidget(SplitArrayWidget):
 
     @staticmethod
     def get_size(data, name):
-        # Detect the size of the array by sorting prefixed data and getting the last number via regex
-        pattern = re.compile(r'{}_\d+'.format(name))
-        names = sorted([field_name for field_name in data if pattern.fullmatch(field_name)], reverse=True)
-        if names:
-            search = re.findall(r'\d+', names[0]) or ['-1']
-            return int(search[-1]) + 1
-        return 0
+        # Detect the size of the array from the greatest index of the prefixed data
+        return _get_prefixed_keys_index(data).get(name, -1) + 1
 
     def value_omitted_from_data(self, data, files, name):
         fn = all if self.size else any